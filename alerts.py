@@ -0,0 +1,255 @@
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+# Delay alerting. An AlertWorker receives the orders each refresh of the
+# merged store added or updated, scores the open ones in a background thread
+# and raises an alert for every order at or above the saved threshold. Each
+# order alerts once per cooldown, and again within it only if its score rose
+# by at least RESCORE_MARGIN. Alerts are handed to every configured sink.
+SETTINGS_FILE = 'settings.json'
+DEFAULT_SETTINGS = {'alert_threshold': 0.6, 'refresh_frequency': 'Real-time'}
+ALERT_COOLDOWN_SECONDS = 60 * 60
+RESCORE_MARGIN = 0.1
+# Per-order alert state kept for de-duplication
+MAX_TRACKED_ORDERS = 1_000_000
+# Window for the alerts/sec and lag metrics
+METRICS_WINDOW_SECONDS = 60.0
+ALERT_COLUMNS = ['order_id', 'priority', 'origin_warehouse', 'destination_city', 'carrier']
+
+
+def load_settings(path=SETTINGS_FILE):
+    try:
+        with open(path) as f:
+            return dict(DEFAULT_SETTINGS, **json.load(f))
+    except (OSError, ValueError):
+        return dict(DEFAULT_SETTINGS)
+
+
+def save_settings(settings, path=SETTINGS_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class LogFileSink:
+    # One JSON object per line
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, alerts):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, 'a') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert) + '\n')
+
+
+class QueueSink:
+    # Bounded in-process queue for local consumers; the oldest alert is
+    # dropped when it is full
+    def __init__(self, maxsize=10_000):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def emit(self, alerts):
+        for alert in alerts:
+            while True:
+                try:
+                    self.queue.put_nowait(alert)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def recent(self, n=20):
+        # Newest alerts without consuming them
+        with self.queue.mutex:
+            return list(self.queue.queue)[-n:][::-1]
+
+
+class WebhookSink:
+    # POSTs each batch as {"alerts": [...]}, e.g. to feeds_stub_server's /alerts
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, alerts):
+        body = json.dumps({'alerts': alerts}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class AlertStats:
+    def __init__(self):
+        self.evaluated = 0
+        self.alerts = 0
+        self.suppressed = 0
+        self.sink_errors = 0
+        self._alert_times = deque()
+        self._lags = deque()
+        self._lock = threading.Lock()
+
+    def record(self, evaluated, alerts, suppressed, lag_seconds):
+        now = time.monotonic()
+        with self._lock:
+            self.evaluated += evaluated
+            self.alerts += alerts
+            self.suppressed += suppressed
+            self._alert_times.append((now, alerts))
+            self._lags.append((now, lag_seconds))
+            for window in (self._alert_times, self._lags):
+                while window and now - window[0][0] > METRICS_WINDOW_SECONDS:
+                    window.popleft()
+
+    def record_sink_error(self):
+        with self._lock:
+            self.sink_errors += 1
+
+    def as_dict(self):
+        with self._lock:
+            counts = {
+                'evaluated': self.evaluated,
+                'alerts': self.alerts,
+                'suppressed': self.suppressed,
+                'sink_errors': self.sink_errors,
+            }
+            recent_alerts = sum(count for _, count in self._alert_times)
+            lags = np.array([lag for _, lag in self._lags])
+        return {
+            **counts,
+            'alerts_per_sec': recent_alerts / METRICS_WINDOW_SECONDS,
+            'lag_p95_seconds': float(np.percentile(lags, 95)) if len(lags) else 0.0,
+            'lag_max_seconds': float(lags.max()) if len(lags) else 0.0,
+        }
+
+
+class AlertEngine:
+    def __init__(self, threshold, sinks=(), cooldown_seconds=ALERT_COOLDOWN_SECONDS, clock=time.time):
+        self.threshold = threshold
+        self.sinks = list(sinks)
+        self.cooldown_seconds = cooldown_seconds
+        self.stats = AlertStats()
+        self._clock = clock
+        # order_id -> (time of last alert, score it was raised at)
+        self._last_alert = OrderedDict()
+
+    def evaluate(self, orders, scores, received_at=None):
+        # Alerts for the orders in `orders` whose score is at or above the
+        # threshold and that are not suppressed; delivered orders are skipped
+        # and forgotten
+        now = self._clock()
+        scores = np.asarray(scores, dtype=np.float64)
+        delivered = orders['status'].notna().to_numpy() if 'status' in orders else np.zeros(len(orders), dtype=bool)
+        if self._last_alert:
+            for order_id in orders['order_id'].to_numpy()[delivered]:
+                self._last_alert.pop(order_id, None)
+
+        flagged = np.flatnonzero(~delivered & (scores >= self.threshold))
+        alerts, suppressed = [], 0
+        if len(flagged):
+            details = orders.iloc[flagged][[c for c in ALERT_COLUMNS if c in orders]].astype(object)
+            details = details.where(details.notna(), None)
+            for record, score in zip(details.to_dict('records'), scores[flagged]):
+                previous = self._last_alert.get(record['order_id'])
+                if previous is not None and now - previous[0] < self.cooldown_seconds and score < previous[1] + RESCORE_MARGIN:
+                    suppressed += 1
+                    continue
+                self._last_alert[record['order_id']] = (now, score)
+                self._last_alert.move_to_end(record['order_id'])
+                record.update(score=round(float(score), 4), threshold=self.threshold, raised_at=now)
+                alerts.append(record)
+            while len(self._last_alert) > MAX_TRACKED_ORDERS:
+                self._last_alert.popitem(last=False)
+
+        if alerts:
+            for sink in self.sinks:
+                try:
+                    sink.emit(alerts)
+                except Exception:
+                    self.stats.record_sink_error()
+        lag = now - received_at if received_at is not None else 0.0
+        self.stats.record(len(orders), len(alerts), suppressed, lag)
+        return alerts
+
+
+class AlertWorker:
+    # Background evaluation of changed orders. Batches are queued by the
+    # loader's listener and scored in this worker's thread, so refreshes
+    # never wait on scoring or sinks. `scorer(frame, risk)` returns one delay
+    # probability per row.
+    def __init__(self, engine, scorer, loader=None, poll_seconds=5.0, refresh_interval=0.0):
+        self.engine = engine
+        self.scorer = scorer
+        self.loader = loader
+        self.poll_seconds = poll_seconds
+        self.refresh_interval = refresh_interval
+        self.errors = 0
+        self._batches = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, orders, risk=None):
+        self._batches.put((time.time(), orders, risk))
+
+    @property
+    def backlog(self):
+        return self._batches.qsize()
+
+    def start(self):
+        if self.loader is not None:
+            self.loader.add_listener(self.submit)
+            # Open orders already in the store are evaluated once on start
+            _, merged, risk, _, _ = self.loader.snapshot()
+            self.submit(merged, risk)
+        self._thread = threading.Thread(target=self._run, name='alert-worker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.loader is not None:
+                try:
+                    self.loader.refresh_if_due(max(self.refresh_interval, self.poll_seconds))
+                except Exception:
+                    self.errors += 1
+            try:
+                received_at, orders, risk = self._batches.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                continue
+            # Everything queued meanwhile is scored as one batch
+            batch = [(received_at, orders, risk)]
+            while True:
+                try:
+                    batch.append(self._batches.get_nowait())
+                except queue.Empty:
+                    break
+            orders = pd.concat([b[1] for b in batch]) if len(batch) > 1 else orders
+            risk = None if any(b[2] is None for b in batch) else (
+                pd.concat([b[2] for b in batch]) if len(batch) > 1 else risk
+            )
+            if not len(orders):
+                continue
+            try:
+                self.engine.evaluate(orders, self.scorer(orders, risk), received_at=batch[0][0])
+            except Exception:
+                self.errors += 1
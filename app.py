@@ -1,12 +1,22 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import os
 import warnings
+
+from alerts import load_settings
+from ingest import REFRESH_INTERVALS
+from instrumentation import TRACE_LOG_ENV, TRACE_PROM_ENV, stage, tracer
+from views import PAGES, render
+from views.common import (
+    PageContext, get_alert_worker, get_figure_cache, get_ingestor, get_session_registry, get_shared_dataset
+)
 warnings.filterwarnings('ignore')
 
+# Stage timings of this run, for the Performance panel. Tracing follows this
+# session's checkbox, so one user turning it on does not trace the others.
+tracer.begin_run(st.session_state.get('trace_performance', tracer.enabled))
+
 # Set page config
 st.set_page_config(
     page_title="NexGen Logistics - Predictive Delivery Optimizer",
@@ -58,131 +68,102 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🚚 NexGen Logistics - Predictive Delivery Optimizer</h1>', unsafe_allow_html=True)
 st.markdown("### Transform from Reactive to Predictive Operations")
 
+saved_settings = load_settings()
+
 # Sidebar
 with st.sidebar:
     st.markdown("## Navigation")
     
+    # Drawn before the data is loaded, so a cold start shows the page shell
+    # while the store is read
     page = st.radio(
         "Select Dashboard",
-        ["📊 Executive Dashboard", "🔮 Delay Predictions", "📈 Performance Analytics", 
-         "🗺️ Route Optimization", "⚙️ Settings & Export"]
+        list(PAGES),
+        key='page'
     )
     
     st.markdown("---")
+
+try:
+    with stage('app.load') as timer, st.spinner("Loading orders..."):
+        ingestor = get_ingestor()
+        # Picks up rows appended to the feeds once the chosen refresh interval is up
+        ingestor.refresh_if_due(REFRESH_INTERVALS[st.session_state.get('refresh_setting', saved_settings['refresh_frequency'])])
+        data_version, merged_store, store_risk, store_cube, store_features = ingestor.snapshot()
+        dataset = get_shared_dataset(data_version, merged_store)
+        all_data = dataset.frame
+        timer.rows = len(all_data)
+    load_error = None
+except Exception as e:
+    dataset = None
+    all_data = None
+    load_error = e
+
+with st.sidebar:
     st.markdown("### Filters")
     
-    # Date range filter
+    # Date range filter, defaulting to the last 30 days of loaded orders. The
+    # default is fixed per session: a new default would make Streamlit treat
+    # the widget as new and drop the user's range whenever a refresh brings
+    # in later orders.
+    if 'default_date_range' not in st.session_state:
+        if all_data is not None and all_data['order_date'].notna().any():
+            latest_date = all_data['order_date'].max().date()
+        else:
+            latest_date = datetime.now().date()
+        st.session_state['default_date_range'] = [latest_date - timedelta(days=30), latest_date]
     date_range = st.date_input(
         "Select Date Range",
-        value=[datetime.now().date() - timedelta(days=30), datetime.now().date()]
+        value=st.session_state['default_date_range']
     )
     
     # Priority filter
+    priority_options = ["Express", "Standard", "Economy"]
     priorities = st.multiselect(
         "Delivery Priority",
-        ["Express", "Standard", "Economy"],
-        default=["Express", "Standard", "Economy"]
+        priority_options,
+        default=priority_options
     )
     
     # Warehouse filter
+    if all_data is not None:
+        warehouse_options = sorted(all_data['origin_warehouse'].dropna().unique().tolist())
+    else:
+        warehouse_options = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"]
     warehouses = st.multiselect(
         "Origin Warehouse",
-        ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"],
-        default=["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"]
+        warehouse_options,
+        default=warehouse_options
     )
-
-# Simulated data loading
-@st.cache_data
-def load_simulated_data():
-    np.random.seed(42)
     
-    # Indian city coordinates
-    city_coords = {
-        'Mumbai': {'lat': 19.0760, 'lon': 72.8777},
-        'Delhi': {'lat': 28.7041, 'lon': 77.1025},
-        'Bangalore': {'lat': 12.9716, 'lon': 77.5946},
-        'Chennai': {'lat': 13.0827, 'lon': 80.2707},
-        'Kolkata': {'lat': 22.5726, 'lon': 88.3639},
-        'Hyderabad': {'lat': 17.3850, 'lon': 78.4867},
-        'Pune': {'lat': 18.5204, 'lon': 73.8567},
-        'Ahmedabad': {'lat': 23.0225, 'lon': 72.5714},
-        'Jaipur': {'lat': 26.9124, 'lon': 75.7873}
-    }
-    
-    # Create orders data
-    orders = pd.DataFrame({
-        'order_id': list(range(1, 201)),
-        'order_date': pd.date_range('2024-01-01', periods=200),
-        'customer_segment': np.random.choice(['Enterprise', 'SMB', 'Individual'], 200),
-        'priority': np.random.choice(['Express', 'Standard', 'Economy'], 200, p=[0.3, 0.5, 0.2]),
-        'product_category': np.random.choice(['Electronics', 'Fashion', 'Food & Beverage', 
-                                              'Healthcare', 'Industrial', 'Books', 'Home Goods'], 200),
-        'order_value': np.random.uniform(100, 10000, 200),
-        'origin_warehouse': np.random.choice(list(city_coords.keys())[:5], 200),
-        'destination_city': np.random.choice(list(city_coords.keys()), 200),
-        'special_handling': np.random.choice([True, False], 200, p=[0.2, 0.8])
-    })
-    
-    # Add coordinates
-    orders['dest_lat'] = orders['destination_city'].map(lambda x: city_coords[x]['lat'])
-    orders['dest_lon'] = orders['destination_city'].map(lambda x: city_coords[x]['lon'])
-    orders['origin_lat'] = orders['origin_warehouse'].map(lambda x: city_coords[x]['lat'])
-    orders['origin_lon'] = orders['origin_warehouse'].map(lambda x: city_coords[x]['lon'])
-    
-    # Create delivery data
-    delivery = pd.DataFrame({
-        'order_id': list(range(1, 151)),
-        'carrier': np.random.choice(['Carrier A', 'Carrier B', 'Carrier C', 'Carrier D', 'Carrier E'], 150),
-        'promised_delivery_hours': np.random.randint(24, 120, 150),
-        'actual_delivery_hours': np.random.randint(12, 144, 150),
-        'status': np.random.choice(['Delivered', 'In Transit', 'Delayed', 'Cancelled'], 150, 
-                                  p=[0.7, 0.2, 0.08, 0.02]),
-        'quality_issue': np.random.choice(['None', 'Damage', 'Wrong Item', 'Late'], 150, 
-                                         p=[0.85, 0.05, 0.05, 0.05]),
-        'customer_rating': np.random.randint(1, 6, 150),
-        'delivery_cost': np.random.uniform(50, 500, 150)
-    })
-    
-    # Create routes data
-    routes = pd.DataFrame({
-        'order_id': list(range(1, 151)),
-        'distance_km': np.random.uniform(10, 1500, 150),
-        'fuel_consumption': np.random.uniform(5, 50, 150),
-        'toll_charges': np.random.uniform(0, 200, 150),
-        'traffic_delay_hours': np.random.uniform(0, 5, 150),
-        'weather_impact': np.random.choice(['None', 'Rain', 'Heat', 'Fog', 'Storm'], 150)
-    })
-    
-    # Calculate derived metrics
-    delivery['delayed'] = delivery['actual_delivery_hours'] > delivery['promised_delivery_hours']
-    delivery['delay_hours'] = np.maximum(0, delivery['actual_delivery_hours'] - delivery['promised_delivery_hours'])
-    
-    return orders, delivery, routes
+    # Read by begin_run at the top of the next run
+    st.checkbox(
+        "⏱️ Performance panel",
+        value=tracer.enabled,
+        key='trace_performance',
+        help="Time data loading, filtering, scoring, rollups and charts on every run"
+    )
 
-# Load data
+# Filter data based on sidebar selections
 try:
-    orders, delivery, routes = load_simulated_data()
-    
-    # Merge datasets
-    merged_data = pd.merge(orders, delivery, on='order_id', how='left')
-    merged_data = pd.merge(merged_data, routes, on='order_id', how='left')
-    
-    # Filter data based on sidebar selections
-    if len(date_range) == 2:
-        mask = (merged_data['order_date'] >= pd.Timestamp(date_range[0])) & \
-               (merged_data['order_date'] <= pd.Timestamp(date_range[1]))
-        merged_data = merged_data[mask]
-    
-    if priorities:
-        merged_data = merged_data[merged_data['priority'].isin(priorities)]
-    
-    if warehouses:
-        merged_data = merged_data[merged_data['origin_warehouse'].isin(warehouses)]
+    if load_error is not None:
+        raise load_error
+    # Row positions from the shared dataset's indexes; pages that need the
+    # rows themselves get a copy of the selected rows on first use
+    with stage('app.filter') as timer:
+        selected_rows = dataset.select(date_range, priorities, warehouses)
+        timer.rows = len(selected_rows)
+    ctx = PageContext(
+        date_range, priorities, warehouses, saved_settings, ingestor=ingestor, data_version=data_version,
+        dataset=dataset, store_risk=store_risk, store_cube=store_cube, store_features=store_features,
+        selected_rows=selected_rows
+    )
 
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
+    ctx = PageContext(date_range, priorities, warehouses, saved_settings, load_error=e)
     # Create minimal fallback data
-    merged_data = pd.DataFrame({
+    ctx.merged_data = pd.DataFrame({
         'order_id': [1, 2, 3],
         'priority': ['Express', 'Standard', 'Economy'],
         'delayed': [True, False, True],
@@ -194,536 +175,21 @@ except Exception as e:
         'dest_lon': [72.8777, 77.1025, 77.5946]
     })
 
-# Main content based on selected page
-if page == "📊 Executive Dashboard":
-    st.markdown('<h2 class="sub-header">Executive Dashboard</h2>', unsafe_allow_html=True)
-    
-    # KPI Metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            label="Total Orders",
-            value=len(merged_data),
-            delta=f"{len(merged_data) - 150}" if len(merged_data) > 150 else "0"
-        )
-    
-    with col2:
-        if 'delayed' in merged_data.columns:
-            delay_rate = merged_data['delayed'].mean() * 100
-            st.metric(
-                label="Delay Rate",
-                value=f"{delay_rate:.1f}%",
-                delta=f"-{max(0, delay_rate - 15):.1f}%" if delay_rate > 15 else f"+{max(0, 15 - delay_rate):.1f}%"
-            )
-        else:
-            st.metric(label="Delay Rate", value="N/A")
-    
-    with col3:
-        if 'customer_rating' in merged_data.columns:
-            avg_rating = merged_data['customer_rating'].mean()
-            st.metric(
-                label="Avg Customer Rating",
-                value=f"{avg_rating:.1f}/5",
-                delta=f"{avg_rating - 3.5:.1f}" if avg_rating > 3.5 else f"{3.5 - avg_rating:.1f}"
-            )
-        else:
-            st.metric(label="Avg Customer Rating", value="N/A")
-    
-    with col4:
-        if 'delivery_cost' in merged_data.columns:
-            total_cost = merged_data['delivery_cost'].sum()
-            st.metric(
-                label="Total Delivery Cost",
-                value=f"₹{total_cost:,.0f}",
-                delta=f"-₹{total_cost * 0.05:,.0f}"
-            )
-        else:
-            st.metric(label="Total Delivery Cost", value="N/A")
-    
-    # Charts
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if 'priority' in merged_data.columns and 'delayed' in merged_data.columns:
-            delay_by_priority = merged_data.groupby('priority')['delayed'].mean().reset_index()
-            fig1 = px.bar(
-                delay_by_priority,
-                x='priority',
-                y='delayed',
-                title='Delay Rate by Priority',
-                color='priority',
-                labels={'delayed': 'Delay Rate', 'priority': 'Delivery Priority'}
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-        else:
-            st.info("No priority data available")
-    
-    with col2:
-        if 'customer_rating' in merged_data.columns:
-            fig2 = px.histogram(
-                merged_data,
-                x='customer_rating',
-                nbins=5,
-                title='Customer Rating Distribution',
-                color_discrete_sequence=['#3B82F6']
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-        else:
-            st.info("No rating data available")
-    
-    # Map visualization (FIXED)
-    st.markdown('<h3 class="sub-header">Delivery Performance Map</h3>', unsafe_allow_html=True)
-    
-    if all(col in merged_data.columns for col in ['dest_lat', 'dest_lon', 'destination_city']):
-        try:
-            # Create map data
-            map_data = merged_data.groupby('destination_city').agg({
-                'order_id': 'count',
-                'delayed': 'mean' if 'delayed' in merged_data.columns else None,
-                'customer_rating': 'mean' if 'customer_rating' in merged_data.columns else None
-            }).reset_index()
-            
-            # Add coordinates
-            city_coords = {
-                'Mumbai': {'lat': 19.0760, 'lon': 72.8777},
-                'Delhi': {'lat': 28.7041, 'lon': 77.1025},
-                'Bangalore': {'lat': 12.9716, 'lon': 77.5946},
-                'Chennai': {'lat': 13.0827, 'lon': 80.2707},
-                'Kolkata': {'lat': 22.5726, 'lon': 88.3639},
-                'Hyderabad': {'lat': 17.3850, 'lon': 78.4867},
-                'Pune': {'lat': 18.5204, 'lon': 73.8567},
-                'Ahmedabad': {'lat': 23.0225, 'lon': 72.5714},
-                'Jaipur': {'lat': 26.9124, 'lon': 75.7873}
-            }
-            
-            map_data['lat'] = map_data['destination_city'].map(lambda x: city_coords.get(x, {}).get('lat', 20.5937))
-            map_data['lon'] = map_data['destination_city'].map(lambda x: city_coords.get(x, {}).get('lon', 78.9629))
-            
-            # Create the map
-            fig3 = px.scatter_mapbox(
-                map_data,
-                lat='lat',
-                lon='lon',
-                size='order_id',
-                color='delayed' if 'delayed' in map_data.columns else 'order_id',
-                hover_name='destination_city',
-                hover_data=['order_id', 'customer_rating'] if 'customer_rating' in map_data.columns else ['order_id'],
-                title='Delivery Performance by Destination City',
-                color_continuous_scale='RdYlGn_r',
-                size_max=30,
-                zoom=4
-            )
-            
-            fig3.update_layout(
-                mapbox_style="carto-positron",
-                mapbox_center={"lat": 20.5937, "lon": 78.9629},
-                height=500,
-                margin={"r":0,"t":30,"l":0,"b":0}
-            )
-            
-            st.plotly_chart(fig3, use_container_width=True)
-            
-        except Exception as e:
-            st.warning(f"Could not display map: {str(e)}")
-            st.info("Showing data table instead")
-            st.dataframe(merged_data.head(10))
-    else:
-        st.info("Map data not available. Showing data table:")
-        st.dataframe(merged_data.head(10))
+# What this session holds beyond the shared dataset, for the memory report;
+# recorded again after the page in case it filtered rows of its own
+session_key = st.session_state.setdefault('session_key', os.urandom(8).hex())
+get_session_registry().record(session_key, ctx.session_bytes())
 
-elif page == "🔮 Delay Predictions":
-    st.markdown('<h2 class="sub-header">Predictive Delay Analysis</h2>', unsafe_allow_html=True)
-    
-    required_cols = ['priority', 'traffic_delay_hours', 'weather_impact', 'distance_km', 'product_category']
-    
-    if all(col in merged_data.columns for col in required_cols):
-        # Risk level calculation
-        merged_data['risk_score'] = (
-            (merged_data['priority'] == 'Express') * 0.3 +
-            (merged_data['traffic_delay_hours'] > 2) * 0.2 +
-            (merged_data['weather_impact'] != 'None') * 0.2 +
-            (merged_data['distance_km'] > 500) * 0.15 +
-            (merged_data['product_category'].isin(['Electronics', 'Healthcare'])) * 0.15
-        )
-        
-        # Classify risk levels
-        merged_data['risk_level'] = pd.cut(
-            merged_data['risk_score'],
-            bins=[0, 0.3, 0.6, 1],
-            labels=['Low', 'Medium', 'High']
-        )
-        
-        # Display high-risk orders
-        high_risk_orders = merged_data[merged_data['risk_level'] == 'High'].head(5)
-        
-        if not high_risk_orders.empty:
-            st.markdown("### ⚠️ High-Risk Orders (Predicted Delays)")
-            
-            for _, row in high_risk_orders.iterrows():
-                st.markdown(f"""
-                <div class="warning-card">
-                    <strong>Order ID: {row['order_id']}</strong><br>
-                    From: {row.get('origin_warehouse', 'Unknown')} → 
-                    To: {row.get('destination_city', 'Unknown')}<br>
-                    Priority: {row['priority']} | Product: {row['product_category']}<br>
-                    Risk Factors: Weather: {row['weather_impact']}, Traffic: {row['traffic_delay_hours']:.1f} hrs<br>
-                    <em>Recommended Action: Assign premium carrier, add buffer time</em>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Visualizations
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            risk_distribution = merged_data['risk_level'].value_counts().reset_index()
-            risk_distribution.columns = ['risk_level', 'count']
-            fig1 = px.pie(
-                risk_distribution,
-                names='risk_level',
-                values='count',
-                title='Order Risk Level Distribution',
-                color='risk_level',
-                color_discrete_map={'High': '#EF4444', 'Medium': '#F59E0B', 'Low': '#10B981'}
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-        
-        with col2:
-            features = pd.DataFrame({
-                'feature': ['Priority', 'Traffic', 'Weather', 'Distance', 'Product Type'],
-                'importance': [0.3, 0.2, 0.2, 0.15, 0.15]
-            })
-            fig2 = px.bar(
-                features,
-                x='importance',
-                y='feature',
-                orientation='h',
-                title='Delay Risk Factors Importance',
-                color='importance',
-                color_continuous_scale='RdYlGn_r'
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-    
-    else:
-        st.warning("Some required data columns are missing for delay prediction")
-        missing = [col for col in required_cols if col not in merged_data.columns]
-        st.info(f"Missing columns: {missing}")
-    
-    # Real-time prediction
-    st.markdown("### 🔍 Predict Delay for New Order")
-    
-    with st.form("prediction_form"):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            priority = st.selectbox("Priority", ["Express", "Standard", "Economy"])
-            origin = st.selectbox("Origin", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"])
-            product = st.selectbox("Product Category", ["Electronics", "Fashion", "Food & Beverage", 
-                                                       "Healthcare", "Industrial", "Books", "Home Goods"])
-        
-        with col2:
-            distance = st.slider("Distance (km)", 10, 1500, 500)
-            weather = st.selectbox("Weather Forecast", ["None", "Rain", "Heat", "Fog", "Storm"])
-            traffic = st.slider("Expected Traffic Delay (hours)", 0.0, 5.0, 1.0)
-        
-        submitted = st.form_submit_button("Predict Delay Probability")
-        
-        if submitted:
-            risk_score = (
-                (priority == 'Express') * 0.3 +
-                (traffic > 2) * 0.2 +
-                (weather != 'None') * 0.2 +
-                (distance > 500) * 0.15 +
-                (product in ['Electronics', 'Healthcare']) * 0.15
-            )
-            
-            delay_prob = min(risk_score * 100, 95)
-            
-            if delay_prob > 60:
-                st.error(f"⚠️ High Delay Risk: {delay_prob:.1f}% probability")
-                st.info("**Recommendations:** Assign to premium carrier, add 25% buffer time, use GPS tracking")
-            elif delay_prob > 30:
-                st.warning(f"⚠️ Moderate Delay Risk: {delay_prob:.1f}% probability")
-                st.info("**Recommendations:** Monitor closely, consider alternative route")
-            else:
-                st.success(f"✅ Low Delay Risk: {delay_prob:.1f}% probability")
-                st.info("**Recommendations:** Proceed as planned")
-
-elif page == "📈 Performance Analytics":
-    st.markdown('<h2 class="sub-header">Performance Analytics</h2>', unsafe_allow_html=True)
-    
-    if 'carrier' in merged_data.columns:
-        carrier_performance = merged_data.groupby('carrier').agg({
-            'order_id': 'count',
-            'delayed': 'mean' if 'delayed' in merged_data.columns else None,
-            'customer_rating': 'mean' if 'customer_rating' in merged_data.columns else None,
-            'delivery_cost': 'mean' if 'delivery_cost' in merged_data.columns else None
-        }).reset_index()
-        
-        # Create scatter plot with available data
-        x_col = 'delayed' if 'delayed' in merged_data.columns else 'order_id'
-        y_col = 'customer_rating' if 'customer_rating' in merged_data.columns else 'order_id'
-        color_col = 'delivery_cost' if 'delivery_cost' in merged_data.columns else 'order_id'
-        
-        fig1 = px.scatter(
-            carrier_performance,
-            x=x_col,
-            y=y_col,
-            size='order_id',
-            color=color_col,
-            hover_name='carrier',
-            title='Carrier Performance Matrix',
-            labels={x_col: 'Delay Rate' if x_col == 'delayed' else 'Order Count',
-                    y_col: 'Avg Rating' if y_col == 'customer_rating' else 'Order Count'}
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-    
-    # Time series
-    if 'order_date' in merged_data.columns:
-        merged_data['order_week'] = pd.to_datetime(merged_data['order_date']).dt.isocalendar().week
-        
-        weekly_data = merged_data.groupby('order_week').agg({
-            'order_id': 'count',
-            'delayed': 'mean' if 'delayed' in merged_data.columns else None,
-            'customer_rating': 'mean' if 'customer_rating' in merged_data.columns else None
-        }).reset_index()
-        
-        fig2 = go.Figure()
-        
-        if 'delayed' in weekly_data.columns and not weekly_data['delayed'].isna().all():
-            fig2.add_trace(go.Scatter(
-                x=weekly_data['order_week'],
-                y=weekly_data['delayed'],
-                name='Delay Rate',
-                line=dict(color='#EF4444')
-            ))
-        
-        if 'customer_rating' in weekly_data.columns and not weekly_data['customer_rating'].isna().all():
-            fig2.add_trace(go.Scatter(
-                x=weekly_data['order_week'],
-                y=weekly_data['customer_rating'],
-                name='Customer Rating',
-                line=dict(color='#10B981')
-            ))
-        
-        if len(fig2.data) > 0:
-            fig2.update_layout(
-                title='Weekly Performance Trends',
-                xaxis_title='Week Number',
-                height=400
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-    
-    # Cost analysis
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if 'priority' in merged_data.columns and 'delivery_cost' in merged_data.columns:
-            cost_data = merged_data.groupby('priority')['delivery_cost'].mean().reset_index()
-            fig3 = px.bar(
-                cost_data,
-                x='priority',
-                y='delivery_cost',
-                title='Average Cost by Priority',
-                color='priority'
-            )
-            st.plotly_chart(fig3, use_container_width=True)
-    
-    with col2:
-        if 'carrier' in merged_data.columns and 'delivery_cost' in merged_data.columns:
-            carrier_cost = merged_data.groupby('carrier')['delivery_cost'].mean().reset_index()
-            fig4 = px.bar(
-                carrier_cost,
-                x='carrier',
-                y='delivery_cost',
-                title='Average Cost by Carrier',
-                color='carrier'
-            )
-            st.plotly_chart(fig4, use_container_width=True)
+# The selected page is timed as a whole; its figures and rollups show up as
+# nested stages. Only its module is imported.
+with stage('app.page:' + page.split(' ', 1)[1]):
+    render(page, ctx)
 
-elif page == "🗺️ Route Optimization":
-    st.markdown('<h2 class="sub-header">Route Optimization Dashboard</h2>', unsafe_allow_html=True)
-    
-    # Optimization recommendations
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div class="success-card">
-            <h4>🚀 Quick Wins</h4>
-            1. **Consolidate Mumbai-Bangalore shipments**<br>
-            - Save 15% on fuel costs<br>
-            - Reduce 20% transit time<br>
-            <br>
-            2. **Avoid Delhi peak hours (8-11 AM)**<br>
-            - Reduce traffic delays by 30%<br>
-            - Improve on-time delivery by 25%
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="success-card">
-            <h4>📈 Strategic Improvements</h4>
-            1. **Implement dynamic routing**<br>
-            - Real-time traffic updates<br>
-            - Weather-adjusted routes<br>
-            <br>
-            2. **Carrier optimization**<br>
-            - Match carriers to route characteristics<br>
-            - Leverage regional carrier strengths
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Interactive route planner
-    st.markdown("### 🗺️ Interactive Route Planner")
-    
-    with st.form("route_planner"):
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            from_city = st.selectbox("From City", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"])
-            vehicle_type = st.selectbox("Vehicle Type", ["Van", "Truck", "Refrigerated", "Bike"])
-        
-        with col2:
-            to_city = st.selectbox("To City", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata", 
-                                             "Hyderabad", "Pune", "Ahmedabad", "Jaipur"])
-            priority_level = st.selectbox("Priority Level", ["Express", "Standard", "Economy"])
-        
-        with col3:
-            cargo_value = st.number_input("Cargo Value (₹)", min_value=100, max_value=100000, value=5000)
-            weather_cond = st.selectbox("Weather Conditions", ["Clear", "Rain", "Heat", "Fog", "Storm"])
-        
-        optimize_for = st.radio("Optimize for:", ["Cost", "Time", "Sustainability", "Balanced"])
-        
-        if st.form_submit_button("Plan Optimal Route"):
-            if from_city == to_city:
-                st.warning("Source and destination cannot be the same")
-            else:
-                # Simulate route calculation
-                distance = np.random.randint(100, 1000)
-                time = np.random.randint(2, 24)
-                cost = np.random.randint(500, 5000)
-                emissions = np.random.randint(50, 500)
-                carrier = np.random.choice(['Carrier A', 'Carrier B', 'Carrier C'])
-                
-                st.success(f"✅ Optimal Route Planned: {from_city} → {to_city}")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Distance", f"{distance} km")
-                with col2:
-                    st.metric("Estimated Time", f"{time} hours")
-                with col3:
-                    st.metric("Estimated Cost", f"₹{cost}")
-                with col4:
-                    st.metric("CO2 Emissions", f"{emissions} kg")
-                
-                st.info(f"""
-                **Route Details:**
-                - Suggested Carrier: {carrier}
-                - Recommended Departure: Tomorrow 8:00 AM
-                - Alternative Route Available: {from_city} → Hyderabad → {to_city} (adds 2 hours, saves 15% cost)
-                - Risk Level: {'Low' if distance < 500 else 'Medium' if distance < 800 else 'High'}
-                """)
-    
-    # Route analysis chart
-    if 'origin_warehouse' in merged_data.columns and 'destination_city' in merged_data.columns:
-        route_counts = merged_data.groupby(['origin_warehouse', 'destination_city']).size().reset_index(name='count')
-        route_counts = route_counts.sort_values('count', ascending=False).head(10)
-        
-        fig = px.bar(
-            route_counts,
-            x='count',
-            y='origin_warehouse',
-            color='destination_city',
-            title='Top 10 Busiest Routes',
-            orientation='h',
-            labels={'count': 'Number of Deliveries', 'origin_warehouse': 'Origin'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+get_session_registry().record(session_key, ctx.session_bytes())
 
-else:  # Settings & Export
-    st.markdown('<h2 class="sub-header">Settings & Data Export</h2>', unsafe_allow_html=True)
-    
-    # Data export
-    st.markdown("### 📥 Export Data")
-    
-    # Add to your export section
-    export_format = st.selectbox("Select Export Format", ["CSV", "JSON", "Excel (.xlsx)"])
-    if export_format == "Excel (.xlsx)":
-        # This requires the 'openpyxl' engine
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            merged_data.to_excel(writer, sheet_name='Master_Data', index=False)
-        st.download_button(label="Download Excel", data=buffer, file_name="logistics_export.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-        
-    if st.button("Generate Export File"):
-        if export_format == "CSV":
-            csv = merged_data.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"logistics_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
-        else:
-            json_str = merged_data.to_json(orient='records', indent=2)
-            st.download_button(
-                label="Download JSON",
-                data=json_str,
-                file_name=f"logistics_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
-            )
-    
-    # Settings
-    st.markdown("### ⚙️ Dashboard Settings")
-    
-    update_frequency = st.select_slider(
-        "Data Refresh Frequency",
-        options=["Real-time", "15 minutes", "1 hour", "4 hours", "Daily"]
-    )
-    
-    notification_threshold = st.slider(
-        "Delay Alert Threshold",
-        min_value=0.0,
-        max_value=1.0,
-        value=0.6,
-        help="Get alerts when delay probability exceeds this threshold"
-    )
-    
-    if st.button("Save Settings"):
-        st.success("Settings saved successfully!")
-    
-    # About section
-    st.markdown("---")
-    st.markdown("### ℹ️ About This Dashboard")
-    st.markdown("""
-    **Predictive Delivery Optimizer v1.0**
-    
-    This dashboard helps NexGen Logistics:
-    - Predict delivery delays before they occur
-    - Optimize routing and carrier assignments
-    - Improve customer satisfaction
-    - Reduce operational costs by 15-20%
-    
-    **Key Features:**
-    ✅ Real-time delay prediction
-    ✅ Route optimization suggestions
-    ✅ Carrier performance analytics
-    ✅ Executive KPI dashboard
-    ✅ Data export functionality
-    
-    **Technology Stack:**
-    - Python 3.8+
-    - Streamlit (Web Framework)
-    - Pandas (Data Processing)
-    - Plotly (Visualizations)
-    - Scikit-learn (Machine Learning)
-    
-    For support, contact: analytics@nexgenlogistics.com
-    """)
+# Background alerting, started once per process after the first page is out
+if load_error is None:
+    get_alert_worker()
 
 # Footer
 st.markdown("---")
@@ -755,4 +221,43 @@ with st.sidebar:
             data=csv,
             file_name="sample_logistics_data.csv",
             mime="text/csv"
-        )
\ No newline at end of file
+        )
+
+# Performance panel, drawn last so it covers the whole run
+if tracer.active:
+    run_records, run_seconds = tracer.current_run()
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏱️ Performance")
+        st.caption(f"This run: {run_seconds * 1000:,.0f} ms, {len(run_records)} stages")
+        figure_cache = get_figure_cache()
+        st.caption(f"Figure cache: {figure_cache.hits:,} hits, {figure_cache.misses:,} builds")
+        if run_records:
+            run_records.sort(key=lambda r: r['started_at'])
+            st.dataframe(pd.DataFrame({
+                'Stage': ['· ' * r['depth'] + r['stage'] for r in run_records],
+                'ms': [round(r['seconds'] * 1000, 1) for r in run_records],
+                'Rows': pd.array([r['rows'] for r in run_records], dtype='Int64'),
+                'Δ MB': [round(r['memory_delta_bytes'] / 2**20, 1) for r in run_records],
+            }), hide_index=True, use_container_width=True)
+        with st.expander("All runs (p50 / p95)"):
+            summary = pd.DataFrame(tracer.summary())
+            if not summary.empty:
+                st.dataframe(pd.DataFrame({
+                    'Stage': summary['stage'],
+                    'Calls': summary['count'],
+                    'p50 ms': (summary['p50_seconds'] * 1000).round(1),
+                    'p95 ms': (summary['p95_seconds'] * 1000).round(1),
+                }), hide_index=True, use_container_width=True)
+        st.download_button(
+            "Prometheus metrics", tracer.prometheus_text(), file_name="metrics.prom", mime="text/plain"
+        )
+        st.download_button(
+            "Stage records (JSON lines)", tracer.jsonl(), file_name="stages.jsonl", mime="application/x-ndjson"
+        )
+
+# Stage records for monitoring, when configured
+if tracer.active and os.environ.get(TRACE_LOG_ENV):
+    tracer.write_jsonl(os.environ[TRACE_LOG_ENV])
+if tracer.active and os.environ.get(TRACE_PROM_ENV):
+    tracer.write_prometheus(os.environ[TRACE_PROM_ENV])
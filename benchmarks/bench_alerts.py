@@ -0,0 +1,69 @@
+# Throughput and evaluation lag of the alert worker when changed orders
+# arrive at a steady rate, with ~10% of orders over the threshold and a share
+# of them repeating.
+#
+#   python benchmarks/bench_alerts.py [--rate 5000] [--batch 500] [--seconds 10]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import AlertEngine, AlertWorker, QueueSink  # noqa: E402
+
+WAREHOUSES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def make_batch(rng, size, id_space):
+    return pd.DataFrame({
+        'order_id': [f'ORD{i:09d}' for i in rng.integers(0, id_space, size)],
+        'priority': rng.choice(['Express', 'Standard', 'Economy'], size),
+        'origin_warehouse': rng.choice(WAREHOUSES, size),
+        'destination_city': rng.choice(WAREHOUSES, size),
+        'carrier': rng.choice(['QuickShip', 'SpeedyLogistics', 'GlobalTransit'], size),
+        'status': pd.Series([None] * size, dtype=object),
+    }), pd.DataFrame({'risk_score': rng.random(size) * 0.67})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=int, default=5000, help="Changed orders per second")
+    parser.add_argument('--batch', type=int, default=500, help="Orders per refresh")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    sink = QueueSink(maxsize=100_000)
+    engine = AlertEngine(threshold=0.6, sinks=[sink])
+    worker = AlertWorker(engine, lambda orders, risk: risk['risk_score'].to_numpy(), poll_seconds=0.05).start()
+
+    # Order ids drawn from a space a few times the total volume, so some
+    # orders change more than once and exercise de-duplication
+    total = int(args.rate * args.seconds)
+    batches = [make_batch(rng, args.batch, total * 3) for _ in range(max(total // args.batch, 1))]
+    interval = args.batch / args.rate
+    start = time.perf_counter()
+    for i, (orders, risk) in enumerate(batches):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        worker.submit(orders, risk)
+    while worker.backlog:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    worker.stop()
+
+    stats = engine.stats.as_dict()
+    print(f"offered {args.rate:,} orders/s in batches of {args.batch:,} for {args.seconds:.0f} s")
+    print(f"  evaluated {stats['evaluated']:,} orders ({stats['evaluated'] / elapsed:,.0f}/s), "
+          f"{stats['alerts']:,} alerts, {stats['suppressed']:,} suppressed")
+    print(f"  evaluation lag p95 {stats['lag_p95_seconds'] * 1000:.1f} ms, max {stats['lag_max_seconds'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
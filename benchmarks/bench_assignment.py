@@ -0,0 +1,106 @@
+# Solve time of the batch vehicle assignment on synthetic open orders and
+# fleets, with a capacity check and the total cost of a greedy baseline.
+#
+#   python benchmarks/bench_assignment.py [--orders 5000] [--vehicles 300]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet_assignment import (  # noqa: E402
+    CATEGORY_VALUE_PER_KG, DISPATCH_OBJECTIVES, assign_vehicles, estimate_weight_kg, trip_matrices,
+)
+from route_planner import RoutePlanner  # noqa: E402
+
+VEHICLE_TYPES = {
+    # type: (capacity kg range, km per litre, kg CO2 per km)
+    'Express_Bike': ((20, 80), 35.0, 0.08),
+    'Small_Van': ((500, 1500), 10.0, 0.26),
+    'Refrigerated': ((1000, 3000), 6.5, 0.42),
+    'Large_Truck': ((5000, 10000), 5.5, 0.46),
+}
+HANDLING = ['None', 'None', 'None', 'Fragile', 'Hazmat', 'Temperature_Controlled']
+
+
+def make_orders(n_orders, cities, seed=42):
+    rng = np.random.default_rng(seed)
+    categories = list(CATEGORY_VALUE_PER_KG)
+    return pd.DataFrame({
+        'order_id': [f'ORD{i:08d}' for i in range(n_orders)],
+        'origin_warehouse': rng.choice(cities, n_orders),
+        'destination_city': rng.choice(cities, n_orders),
+        'product_category': rng.choice(categories, n_orders),
+        'order_value': rng.lognormal(7.2, 1.0, n_orders),
+        'special_handling': rng.choice(HANDLING, n_orders),
+    })
+
+
+def make_fleet(n_vehicles, cities, seed=42):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(list(VEHICLE_TYPES), n_vehicles)
+    spec = [VEHICLE_TYPES[t] for t in types]
+    return pd.DataFrame({
+        'vehicle_id': [f'VEH{i:05d}' for i in range(n_vehicles)],
+        'vehicle_type': types,
+        'capacity_kg': [rng.uniform(*s[0]) for s in spec],
+        'fuel_efficiency_km_per_l': [s[1] for s in spec],
+        'current_location': rng.choice(cities, n_vehicles),
+        'status': 'Available',
+        'co2_kg_per_km': [s[2] for s in spec],
+    })
+
+
+def greedy_assignment(orders, vehicles, planner, objective):
+    # Baseline: each order in turn takes the cheapest vehicle it still fits
+    weight = estimate_weight_kg(orders)
+    matrices, feasible = trip_matrices(orders, vehicles, planner)
+    costs = matrices[DISPATCH_OBJECTIVES[objective]]
+    capacity = vehicles['capacity_kg'].to_numpy(dtype=np.float64).copy()
+    total, placed = 0.0, 0
+    for i in range(len(orders)):
+        options = np.where(feasible[i] & (weight[i] <= capacity), costs[i], np.inf)
+        best = int(np.argmin(options))
+        if np.isfinite(options[best]):
+            capacity[best] -= weight[i]
+            total += options[best]
+            placed += 1
+    return placed, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--vehicles', type=int, default=300)
+    parser.add_argument('--objective', choices=list(DISPATCH_OBJECTIVES), default='Cost')
+    args = parser.parse_args()
+
+    planner = RoutePlanner.from_data()
+    orders = make_orders(args.orders, planner.cities)
+    vehicles = make_fleet(args.vehicles, planner.cities)
+    metric = DISPATCH_OBJECTIVES[args.objective]
+
+    start = time.perf_counter()
+    assignment = assign_vehicles(orders, vehicles, planner, args.objective)
+    elapsed = time.perf_counter() - start
+
+    placed = assignment['vehicle_id'].notna()
+    load = assignment[placed].groupby('vehicle_id')['weight_kg'].sum()
+    capacity = vehicles.set_index('vehicle_id')['capacity_kg'].reindex(load.index)
+    assert (load <= capacity + 1e-6).all(), 'vehicle loaded past capacity'
+
+    print(f"assignment  {args.orders:,} orders x {args.vehicles:,} vehicles  {elapsed:.2f} s")
+    print(f"  placed {int(placed.sum()):,} orders, {metric} {assignment[metric].sum():,.0f}")
+
+    start = time.perf_counter()
+    greedy_placed, greedy_total = greedy_assignment(orders, vehicles, planner, args.objective)
+    print(f"greedy      {time.perf_counter() - start:.2f} s")
+    print(f"  placed {greedy_placed:,} orders, {metric} {greedy_total:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
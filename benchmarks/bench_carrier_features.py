@@ -0,0 +1,87 @@
+# Carrier history features: folding newly landed deliveries into the store
+# against rebuilding it from the whole history, and serving the features for
+# a batch and for single orders against a decayed groupby over the history.
+#
+#   python benchmarks/bench_carrier_features.py [--deliveries 1000000] [--append 1000] [--orders 100000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carrier_features import HALF_LIFE_DAYS, CarrierFeatureStore, delivery_sums  # noqa: E402
+
+CARRIERS = ['SpeedyLogistics', 'QuickShip', 'GlobalTransit', 'ReliableExpress', 'EcoDeliver']
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Jaipur']
+
+
+def make_deliveries(n, rng, start_day=0):
+    # Completed deliveries over a year with a per-carrier delay rate
+    carrier = rng.integers(0, len(CARRIERS), n)
+    delayed = rng.random(n) < 0.15 + 0.08 * carrier
+    return pd.DataFrame({
+        'carrier': pd.Categorical.from_codes(carrier, CARRIERS),
+        'origin_warehouse': pd.Categorical.from_codes(rng.integers(0, len(CITIES), n), CITIES),
+        'destination_city': pd.Categorical.from_codes(rng.integers(0, len(CITIES), n), CITIES),
+        'order_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(start_day + rng.integers(0, 365, n), unit='D'),
+        'actual_delivery_days': rng.integers(1, 8, n).astype(np.float64),
+        'delayed': delayed.astype(np.float64),
+        'delay_days': np.where(delayed, rng.integers(1, 4, n), 0).astype(np.float64),
+        'customer_rating': rng.integers(1, 6, n).astype(np.float64),
+    })
+
+
+def groupby_lookup(history, orders):
+    # The store's carrier delay rate recomputed from the history per batch
+    sums, _ = delivery_sums(history)
+    carriers = sums.groupby(level='carrier', observed=True).sum()
+    rate = carriers['delayed'] / carriers['weight']
+    return orders['carrier'].astype(object).map(rate)
+
+
+def best_of(repeats, func):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--deliveries', type=int, default=1_000_000)
+    parser.add_argument('--append', type=int, default=1_000)
+    parser.add_argument('--orders', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    history = make_deliveries(args.deliveries, rng)
+    added = make_deliveries(args.append, rng, start_day=365)
+    orders = make_deliveries(args.orders, rng)
+    store = CarrierFeatureStore.from_frame(history)
+    print(f"{args.deliveries:,} deliveries, {len(store.lane_table):,} lanes, half-life {HALF_LIFE_DAYS:g} days")
+
+    rebuild = best_of(args.repeats, lambda: CarrierFeatureStore.from_frame(pd.concat([history, added])))
+    update = best_of(args.repeats, lambda: CarrierFeatureStore(store.lanes, store.latest_day).update(added))
+    print(f"rebuild        {rebuild * 1000:10.1f} ms")
+    print(f"update {args.append:>7,} {update * 1000:10.1f} ms  {rebuild / update:8.1f}x")
+
+    groupby = best_of(args.repeats, lambda: groupby_lookup(history, orders))
+    lookup = best_of(args.repeats, lambda: store.lookup(orders))
+    print(f"groupby batch  {groupby * 1000:10.1f} ms  ({args.orders:,} orders)")
+    print(f"lookup batch   {lookup * 1000:10.1f} ms  {groupby / lookup:8.1f}x  {args.orders / lookup:12,.0f} orders/s")
+
+    records = orders.head(10_000).astype({column: object for column in ['carrier', 'origin_warehouse', 'destination_city']})
+    records = records.to_dict('records')
+    one = best_of(args.repeats, lambda: [store.lookup_one(order) for order in records]) / len(records)
+    print(f"lookup_one     {one * 1e6:10.2f} us per order")
+
+
+if __name__ == '__main__':
+    main()
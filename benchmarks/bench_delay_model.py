@@ -0,0 +1,112 @@
+# Training time, artifact load time and inference latency of the delay model.
+#
+#   python benchmarks/bench_delay_model.py [--train-rows 100000]
+#
+# Trains on synthetic orders shaped like the merged frame, saves the artifact
+# to a temporary directory, reloads it the way the app does, then reports
+# p50/p99 latency for single-order and 100k-order batch predictions.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_model import load_delay_model, model_features  # noqa: E402
+from train_model import save_delay_model, train_delay_model  # noqa: E402
+
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def make_merged(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    priority = rng.choice(['Express', 'Standard', 'Economy'], n_rows, p=[0.3, 0.5, 0.2])
+    distance = rng.uniform(50, 5000, n_rows)
+    traffic = rng.uniform(0, 2, n_rows)
+    weather = rng.choice(['None', 'Light_Rain', 'Heavy_Rain', 'Fog'], n_rows, p=[0.6, 0.2, 0.1, 0.1])
+    promised = rng.integers(1, 10, n_rows).astype(np.float32)
+    # Lateness loosely driven by the same factors the model sees
+    lateness = (
+        (priority == 'Express') * 0.8 + (weather != 'None') * 0.7 + distance / 2500 + traffic * 0.5
+        + rng.normal(0, 1, n_rows)
+    )
+    return pd.DataFrame({
+        'priority': pd.Categorical(priority),
+        'product_category': pd.Categorical(rng.choice(
+            ['Electronics', 'Fashion', 'Food & Beverage', 'Healthcare', 'Industrial', 'Books', 'Home Goods'], n_rows
+        )),
+        'origin_warehouse': pd.Categorical(rng.choice(CITIES, n_rows)),
+        'destination_city': pd.Categorical(rng.choice(CITIES, n_rows)),
+        'customer_segment': pd.Categorical(rng.choice(['Enterprise', 'SMB', 'Individual'], n_rows)),
+        'weather_impact': pd.Categorical(weather),
+        'special_handling': pd.Categorical(rng.choice(['None', 'Fragile', 'Hazmat'], n_rows, p=[0.8, 0.15, 0.05])),
+        'distance_km': distance.astype(np.float32),
+        'traffic_delay_hours': traffic.astype(np.float32),
+        'order_value': rng.lognormal(7, 1.2, n_rows).astype(np.float32),
+        'promised_delivery_days': promised,
+        'actual_delivery_days': promised + np.round(np.maximum(lateness - 1, -1)).astype(np.float32),
+    })
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--train-rows', type=int, default=100_000)
+    parser.add_argument('--batch-rows', type=int, default=100_000)
+    parser.add_argument('--single-repeats', type=int, default=500)
+    parser.add_argument('--batch-repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    merged = make_merged(args.train_rows)
+    start = time.perf_counter()
+    pipeline, metrics = train_delay_model(merged)
+    print(f"train        {args.train_rows:>10,} rows  {time.perf_counter() - start:8.2f} s  "
+          f"(holdout auc {metrics.get('roc_auc', float('nan')):.3f})")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        path = save_delay_model(pipeline, metrics, model_dir)
+        start = time.perf_counter()
+        model = load_delay_model(path)
+        print(f"load         {os.path.getsize(path) / 1e6:>10.2f} MB    {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        # The fast inference path must agree with the fitted sklearn pipeline
+        sample = make_merged(2_000, seed=3)
+        expected = model.pipeline.predict_proba(model_features(sample))[:, 1]
+        if not np.allclose(model.predict_proba(sample), expected):
+            print("parity FAILED between DelayModel.predict_proba and the sklearn pipeline")
+            sys.exit(1)
+
+        order = {
+            'priority': 'Express', 'origin_warehouse': 'Mumbai', 'product_category': 'Electronics',
+            'distance_km': 500.0, 'weather_impact': 'None', 'traffic_delay_hours': 1.0,
+        }
+        model.predict_order(order)
+        timings = []
+        for _ in range(args.single_repeats):
+            start = time.perf_counter()
+            model.predict_order(order)
+            timings.append(time.perf_counter() - start)
+        p50, p99 = percentiles(timings)
+        print(f"single order                p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+
+        batch = make_merged(args.batch_rows, seed=7)
+        timings = []
+        for _ in range(args.batch_repeats):
+            start = time.perf_counter()
+            model.predict_proba(batch)
+            timings.append(time.perf_counter() - start)
+        p50, p99 = percentiles(timings)
+        print(f"batch        {args.batch_rows:>10,} rows  p50 {p50:8.2f} ms  p99 {p99:8.2f} ms  "
+              f"{args.batch_rows / (p50 / 1000):,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Latency of the indexed sidebar filters against chained boolean masks.
+#
+#   python benchmarks/bench_filters.py [--rows 10000000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filter_engine import FilterIndex  # noqa: E402
+
+WAREHOUSES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def make_orders(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 1000, n_rows), unit='D')
+    return pd.DataFrame({
+        'order_date': dates,
+        'priority': pd.Categorical.from_codes(rng.integers(0, 3, n_rows), ['Economy', 'Express', 'Standard']),
+        'origin_warehouse': pd.Categorical.from_codes(rng.integers(0, len(WAREHOUSES), n_rows), WAREHOUSES),
+    })
+
+
+def mask_filter(data, date_range, priorities, warehouses):
+    mask = (data['order_date'] >= pd.Timestamp(date_range[0])) & (data['order_date'] <= pd.Timestamp(date_range[1]))
+    data = data[mask]
+    data = data[data['priority'].isin(priorities)]
+    return data[data['origin_warehouse'].isin(warehouses)]
+
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_orders(args.rows)
+    start = time.perf_counter()
+    index = FilterIndex(data, cache_size=0)
+    print(f"build index   {args.rows:>12,} rows  {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+    cases = {
+        '30 days, 2 priorities, 3 warehouses': (
+            ('2025-08-01', '2025-08-31'), ['Express', 'Standard'], ['Mumbai', 'Delhi', 'Pune']
+        ),
+        'full range, all filters': (('2023-01-01', '2025-12-31'), ['Express', 'Standard', 'Economy'], WAREHOUSES),
+    }
+    for name, (date_range, priorities, warehouses) in cases.items():
+        mask_ms, expected = best_of(lambda: mask_filter(data, date_range, priorities, warehouses), args.repeats)
+        index_ms, positions = best_of(lambda: index.select(date_range, priorities, warehouses), args.repeats)
+        if not np.array_equal(positions, data.index.get_indexer(expected.index)):
+            print(f"MISMATCH for {name}")
+            sys.exit(1)
+        print(f"{name:<38} masks {mask_ms:9.1f} ms  index {index_ms:9.1f} ms  ({len(positions):,} rows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Coordinates, distances and nearest warehouses for a column of city names:
+# the geo index's array lookups against a per-row dict lookup in .map, for
+# string and categorical columns.
+#
+#   python benchmarks/bench_geo.py [--rows 5000000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo import CITY_COORDS, INDIA_CENTER, GeoIndex, haversine_km  # noqa: E402
+
+WAREHOUSES = {f'WH{i:03d}_{city}': city for i, city in enumerate(list(CITY_COORDS)[:8], start=1)}
+
+
+def best_of(repeats, func):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def per_row_coordinates(values):
+    coords = {name: {'lat': lat, 'lon': lon} for name, (lat, lon) in CITY_COORDS.items()}
+    lat = values.map(lambda x: coords.get(x, {}).get('lat', INDIA_CENTER['lat'])).astype(float)
+    lon = values.map(lambda x: coords.get(x, {}).get('lon', INDIA_CENTER['lon'])).astype(float)
+    return lat, lon
+
+
+def per_row_distance(origins, destinations):
+    lat1, lon1 = per_row_coordinates(origins)
+    lat2, lon2 = per_row_coordinates(destinations)
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    geo = GeoIndex.build(CITY_COORDS, WAREHOUSES)
+    names = list(CITY_COORDS) + ['Unknown']
+    origins = pd.Series(np.array(names, dtype=object)[rng.integers(0, len(names), args.rows)])
+    destinations = pd.Series(np.array(names, dtype=object)[rng.integers(0, len(names), args.rows)])
+    columns = {'str': (origins, destinations), 'category': (origins.astype('category'), destinations.astype('category'))}
+    print(f"{args.rows:,} rows, {len(geo.names)} locations ({len(geo.warehouses)} warehouses)")
+
+    print(f"{'':<22} {'per-row map':>12} {'geo index':>10} {'speedup':>8}")
+    for kind, (o, d) in columns.items():
+        for name, slow, fast in [
+            ('coordinates', lambda: per_row_coordinates(o), lambda: geo.coordinates(o)),
+            ('distance', lambda: per_row_distance(o, d), lambda: geo.distance(o, d)),
+        ]:
+            slow_s, fast_s = best_of(args.repeats, slow), best_of(args.repeats, fast)
+            print(f"{name + ' (' + kind + ')':<22} {slow_s * 1000:9.0f} ms {fast_s * 1000:7.0f} ms {slow_s / fast_s:7.1f}x")
+
+    nearest = best_of(args.repeats, lambda: geo.nearest_warehouse(columns['category'][0]))
+    lat, lon = rng.uniform(8, 30, args.rows), rng.uniform(68, 90, args.rows)
+    nearest_at = best_of(args.repeats, lambda: geo.nearest_warehouse_at(lat, lon))
+    print(f"nearest warehouse by name          {nearest * 1000:7.0f} ms")
+    print(f"nearest warehouse by coordinates   {nearest_at * 1000:7.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Incremental refresh against a full reload after rows are appended to the
+# order feeds. The sample extracts in data/ are tiled to --orders rows in a
+# temporary directory.
+#
+#   python benchmarks/bench_ingest.py [--orders 1000000] [--append 1000]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carrier_features import CarrierFeatureStore  # noqa: E402
+from data_loader import SOURCE_FILES, load_and_merge_all_data  # noqa: E402
+from ingest import APPEND_TABLES, IncrementalLoader  # noqa: E402
+from prediction_model import RiskEngine  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def tile_sources(n_orders, start=0):
+    # Copies of the sample rows with fresh order ids ORD<start..start+n>;
+    # returns the frames so they can be appended
+    frames = {}
+    for name in APPEND_TABLES:
+        sample = pd.read_csv(os.path.join(DATA_PATH, SOURCE_FILES[name]), keep_default_na=False)
+        ids = sample['Order_ID'].str[3:].astype(int) - 1
+        repeats = int(np.ceil(n_orders / 200))
+        tiled = pd.concat([sample] * repeats, ignore_index=True)
+        block = np.repeat(np.arange(repeats), len(sample))
+        new_ids = start + block * 200 + np.tile(ids.to_numpy(), repeats)
+        tiled['Order_ID'] = [f'ORD{i:09d}' for i in new_ids]
+        frames[name] = tiled[new_ids < start + n_orders]
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--append', type=int, default=1_000)
+    args = parser.parse_args()
+
+    target = tempfile.mkdtemp()
+    try:
+        for name, file_name in SOURCE_FILES.items():
+            if name not in APPEND_TABLES:
+                shutil.copy(os.path.join(DATA_PATH, file_name), os.path.join(target, file_name))
+        for name, frame in tile_sources(args.orders).items():
+            frame.to_csv(os.path.join(target, SOURCE_FILES[name]), index=False)
+
+        start = time.perf_counter()
+        loader = IncrementalLoader(target, engine=RiskEngine())
+        print(f"initial load   {args.orders:>10,} orders  {time.perf_counter() - start:8.2f} s")
+
+        for name, frame in tile_sources(args.append, start=args.orders).items():
+            frame.to_csv(os.path.join(target, SOURCE_FILES[name]), mode='a', header=False, index=False)
+
+        result = loader.refresh()
+        print(f"refresh        {result['added']:>10,} new     {result['seconds']:8.2f} s")
+
+        start = time.perf_counter()
+        full = load_and_merge_all_data(target, use_cache=False)
+        engine = RiskEngine()
+        engine.score_frame(full, features=CarrierFeatureStore.from_frame(full) if engine.feature_columns else None)
+        print(f"full reload    {len(full):>10,} orders  {time.perf_counter() - start:8.2f} s")
+        assert len(full) == len(loader.merged), 'incremental store and full reload disagree on row count'
+    finally:
+        shutil.rmtree(target)
+
+
+if __name__ == '__main__':
+    main()
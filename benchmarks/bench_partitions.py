@@ -0,0 +1,89 @@
+# Date-window queries against the date-partitioned layout, compared with
+# loading the whole merged cache and filtering it in memory. Each query runs
+# in a fresh process, so its time and peak memory include nothing left over
+# from the others. Input data comes from synthetic_data.py.
+#
+#   python benchmarks/bench_partitions.py [--orders 1000000] [--history-days 730] [--windows 1 7 30 90 365]
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import load_and_merge_all_data, partition_manifest  # noqa: E402
+from synthetic_data import DEFAULT_END_DATE, generate  # noqa: E402
+
+# Run in the child: one query, timed after the imports
+CHILD = '''
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+import pandas as pd
+from data_loader import load_and_merge_all_data, load_date_range
+from filter_engine import FilterIndex
+from instrumentation import process_rss_bytes
+data_path, mode, days, end = sys.argv[2], sys.argv[3], int(sys.argv[4]), pd.Timestamp(sys.argv[5])
+date_range = (end - pd.Timedelta(days=days - 1), end)
+base = process_rss_bytes()
+start = time.perf_counter()
+if mode == 'partitions':
+    rows = len(load_date_range(data_path, date_range))
+else:
+    merged = load_and_merge_all_data(data_path)
+    rows = len(FilterIndex(merged, cache_size=0).select(date_range))
+seconds = time.perf_counter() - start
+# High-water mark of this process image; ru_maxrss would carry the parent's
+# over the exec
+with open('/proc/self/status') as f:
+    peak = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmHWM'))
+print(json.dumps({'rows': rows, 'seconds': seconds, 'memory_mb': (peak - base) / 1e6}))
+'''
+
+
+def query(data_path, mode, days, end):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, ROOT, data_path, mode, str(days), end],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--history-days', type=int, default=730)
+    parser.add_argument('--windows', type=int, nargs='+', default=[1, 7, 30, 90, 365])
+    parser.add_argument('--freq', choices=['month', 'day'], default='month')
+    parser.add_argument('--data-dir', help="Reuse synthetic data in this directory instead of a temporary one")
+    args = parser.parse_args()
+
+    data_path = args.data_dir or tempfile.mkdtemp()
+    try:
+        if not os.path.exists(os.path.join(data_path, 'orders.csv')):
+            generate(data_path, args.orders, days=args.history_days)
+        load_and_merge_all_data(data_path)
+        start = time.perf_counter()
+        manifest = partition_manifest(data_path, args.freq)
+        print(f"{args.orders:,} orders over {args.history_days} days, {len(manifest['partitions'])} partitions"
+              f" ({args.freq}) ready in {time.perf_counter() - start:.2f} s")
+
+        print(f"{'window':>8} {'rows':>10} {'full load + filter':>24} {'partitions':>22}")
+        for days in args.windows:
+            full = query(data_path, 'full', days, DEFAULT_END_DATE)
+            part = query(data_path, 'partitions', days, DEFAULT_END_DATE)
+            if full['rows'] != part['rows']:
+                print(f"  row count mismatch: {full['rows']} vs {part['rows']}")
+            print(f"{days:>6} d {part['rows']:>10,} {full['seconds'] * 1000:9.0f} ms {full['memory_mb']:8.0f} MB"
+                  f" {part['seconds'] * 1000:9.0f} ms {part['memory_mb']:7.0f} MB")
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
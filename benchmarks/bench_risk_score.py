@@ -0,0 +1,125 @@
+# Throughput of the vectorized risk scorer against a row-wise reference, and
+# of the batch explanations (factor contributions, top factors and
+# recommended actions) over the same orders.
+#
+#   python benchmarks/bench_risk_score.py [--sizes 10000 1000000 10000000]
+#
+# Before timing, the batch scores are checked against reference_risk_score
+# (the original per-row formula) and calculate_risk_score on a sample, and the
+# explanations' contributions against the scores; the script exits non-zero
+# on mismatch.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from explanations import RiskExplainer  # noqa: E402
+from prediction_model import PEAK_HOURS, RiskEngine, calculate_risk_score, calculate_risk_scores  # noqa: E402
+
+WEIGHTS = {
+    'priority': 0.25,
+    'traffic': 0.2,
+    'weather': 0.15,
+    'distance': 0.15,
+    'carrier_history': 0.15,
+    'time_of_day': 0.1,
+}
+
+
+def reference_risk_score(row, weights):
+    score = 0
+    score += weights['priority'] * (row['priority'] == 'Express')
+    score += weights['traffic'] * (row['traffic_delay_hours'] > 2)
+    score += weights['weather'] * (row['weather_impact'] != 'None')
+    score += weights['distance'] * (row['distance_km'] > 500)
+    score += weights['carrier_history'] * (row['carrier_avg_delay'] > 0.5)
+    score += weights['time_of_day'] * (row['hour_of_day'] in PEAK_HOURS)
+    return min(score, 1.0)
+
+
+def make_orders(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'priority': pd.Categorical.from_codes(
+            rng.integers(0, 3, n_rows), ['Economy', 'Express', 'Standard']
+        ),
+        'traffic_delay_hours': rng.uniform(0, 5, n_rows).astype(np.float32),
+        'weather_impact': pd.Categorical.from_codes(
+            rng.integers(-1, 4, n_rows), ['Fog', 'Heavy_Rain', 'Light_Rain', 'None']
+        ),
+        'distance_km': rng.uniform(10, 5000, n_rows).astype(np.float32),
+        'carrier_avg_delay': rng.uniform(0, 1, n_rows).astype(np.float32),
+        'hour_of_day': rng.integers(0, 24, n_rows).astype(np.int8),
+    })
+
+
+def check_parity(n_rows=10_000):
+    orders = make_orders(n_rows, seed=7)
+    expected = orders.apply(lambda row: reference_risk_score(row, WEIGHTS), axis=1).to_numpy()
+    actual = calculate_risk_scores(orders, WEIGHTS)
+    single = np.array([calculate_risk_score(row, WEIGHTS) for _, row in orders.head(500).iterrows()])
+    if not np.allclose(single, expected[:500]):
+        print("parity FAILED for calculate_risk_score")
+        return False
+    if not np.allclose(actual, expected):
+        mismatched = np.flatnonzero(~np.isclose(actual, expected))
+        print(f"parity FAILED on {len(mismatched)} of {n_rows} rows, first: {mismatched[:5]}")
+        return False
+    arrays = {name: orders[name].to_numpy() for name in orders.columns}
+    if not np.allclose(calculate_risk_scores(arrays, WEIGHTS), expected):
+        print("parity FAILED for dict-of-arrays input")
+        return False
+    explainer = RiskExplainer(RiskEngine(WEIGHTS))
+    if not np.allclose(explainer.explain(orders)[explainer.columns].sum(axis=1), expected, atol=1e-6):
+        print("parity FAILED for explanation contributions")
+        return False
+    print(f"parity OK on {n_rows:,} rows (DataFrame, dict of arrays and explanations)")
+    return True
+
+
+def bench(n_rows, repeats=3):
+    orders = make_orders(n_rows)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        calculate_risk_scores(orders, WEIGHTS)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"batch  {n_rows:>12,} rows  {best * 1000:10.1f} ms  {n_rows / best:16,.0f} rows/s")
+
+    explainer = RiskExplainer(RiskEngine(WEIGHTS))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        explainer.importance(explainer.explain(orders))
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"explain{n_rows:>12,} rows  {best * 1000:10.1f} ms  {n_rows / best:16,.0f} rows/s")
+
+    # The row-wise scorer is only timed on a slice; it is far too slow for 1M+
+    sample = orders.head(min(n_rows, 10_000))
+    start = time.perf_counter()
+    sample.apply(lambda row: reference_risk_score(row, WEIGHTS), axis=1)
+    elapsed = time.perf_counter() - start
+    print(f"row    {len(sample):>12,} rows  {elapsed * 1000:10.1f} ms  {len(sample) / elapsed:16,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    if not check_parity():
+        sys.exit(1)
+    for n_rows in args.sizes:
+        bench(n_rows, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Memory held by N dashboard sessions: one private copy of the merged frame
+# per session (what st.cache_data hands out) against one shared read-only
+# dataset with per-session row positions.
+#
+#   python benchmarks/bench_shared_data.py [--rows 1000000] [--sessions 50]
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_data import SharedDataset, frame_nbytes, process_rss_bytes  # noqa: E402
+
+WAREHOUSES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def make_merged(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    data = {
+        'order_id': [f'ORD{i:09d}' for i in range(n_rows)],
+        'order_date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 300, n_rows), unit='D'),
+        'priority': pd.Categorical.from_codes(rng.integers(0, 3, n_rows), ['Economy', 'Express', 'Standard']),
+        'origin_warehouse': pd.Categorical.from_codes(rng.integers(0, 8, n_rows), WAREHOUSES),
+        'destination_city': pd.Categorical.from_codes(rng.integers(0, 8, n_rows), WAREHOUSES),
+        'delayed': pd.array(rng.random(n_rows) < 0.4, dtype='boolean'),
+    }
+    for name in ['order_value', 'distance_km', 'delivery_cost', 'customer_rating', 'traffic_delay_hours']:
+        data[name] = rng.random(n_rows).astype(np.float32)
+    return pd.DataFrame(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--sessions', type=int, default=50)
+    args = parser.parse_args()
+
+    merged = make_merged(args.rows)
+    payload = pickle.dumps(merged)
+    mb = 2 ** 20
+
+    baseline = process_rss_bytes()
+    copies = [pickle.loads(payload) for _ in range(args.sessions)]
+    copied = process_rss_bytes() - baseline
+    print(f"private copies  {args.sessions} sessions  +{copied / mb:8.1f} MB RSS  ({copied / args.sessions / mb:.1f} MB/session)")
+    del copies
+
+    baseline = process_rss_bytes()
+    dataset = SharedDataset(pickle.loads(payload))
+    shared = process_rss_bytes() - baseline
+    # Each session holds the positions of its own 30-day window
+    dates = pd.date_range('2025-01-01', periods=args.sessions, freq='5D')
+    selections = [dataset.select((d, d + pd.Timedelta(days=30))) for d in dates]
+    per_session = [s.nbytes for s in selections]
+    run_rows = frame_nbytes(dataset.take(selections[0]))
+    total = process_rss_bytes() - baseline
+    print(f"shared dataset  {args.sessions} sessions  +{total / mb:8.1f} MB RSS  "
+          f"(dataset {shared / mb:.1f} MB, positions {np.mean(per_session) / mb:.2f} MB/session, "
+          f"rows copied during a run {run_rows / mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Cold start of the dashboard per page: each page's first run in a fresh
+# process (module imports, loading the store from the Parquet cache, the page
+# itself) and a rerun after it, driven through Streamlit's AppTest. Also lists
+# which of the heavier page-specific modules the first run imported.
+#
+#   python benchmarks/bench_startup.py [--repeats 3] [--app app.py]
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [
+    "📊 Executive Dashboard",
+    "🔮 Delay Predictions",
+    "📈 Performance Analytics",
+    "🗺️ Route Optimization",
+    "⚙️ Settings & Export",
+]
+# Streamlit imports plotly.graph_objects itself, and scikit-learn arrives with
+# the delay model, which the alert worker loads in its own thread
+HEAVY_MODULES = ['plotly.express', 'scipy.optimize', 'exporter', 'aiohttp']
+
+# Run in the child; streamlit itself is imported before the clock starts, as
+# a server process has it loaded before any session connects
+CHILD = '''
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+app, page, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(',')
+at = AppTest.from_file(app, default_timeout=600)
+at.session_state['page'] = page
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+imported = [name for name in heavy if name in sys.modules]
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({
+    'first_run': first,
+    'rerun': rerun,
+    'errors': [str(e.value) for e in at.exception],
+    'imported': imported,
+}))
+sys.stdout.flush()
+os._exit(0)
+'''
+
+
+def measure(app, page):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, app, page, ','.join(HEAVY_MODULES)],
+        cwd=os.path.dirname(app), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type=int, default=3, help="Fresh processes per page; the best is reported")
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    args = parser.parse_args()
+    app = os.path.abspath(args.app)
+
+    print(f"{'page':<26} {'first run':>10} {'rerun':>9}  heavy imports")
+    for page in PAGES:
+        runs = [measure(app, page) for _ in range(args.repeats)]
+        best = min(runs, key=lambda run: run['first_run'])
+        errors = sorted({error for run in runs for error in run['errors']})
+        print(f"{page:<26} {best['first_run'] * 1000:8.0f} ms {min(run['rerun'] for run in runs) * 1000:6.0f} ms"
+              f"  {', '.join(best['imported']) or '-'}")
+        for error in errors:
+            print(f"  error: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# Load test for scoring_service.py on localhost: concurrent clients each post
+# one order at a time to /predict for a fixed duration, then client-side
+# latency p50/p99 and throughput are printed next to the service's own
+# /metrics. Without --url a service is started for the run with the given
+# pool and batching settings; --max-batch 1 turns coalescing off.
+#
+#   python benchmarks/load_test_scoring.py [--concurrency 64] [--seconds 10] [--workers 2] [--max-batch 256]
+#   python benchmarks/load_test_scoring.py --url http://127.0.0.1:8090
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRIORITIES = ['Express', 'Standard', 'Economy']
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata']
+PRODUCTS = ['Electronics', 'Fashion', 'Food & Beverage', 'Healthcare', 'Industrial', 'Books', 'Home Goods']
+WEATHER = ['None', 'Rain', 'Heat', 'Fog', 'Storm']
+CARRIERS = ['SpeedyLogistics', 'ReliableExpress', 'QuickShip', 'GlobalTransit', 'EcoDeliver']
+
+
+def make_orders(n, rng):
+    # Orders like the prediction form's inputs
+    return [
+        {
+            'priority': PRIORITIES[rng.integers(len(PRIORITIES))],
+            'origin_warehouse': CITIES[rng.integers(len(CITIES))],
+            'product_category': PRODUCTS[rng.integers(len(PRODUCTS))],
+            'distance_km': int(rng.integers(10, 1500)),
+            'weather_impact': WEATHER[rng.integers(len(WEATHER))],
+            'traffic_delay_hours': round(float(rng.uniform(0, 5)), 1),
+            'carrier': CARRIERS[rng.integers(len(CARRIERS))],
+        }
+        for _ in range(n)
+    ]
+
+
+async def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f'{url}/health') as response:
+                    if response.status == 200:
+                        return await response.json()
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Scoring service at {url} did not come up")
+            await asyncio.sleep(0.2)
+
+
+async def client(session, url, orders, stop_at, latencies, failures):
+    i = 0
+    while time.perf_counter() < stop_at:
+        order = orders[i % len(orders)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with session.post(f'{url}/predict', json=order) as response:
+                await response.read()
+                ok = response.status == 200
+        except aiohttp.ClientError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            failures.append(1)
+
+
+async def run(url, concurrency, seconds, orders):
+    latencies, failures = [], []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        stop_at = start + seconds
+        await asyncio.gather(*[
+            client(session, url, orders[i::concurrency], stop_at, latencies, failures) for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        async with session.get(f'{url}/metrics') as response:
+            metrics = await response.json()
+    return np.array(latencies), len(failures), elapsed, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help="Test a running service instead of starting one")
+    parser.add_argument('--port', type=int, default=8095)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--no-model', action='store_true')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f'http://127.0.0.1:{args.port}'
+        command = [
+            sys.executable, os.path.join(ROOT, 'scoring_service.py'), '--port', str(args.port),
+            '--workers', str(args.workers), '--max-batch', str(args.max_batch), '--max-wait-ms', str(args.max_wait_ms),
+        ]
+        if args.no_model:
+            command.append('--no-model')
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        health = asyncio.run(wait_until_up(url))
+        orders = make_orders(10_000, np.random.default_rng(0))
+        print(f"{url}: model {health['model_version'] or 'none (rule-based)'}, {health['workers']} workers,"
+              f" batches of up to {health['max_batch']} within {health['max_wait_ms']:g} ms")
+        print(f"{args.concurrency} concurrent clients for {args.seconds:g} s")
+        latencies, failures, elapsed, metrics = asyncio.run(run(url, args.concurrency, args.seconds, orders))
+        if not len(latencies):
+            print(f"no successful requests ({failures} failed)")
+            return
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"client   {len(latencies):>8,} ok {failures:>5} failed  {len(latencies) / elapsed:9,.0f} req/s"
+              f"  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms")
+        print(f"service  {metrics['requests']:>8,} ok {metrics['errors']:>5} errors  {metrics['requests_per_sec']:9,.0f} req/s"
+              f"  p50 {metrics['latency_p50_ms']:7.1f} ms  p99 {metrics['latency_p99_ms']:7.1f} ms"
+              f"  batch mean {metrics['batch_size_mean']:.1f} max {metrics['batch_size_max']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
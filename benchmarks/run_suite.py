@@ -0,0 +1,215 @@
+# End-to-end benchmark suite: loading, merging, filtering (in memory and from
+# the date-partitioned layout), risk scoring and explanations, the page
+# aggregations and export, on synthetic source CSVs (synthetic_data.py) at
+# each size. Every stage records its best wall time over --repeats runs and
+# the peak growth of resident memory during the first run. Results are
+# compared against a stored baseline, and the script exits non-zero when a
+# stage got slower than the baseline by more than --tolerance.
+#
+#   python benchmarks/run_suite.py [--sizes 10k 1M 10M] [--repeats 3]
+#   python benchmarks/run_suite.py --sizes 10k 1M --save-baseline
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from data_loader import (  # noqa: E402
+    CACHE_DIR, ORDER_TABLES, PARTITION_DIR, clear_cache, load_and_merge_all_data, load_date_range, merge_tables,
+    partition_manifest, read_table,
+)
+from explanations import RiskExplainer  # noqa: E402
+from exporter import write_export  # noqa: E402
+from filter_engine import FilterIndex  # noqa: E402
+from instrumentation import process_rss_bytes  # noqa: E402
+from kpi_cube import KpiCube  # noqa: E402
+from prediction_model import RiskEngine  # noqa: E402
+from synthetic_data import generate  # noqa: E402
+
+SIZES = {'10k': 10_000, '1M': 1_000_000, '10M': 10_000_000}
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Stages faster than this are not flagged; their timings are mostly noise
+MIN_REGRESSION_SECONDS = 0.025
+# Dashboard rollups, as on the Executive, Performance and Route pages
+ROLLUPS = ['priority', 'origin_warehouse', 'carrier', 'order_week', ['origin_warehouse', 'destination_city']]
+
+
+class PeakMemory:
+    # Highest resident set size seen while the block runs, sampled in a
+    # background thread
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = 0
+
+    def __enter__(self):
+        self.start = process_rss_bytes()
+        self.peak = self.start
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, process_rss_bytes())
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, process_rss_bytes())
+
+    @property
+    def growth_mb(self):
+        return (self.peak - self.start) / 1e6
+
+
+def measure(func, repeats):
+    # (result of the first run, best seconds, peak memory growth in MB)
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = func()
+        timings = [time.perf_counter() - start]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings), memory.growth_mb
+
+
+def page_aggregations(cube, date_range, priorities, warehouses):
+    kpis = cube.select(date_range, priorities, warehouses)
+    kpis.totals()
+    kpis.rating_distribution()
+    for by in ROLLUPS:
+        kpis.rollup(by)
+
+
+def run_size(data_path, export_dir, repeats):
+    results = {}
+
+    def stage(name, func):
+        result, seconds, memory_mb = measure(func, repeats)
+        results[name] = {'seconds': round(seconds, 5), 'peak_memory_mb': round(memory_mb, 1)}
+        print(f"  {name:<20} {seconds * 1000:11.1f} ms  {memory_mb:9.1f} MB")
+        return result
+
+    names = ['orders', 'inventory'] + ORDER_TABLES
+    tables = stage('load_csv', lambda: {name: read_table(name, data_path) for name in names})
+    merged = stage('merge', lambda: merge_tables(tables))
+    del tables
+    stage('cache_build', lambda: (clear_cache(data_path), load_and_merge_all_data(data_path)))
+    stage('cache_load', lambda: load_and_merge_all_data(data_path))
+
+    latest = merged['order_date'].max()
+    date_range = (latest - pd.Timedelta(days=30), latest)
+    priorities = ['Express', 'Standard']
+    warehouses = sorted(merged['origin_warehouse'].dropna().unique())[:5]
+    index = stage('filter_index', lambda: FilterIndex(merged, cache_size=0))
+    selected = stage('filter_select', lambda: merged.take(index.select(date_range, priorities, warehouses)))
+    # The same selection read from the date-partitioned layout
+    partitions_dir = os.path.join(data_path, CACHE_DIR, PARTITION_DIR)
+    stage('partition_build', lambda: (shutil.rmtree(partitions_dir, ignore_errors=True), partition_manifest(data_path)))
+    stage('partition_load', lambda: load_date_range(data_path, date_range, priorities, warehouses))
+
+    engine = RiskEngine()
+    stage('risk_score', lambda: engine.score_frame(merged))
+    explainer = RiskExplainer(engine)
+    stage('risk_explain', lambda: explainer.importance(explainer.explain(merged)))
+    cube = stage('kpi_cube', lambda: KpiCube.from_frame(merged))
+    stage('page_aggregations', lambda: page_aggregations(cube, date_range, priorities, warehouses))
+    stage('route_counts', lambda: selected.groupby(['origin_warehouse', 'destination_city'], observed=True).size())
+
+    # The filtered selection, as exported from the Settings page
+    stage('export_csv', lambda: write_export(selected, 'CSV', os.path.join(export_dir, 'export.csv')))
+    stage('export_parquet', lambda: write_export(selected, 'Parquet', os.path.join(export_dir, 'export.parquet')))
+    return results
+
+
+def machine():
+    return {
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            limit = previous['seconds'] * (1 + tolerance)
+            if current['seconds'] > limit and current['seconds'] - previous['seconds'] > MIN_REGRESSION_SECONDS:
+                regressions.append((size, name, previous['seconds'], current['seconds']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', default=['10k', '1M'], help="Order counts, e.g. 10k 1M 10M or 250000")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed slowdown before a stage is flagged")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--output', help="Also write the results as JSON to this path")
+    parser.add_argument('--data-dir', help="Keep generated data here and reuse it on later runs")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    results = {}
+    try:
+        for size in args.sizes:
+            n_orders = SIZES[size] if size in SIZES else int(size)
+            if args.data_dir:
+                data_path = os.path.join(args.data_dir, f'{n_orders}-{args.seed}')
+            else:
+                data_path = os.path.join(work_dir, size)
+            if not os.path.exists(os.path.join(data_path, 'orders.csv')):
+                print(f"generating {n_orders:,} orders ...")
+                generate(data_path, n_orders, seed=args.seed)
+            # The Parquet cache is rebuilt by every run
+            shutil.rmtree(os.path.join(data_path, '.cache'), ignore_errors=True)
+            print(f"{size} ({n_orders:,} orders)")
+            results[size] = run_size(data_path, work_dir, args.repeats)
+    finally:
+        shutil.rmtree(work_dir)
+
+    report = {'machine': machine(), 'repeats': args.repeats, 'seed': args.seed, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against; run with --save-baseline to store one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine']:
+        print("note: baseline was recorded on a different machine or library versions")
+    regressions = compare(results, baseline, args.tolerance)
+    for size, name, before, after in regressions:
+        print(f"REGRESSION {size} {name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({after / before - 1:+.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# Carrier history features for the risk scorer, from completed deliveries:
+# exponentially decayed delay rate, mean lateness and mean rating per carrier
+# and per carrier lane (carrier, origin, destination).
+#
+# Each delivery is weighted 2 ** (t / HALF_LIFE_DAYS), t being its delivery
+# day counted from DECAY_ORIGIN, and adds that weight times its delayed flag,
+# lateness and rating to its lane's sums. Features are ratios of the sums, so
+# weights anchored to a fixed day give the same values as decaying every sum
+# as time passes, and a delivery whose record changes can be taken out again
+# exactly. Lane features are shrunk towards their carrier's by
+# LANE_PRIOR_DELIVERIES recent deliveries, so a lane with little history
+# leans on the carrier's.
+#
+# The feature tables are rebuilt from the sums on every update (one row per
+# lane), and lookups map an order's keys to a table row, so serving a
+# feature never touches the delivery history.
+HALF_LIFE_DAYS = 30.0
+DECAY_ORIGIN = pd.Timestamp('2020-01-01')
+LANE_PRIOR_DELIVERIES = 5.0
+LANE_KEY = ['carrier', 'origin_warehouse', 'destination_city']
+# Decayed sums kept per lane
+SUMS = ['weight', 'delayed', 'lateness', 'rated', 'rating']
+CARRIER_FEATURES = ['carrier_avg_delay', 'carrier_avg_lateness_days', 'carrier_avg_rating', 'carrier_recent_deliveries']
+LANE_FEATURES = ['lane_avg_delay', 'lane_avg_lateness_days', 'lane_avg_rating']
+FEATURE_COLUMNS = CARRIER_FEATURES + LANE_FEATURES
+# Source columns a store is built from, for loaders that prune columns
+HISTORY_COLUMNS = LANE_KEY + ['order_date', 'promised_delivery_days', 'actual_delivery_days', 'customer_rating']
+# Keys whose weight falls below this many deliveries on the latest day (all
+# their deliveries taken out again, up to rounding) count as empty
+MIN_RECENT_DELIVERIES = 1e-9
+
+
+def _empty_sums():
+    return pd.DataFrame(columns=SUMS, index=pd.MultiIndex.from_tuples([], names=LANE_KEY), dtype=np.float64)
+
+
+def delivery_sums(deliveries):
+    # Decayed sums per lane for the completed deliveries among `deliveries`
+    # (merged order rows), and the latest delivery day among them
+    done = deliveries['delayed'].notna().to_numpy() & deliveries['order_date'].notna().to_numpy()
+    for column in LANE_KEY:
+        done &= deliveries[column].notna().to_numpy()
+    rows = deliveries[done]
+    if not len(rows):
+        return _empty_sums(), None
+    delivered = rows['order_date'] + pd.to_timedelta(rows['actual_delivery_days'].astype(np.float64), unit='D')
+    days = ((delivered - DECAY_ORIGIN) / pd.Timedelta(days=1)).to_numpy()
+    weight = np.exp2(days / HALF_LIFE_DAYS)
+    rating = rows['customer_rating'].to_numpy(dtype=np.float64, na_value=np.nan)
+    rated = ~np.isnan(rating)
+    sums = pd.DataFrame({
+        **{column: rows[column].astype(object).to_numpy() for column in LANE_KEY},
+        'weight': weight,
+        'delayed': weight * rows['delayed'].to_numpy(dtype=np.float64),
+        'lateness': weight * rows['delay_days'].to_numpy(dtype=np.float64, na_value=0.0),
+        'rated': weight * rated,
+        'rating': weight * np.where(rated, rating, 0.0),
+    })
+    return sums.groupby(LANE_KEY, sort=False).sum(), float(days.max())
+
+
+def _key_codes(values):
+    # (integer codes, labels) for a key column; -1 marks a missing key
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return np.asarray(values.cat.codes, dtype=np.int64), np.asarray(values.cat.categories, dtype=object)
+    codes, labels = pd.factorize(np.asarray(values, dtype=object))
+    return codes.astype(np.int64), np.asarray(labels, dtype=object)
+
+
+def _labels_at(codes, labels):
+    # Label of every code, None for -1
+    return np.append(labels, None)[codes]
+
+
+def _take_rows(table, rows):
+    # Rows of table's values by position, all-NaN for -1
+    values = np.vstack([table.to_numpy(dtype=np.float64), np.full((1, table.shape[1]), np.nan)])
+    return values[rows]
+
+
+class CarrierFeatureStore:
+    def __init__(self, lanes=None, latest_day=None):
+        self.lanes = lanes if lanes is not None else _empty_sums()
+        self.latest_day = latest_day
+        self._build_tables()
+
+    @classmethod
+    @timed('carrier_features.from_frame')
+    def from_frame(cls, merged):
+        return cls(*delivery_sums(merged))
+
+    @timed('carrier_features.update')
+    def update(self, added=None, removed=None):
+        # Folds in the deliveries of `added` and takes out those of `removed`,
+        # e.g. the old and new rows of orders whose delivery record changed
+        lanes = self.lanes
+        if added is not None:
+            sums, latest_day = delivery_sums(added)
+            lanes = lanes.add(sums, fill_value=0.0)
+            if latest_day is not None:
+                self.latest_day = latest_day if self.latest_day is None else max(self.latest_day, latest_day)
+        if removed is not None:
+            lanes = lanes.sub(delivery_sums(removed)[0], fill_value=0.0)
+            lanes = lanes[lanes['weight'] > MIN_RECENT_DELIVERIES * self._unit()]
+        self.lanes = lanes
+        self._build_tables()
+
+    def _unit(self):
+        # Weight of one delivery on the latest delivery day
+        return np.exp2(self.latest_day / HALF_LIFE_DAYS) if self.latest_day is not None else 1.0
+
+    def _build_tables(self):
+        lanes = self.lanes
+        carriers = lanes.groupby(level='carrier', sort=False).sum()
+        carriers = carriers[carriers['weight'] > MIN_RECENT_DELIVERIES * self._unit()]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.carrier_table = pd.DataFrame({
+                'carrier_avg_delay': carriers['delayed'] / carriers['weight'],
+                'carrier_avg_lateness_days': carriers['lateness'] / carriers['weight'],
+                'carrier_avg_rating': carriers['rating'] / carriers['rated'],
+                'carrier_recent_deliveries': carriers['weight'] / self._unit(),
+            }, index=carriers.index)
+            prior = LANE_PRIOR_DELIVERIES * self._unit()
+            parent = self.carrier_table.reindex(lanes.index.get_level_values('carrier'))
+            self.lane_table = pd.DataFrame({
+                'lane_avg_delay': (lanes['delayed'] + prior * parent['carrier_avg_delay'].to_numpy()) / (lanes['weight'] + prior),
+                'lane_avg_lateness_days': (lanes['lateness'] + prior * parent['carrier_avg_lateness_days'].to_numpy()) / (lanes['weight'] + prior),
+                'lane_avg_rating': (lanes['rating'] + prior * parent['carrier_avg_rating'].to_numpy()) / (lanes['rated'] + prior),
+            }, index=lanes.index)
+        # Plain dicts for single-order lookups
+        self._carrier_rows = dict(zip(self.carrier_table.index, map(tuple, self.carrier_table.to_numpy())))
+        self._lane_rows = dict(zip(self.lane_table.index, map(tuple, self.lane_table.to_numpy())))
+
+    @timed('carrier_features.lookup')
+    def lookup(self, data):
+        # FEATURE_COLUMNS for every row of `data` (a frame or a dict of
+        # columns holding the lane keys), NaN where a carrier has no completed
+        # deliveries. Keys are resolved once per distinct carrier and lane,
+        # then spread to the rows by position. A missing key column counts as
+        # unknown for every row, as in lookup_one.
+        n_rows = len(data) if isinstance(data, pd.DataFrame) else len(next(iter(data.values())))
+        (carrier_codes, carrier_labels), (origin_codes, origin_labels), (destination_codes, destination_labels) = [
+            _key_codes(data[column]) if column in data else (np.full(n_rows, -1, dtype=np.int64), np.array([], dtype=object))
+            for column in LANE_KEY
+        ]
+        index = data.index if isinstance(data, pd.DataFrame) else pd.RangeIndex(n_rows)
+
+        carrier_rows = np.append(self.carrier_table.index.get_indexer(carrier_labels), -1)[carrier_codes]
+        carrier_values = _take_rows(self.carrier_table, carrier_rows)
+
+        # One id per distinct (carrier, origin, destination) code triple
+        combined = (carrier_codes * (len(origin_labels) + 1) + origin_codes + 1) * (len(destination_labels) + 1) + destination_codes + 1
+        lane_ids, distinct = pd.factorize(combined)
+        first = np.empty(len(distinct), dtype=np.int64)
+        first[lane_ids[::-1]] = np.arange(len(lane_ids))[::-1]
+        keys = pd.MultiIndex.from_arrays([
+            _labels_at(carrier_codes[first], carrier_labels),
+            _labels_at(origin_codes[first], origin_labels),
+            _labels_at(destination_codes[first], destination_labels),
+        ])
+        lane_rows = self.lane_table.index.get_indexer(keys)[lane_ids]
+        lane_values = _take_rows(self.lane_table, lane_rows)
+        # A lane without deliveries of its own falls back to its carrier
+        lane_values = np.where(np.isnan(lane_values), carrier_values[:, :len(LANE_FEATURES)], lane_values)
+
+        return pd.DataFrame(np.hstack([carrier_values, lane_values]), columns=FEATURE_COLUMNS, index=index)
+
+    def lookup_one(self, order):
+        # FEATURE_COLUMNS for a single order (a mapping holding the lane keys)
+        carrier = self._carrier_rows.get(order.get('carrier'), (np.nan,) * len(CARRIER_FEATURES))
+        lane = self._lane_rows.get(tuple(order.get(column) for column in LANE_KEY), carrier[:len(LANE_FEATURES)])
+        return dict(zip(FEATURE_COLUMNS, carrier + lane))
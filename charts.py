@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Server-side preparation of chart data. Plotly serializes every point it is
+# given to the browser, so charts are fed pre-aggregated frames (the KPI cube
+# roll-ups) and long time series are thinned to MAX_SERIES_POINTS with
+# largest-triangle-three-buckets, which keeps the peaks and dips a plain
+# stride would drop. Built figures are kept in a FigureCache keyed by chart
+# and filter signature, so a rerun with unchanged filters and data reuses
+# them instead of building them again.
+MAX_SERIES_POINTS = 1000
+MAX_CACHED_FIGURES = 256
+
+
+def lttb_indices(x, y, threshold):
+    # Positions of the points largest-triangle-three-buckets keeps: always the
+    # first and last, and per bucket in between the point spanning the
+    # largest triangle with the previous pick and the next bucket's mean
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0] = 0
+    picked[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            following = slice(stop, edges[bucket + 2])
+            next_x, next_y = x[following].mean(), y[following].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        picked[bucket + 1] = previous
+    return picked
+
+
+def downsample_series(frame, x, y, max_points=MAX_SERIES_POINTS):
+    # Rows of frame with y present, thinned to max_points along x
+    series = frame[[x, y]].dropna().sort_values(x)
+    if len(series) <= max_points:
+        return series
+    x_values = series[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype('int64')
+    return series.iloc[lttb_indices(x_values, series[y], max_points)]
+
+
+class FigureCache:
+    # Process-wide store of built figures; the figures are shared between
+    # sessions and must not be modified once cached
+    def __init__(self, max_entries=MAX_CACHED_FIGURES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name, signature, build):
+        # Cached figure for (name, signature), built by build() on a miss.
+        # A None result (nothing to show) is cached as well.
+        key = (name, signature)
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+        fig = build()
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
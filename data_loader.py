@@ -1,13 +1,693 @@
-def load_and_merge_all_data(data_path='data/'):
-    data_frames = {}
-    # Load each CSV
-    data_frames['orders'] = pd.read_csv(f'{data_path}orders.csv')
-    data_frames['delivery'] = pd.read_csv(f'{data_path}delivery_performance.csv')
-    data_frames['routes'] = pd.read_csv(f'{data_path}routes_distance.csv')
-    # ... load other files (vehicle_fleet.csv, warehouse_inventory.csv, etc.)
-
-    # Merge dataframes step by step
-    merged_data = pd.merge(data_frames['orders'], data_frames['delivery'], on='order_id', how='left')
-    merged_data = pd.merge(merged_data, data_frames['routes'], on='order_id', how='left')
-    # ... continue merging with other datasets
-    return merged_data
\ No newline at end of file
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from instrumentation import stage, timed
+
+# Schema registry: every source CSV with its columns mapped to the canonical
+# snake_case names used by the app and the scorer, and the dtype to read them
+# as. 'category' and 'datetime' are handled specially, everything else is
+# passed straight to read_csv.
+TABLE_SCHEMAS = {
+    'orders': {
+        'file': 'orders.csv',
+        'columns': {
+            'Order_ID': ('order_id', 'str'),
+            'Order_Date': ('order_date', 'datetime'),
+            'Customer_Segment': ('customer_segment', 'category'),
+            'Priority': ('priority', 'category'),
+            'Product_Category': ('product_category', 'category'),
+            'Order_Value_INR': ('order_value', 'float32'),
+            'Origin': ('origin_warehouse', 'category'),
+            'Destination': ('destination_city', 'category'),
+            'Special_Handling': ('special_handling', 'category'),
+        },
+    },
+    'delivery': {
+        'file': 'delivery_performance.csv',
+        'columns': {
+            'Order_ID': ('order_id', 'str'),
+            'Carrier': ('carrier', 'category'),
+            'Promised_Delivery_Days': ('promised_delivery_days', 'float32'),
+            'Actual_Delivery_Days': ('actual_delivery_days', 'float32'),
+            'Delivery_Status': ('status', 'category'),
+            'Quality_Issue': ('quality_issue', 'category'),
+            'Customer_Rating': ('customer_rating', 'float32'),
+            'Delivery_Cost_INR': ('delivery_cost', 'float32'),
+        },
+    },
+    'routes': {
+        'file': 'routes_distance.csv',
+        'columns': {
+            'Order_ID': ('order_id', 'str'),
+            'Route': ('route', 'category'),
+            'Distance_KM': ('distance_km', 'float32'),
+            'Fuel_Consumption_L': ('fuel_consumption', 'float32'),
+            'Toll_Charges_INR': ('toll_charges', 'float32'),
+            'Traffic_Delay_Minutes': ('traffic_delay_minutes', 'float32'),
+            'Weather_Impact': ('weather_impact', 'category'),
+        },
+    },
+    'feedback': {
+        'file': 'customer_feedback.csv',
+        'columns': {
+            'Order_ID': ('order_id', 'str'),
+            'Feedback_Date': ('feedback_date', 'datetime'),
+            'Rating': ('feedback_rating', 'float32'),
+            'Feedback_Text': ('feedback_text', 'category'),
+            'Would_Recommend': ('would_recommend', 'category'),
+            'Issue_Category': ('issue_category', 'category'),
+        },
+    },
+    'costs': {
+        'file': 'cost_breakdown.csv',
+        'columns': {
+            'Order_ID': ('order_id', 'str'),
+            'Fuel_Cost': ('fuel_cost', 'float32'),
+            'Labor_Cost': ('labor_cost', 'float32'),
+            'Vehicle_Maintenance': ('vehicle_maintenance_cost', 'float32'),
+            'Insurance': ('insurance_cost', 'float32'),
+            'Packaging_Cost': ('packaging_cost', 'float32'),
+            'Technology_Platform_Fee': ('platform_fee', 'float32'),
+            'Other_Overhead': ('other_overhead_cost', 'float32'),
+        },
+    },
+    'inventory': {
+        'file': 'warehouse_inventory.csv',
+        'columns': {
+            'Warehouse_ID': ('warehouse_id', 'category'),
+            'Location': ('origin_warehouse', 'category'),
+            'Product_Category': ('product_category', 'category'),
+            'Current_Stock_Units': ('stock_units', 'float32'),
+            'Reorder_Level': ('reorder_level', 'float32'),
+            'Storage_Cost_per_Unit': ('storage_cost_per_unit', 'float32'),
+            'Last_Restocked_Date': ('last_restocked_date', 'datetime'),
+        },
+    },
+    'fleet': {
+        'file': 'vehicle_fleet.csv',
+        'columns': {
+            'Vehicle_ID': ('vehicle_id', 'str'),
+            'Vehicle_Type': ('vehicle_type', 'category'),
+            'Capacity_KG': ('capacity_kg', 'float32'),
+            'Fuel_Efficiency_KM_per_L': ('fuel_efficiency_km_per_l', 'float32'),
+            'Current_Location': ('current_location', 'category'),
+            'Status': ('status', 'category'),
+            'Age_Years': ('age_years', 'float32'),
+            'CO2_Emissions_Kg_per_KM': ('co2_kg_per_km', 'float32'),
+        },
+    },
+}
+
+# Tables keyed one row per Order_ID, joined onto orders by index
+ORDER_TABLES = ['delivery', 'routes', 'feedback', 'costs']
+
+SOURCE_FILES = {name: schema['file'] for name, schema in TABLE_SCHEMAS.items()}
+
+# Merged frame is cached as Parquet next to the sources, keyed on a manifest
+# of each source file's size, mtime and content hash
+CACHE_DIR = '.cache'
+CACHE_FILE = 'merged.parquet'
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 2
+
+# Date-partitioned copy of the merged frame for queries over a date window:
+# one Parquet file per month (or day) of order_date under
+# <data_path>/.cache/partitions/<freq>/, rows sorted by order_date within
+# a file, and a manifest listing each file's date span, row count and the
+# priorities and origin warehouses it holds. A query opens only the files
+# whose span and values can match, reads only the requested columns, and
+# pyarrow skips row groups outside the window by their order_date
+# statistics. Its manifest carries the source fingerprint as well, and the
+# layout is rebuilt from the merged frame whenever the sources change.
+PARTITION_DIR = 'partitions'
+# freq -> (pandas period, file name format)
+PARTITION_FREQS = {'month': ('M', '%Y-%m'), 'day': ('D', '%Y-%m-%d')}
+PARTITION_ROW_GROUP_SIZE = 50_000
+# Orders without an order_date never match a date window
+UNDATED_PARTITION = 'undated'
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.last_load_seconds = 0.0
+        self.total_load_seconds = 0.0
+
+    def record(self, hit, seconds):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.last_load_seconds = seconds
+        self.total_load_seconds += seconds
+
+    @property
+    def loads(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.loads if self.loads else 0.0
+
+    def as_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'last_load_seconds': self.last_load_seconds,
+            'avg_load_seconds': self.total_load_seconds / self.loads if self.loads else 0.0,
+        }
+
+
+cache_stats = CacheStats()
+
+
+def get_cache_stats():
+    return cache_stats.as_dict()
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_sources(data_path):
+    stats = {}
+    for name, file_name in SOURCE_FILES.items():
+        st = os.stat(os.path.join(data_path, file_name))
+        stats[name] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    return stats
+
+
+def dataset_version(data_path='data/'):
+    # Cheap fingerprint of the source files (size and mtime only) for keying
+    # in-process caches of anything derived from the loaded data
+    stats = _stat_sources(data_path)
+    return hashlib.blake2b(json.dumps(stats, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp_path = os.path.join(cache_dir, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_FILE))
+
+
+def _validate_manifest(data_path, manifest, stats):
+    # Size and mtime are checked first so an unchanged tree never gets hashed.
+    # A file whose mtime moved but whose content hash did not (e.g. a re-copy)
+    # still counts as unchanged; the manifest is refreshed in place.
+    if not manifest or manifest.get('version') != CACHE_VERSION:
+        return False, None
+    sources = manifest.get('sources', {})
+    if set(sources) != set(stats):
+        return False, None
+    refreshed = {}
+    for name, current in stats.items():
+        cached = sources[name]
+        if cached['size'] != current['size']:
+            return False, None
+        if cached['mtime_ns'] == current['mtime_ns']:
+            refreshed[name] = cached
+            continue
+        file_hash = _file_hash(os.path.join(data_path, SOURCE_FILES[name]))
+        if file_hash != cached['hash']:
+            return False, None
+        refreshed[name] = dict(current, hash=file_hash)
+    return True, refreshed
+
+
+def read_table(name, data_path='data/', **read_csv_kwargs):
+    return parse_table(name, os.path.join(data_path, TABLE_SCHEMAS[name]['file']), **read_csv_kwargs)
+
+
+@timed('data_loader.parse_table')
+def parse_table(name, source, **read_csv_kwargs):
+    # source: a path or file-like object holding the table's CSV, header first
+    columns = TABLE_SCHEMAS[name]['columns']
+    dtypes = {}
+    date_columns = []
+    for column, (_, dtype) in columns.items():
+        if dtype == 'datetime':
+            date_columns.append(column)
+        else:
+            dtypes[column] = dtype
+    # 'None' is a real value in these extracts (weather, special handling),
+    # so only empty fields are treated as missing
+    table = pd.read_csv(
+        source,
+        usecols=list(columns),
+        dtype=dtypes,
+        parse_dates=date_columns,
+        keep_default_na=False,
+        na_values=[''],
+        **read_csv_kwargs
+    )
+    return table.rename(columns={column: target for column, (target, _) in columns.items()})
+
+
+def load_all_tables(data_path='data/'):
+    return {name: read_table(name, data_path) for name in TABLE_SCHEMAS}
+
+
+def iter_table(name, data_path='data/', chunksize=100_000, usecols=None):
+    # read_table in bounded chunks; usecols takes canonical column names
+    schema = TABLE_SCHEMAS[name]
+    columns = schema['columns']
+    if usecols is not None:
+        wanted = set(usecols)
+        columns = {source: spec for source, spec in columns.items() if spec[0] in wanted}
+    dtypes = {source: dtype for source, (_, dtype) in columns.items() if dtype != 'datetime'}
+    date_columns = [source for source, (_, dtype) in columns.items() if dtype == 'datetime']
+    reader = pd.read_csv(
+        os.path.join(data_path, schema['file']),
+        usecols=list(columns),
+        dtype=dtypes,
+        parse_dates=date_columns,
+        keep_default_na=False,
+        na_values=[''],
+        chunksize=chunksize,
+    )
+    renames = {source: target for source, (target, _) in columns.items()}
+    with reader:
+        for chunk in reader:
+            yield chunk.rename(columns=renames)
+
+
+# Columns add_derived_columns computes from the loaded ones
+DERIVED_COLUMNS = ['delayed', 'delay_days', 'delay_hours', 'traffic_delay_hours']
+
+
+def add_derived_columns(merged_data):
+    # Derived columns are only added when their inputs were loaded, so partial
+    # (column-pruned or chunked) frames go through the same path
+    if 'promised_delivery_days' in merged_data and 'actual_delivery_days' in merged_data:
+        promised = merged_data['promised_delivery_days']
+        actual = merged_data['actual_delivery_days']
+        delayed = pd.array(actual > promised, dtype='boolean')
+        delayed[(actual.isna() | promised.isna()).to_numpy()] = pd.NA
+        merged_data['delayed'] = delayed
+        merged_data['delay_days'] = (actual - promised).clip(lower=0)
+        merged_data['delay_hours'] = merged_data['delay_days'] * 24
+    if 'traffic_delay_minutes' in merged_data:
+        merged_data['traffic_delay_hours'] = merged_data['traffic_delay_minutes'] / np.float32(60)
+    return merged_data
+
+
+def _latest_per_order(table):
+    # The feeds append a new row when an order's record changes (e.g. a
+    # delivery status update); the last one wins
+    if table['order_id'].is_unique:
+        return table
+    return table.drop_duplicates('order_id', keep='last')
+
+
+@timed('data_loader.merge_tables')
+def merge_tables(tables):
+    orders = _latest_per_order(tables['orders']).set_index('order_id')
+    # One index-aligned join for every per-order table instead of a chain of
+    # pd.merge calls that each copy the growing frame
+    merged_data = orders.join(
+        [_latest_per_order(tables[name]).set_index('order_id') for name in ORDER_TABLES if name in tables],
+        how='left'
+    )
+
+    # Inventory is keyed on (warehouse city, product category)
+    if 'inventory' in tables:
+        inventory = tables['inventory'].set_index(['origin_warehouse', 'product_category'])
+        keys = pd.MultiIndex.from_arrays(
+            [merged_data['origin_warehouse'].astype(str), merged_data['product_category'].astype(str)]
+        )
+        inventory.index = inventory.index.set_levels(
+            [level.astype(str) for level in inventory.index.levels]
+        )
+        stock = inventory.reindex(keys)
+        for column in stock.columns:
+            merged_data[column] = stock[column].array
+
+    merged_data = merged_data.reset_index()
+    return add_derived_columns(merged_data)
+
+
+# Cap on the rows appended out of Order_ID order (record updates landing
+# after the sorted extract) that a streaming merge holds in memory per table
+MAX_LATE_ROWS = 1_000_000
+
+
+def _late_rows(ids, last_id=None):
+    # (mask of rows whose order_id sorts below one earlier in the file, the
+    # largest order_id so far). Those rows are record updates appended after
+    # the sorted extract.
+    values = ids.to_numpy(dtype=object)
+    if not len(values):
+        return np.zeros(0, dtype=bool), last_id
+    if last_id is not None:
+        values = np.concatenate([[last_id], values])
+    running = np.maximum.accumulate(values)
+    late = values[1:] < running[:-1]
+    if last_id is None:
+        late = np.concatenate([[False], late])
+    return late, running[-1]
+
+
+def _iter_order_ids(name, data_path):
+    # A table's Order_ID column in blocks, through pyarrow's CSV reader, which
+    # skips the other fields far faster than read_csv with usecols
+    source = next(column for column, (target, _) in TABLE_SCHEMAS[name]['columns'].items() if target == 'order_id')
+    reader = pacsv.open_csv(
+        os.path.join(data_path, TABLE_SCHEMAS[name]['file']),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[source], column_types={source: 'string'}, strings_can_be_null=True
+        ),
+    )
+    for batch in reader:
+        yield pd.Series(batch.column(0).to_numpy(zero_copy_only=False))
+
+
+def _scan_late_rows(name, data_path, chunksize, usecols):
+    # The out-of-order rows of a table, in file order, or None. A first pass
+    # reads only Order_ID; the table is read again in full only when it has
+    # late rows.
+    last_id, count = None, 0
+    for ids in _iter_order_ids(name, data_path):
+        late, last_id = _late_rows(ids, last_id)
+        count += int(late.sum())
+    if not count:
+        return None
+    if count > MAX_LATE_ROWS:
+        raise ValueError(
+            f"{TABLE_SCHEMAS[name]['file']} has {count:,} rows out of Order_ID order, more than the "
+            f"{MAX_LATE_ROWS:,} a streaming merge holds; sort it by Order_ID"
+        )
+    last_id, parts = None, []
+    for chunk in iter_table(name, data_path, chunksize, usecols):
+        late, last_id = _late_rows(chunk['order_id'], last_id)
+        if late.any():
+            parts.append(chunk[late])
+    return pd.concat(parts, ignore_index=True)
+
+
+def _take_through(frame, upper_id):
+    # (rows of frame with order_id <= upper_id, the rest)
+    if frame is None or not len(frame):
+        return None, frame
+    upto = (frame['order_id'] <= upper_id).to_numpy()
+    return frame[upto], frame[~upto]
+
+
+class _SortedChunkStream:
+    # Buffered reader over a table sorted by order_id that hands out the rows
+    # up to a given order_id, for streaming merge-joins. Late rows (see
+    # _scan_late_rows) are skipped as they are read and handed out with the
+    # sorted rows of their order_id range instead, after them, so the
+    # last-one-wins dedupe in merge_tables keeps them.
+    def __init__(self, name, chunks, late=None):
+        self.name = name
+        self.chunks = chunks
+        self.late = late
+        self.buffer = None
+        self.last_id = None
+        self.exhausted = False
+
+    def _pull(self):
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.exhausted = True
+            return
+        late, self.last_id = _late_rows(chunk['order_id'], self.last_id)
+        if late.any():
+            chunk = chunk[~late]
+        self.buffer = chunk if self.buffer is None else pd.concat([self.buffer, chunk], ignore_index=True)
+
+    def take_until(self, upper_id):
+        while not self.exhausted and (self.buffer is None or not len(self.buffer) or self.buffer['order_id'].iloc[-1] <= upper_id):
+            self._pull()
+        late, self.late = _take_through(self.late, upper_id)
+        if self.buffer is None:
+            return late
+        split = int(self.buffer['order_id'].searchsorted(upper_id, side='right'))
+        taken = self.buffer.iloc[:split]
+        self.buffer = self.buffer.iloc[split:].reset_index(drop=True)
+        if late is not None and len(late):
+            taken = pd.concat([taken, late], ignore_index=True)
+        return taken
+
+
+def iter_merged_chunks(data_path='data/', chunksize=100_000, tables=('delivery', 'routes'), usecols=None):
+    # Streaming merge of orders with the given per-order tables in bounded
+    # memory. The files must be sorted by Order_ID, as the daily extracts are,
+    # apart from record updates appended later (up to MAX_LATE_ROWS per
+    # table): those are found by a first pass over each file's Order_ID column
+    # and resolved like load_and_merge_all_data does, the last row per order
+    # winning.
+    def table_usecols(name):
+        if usecols is None:
+            return None
+        names = {target for target, _ in TABLE_SCHEMAS[name]['columns'].values()}
+        return [c for c in usecols if c in names] + ['order_id']
+
+    late_orders = _scan_late_rows('orders', data_path, chunksize, table_usecols('orders'))
+    streams = [
+        _SortedChunkStream(
+            name, iter_table(name, data_path, chunksize, table_usecols(name)),
+            _scan_late_rows(name, data_path, chunksize, table_usecols(name))
+        )
+        for name in tables
+    ]
+    last_id = None
+    for orders in iter_table('orders', data_path, chunksize, table_usecols('orders')):
+        late, chunk_last_id = _late_rows(orders['order_id'], last_id)
+        if late.any():
+            orders = orders[~late]
+        if not len(orders):
+            continue
+        last_id = chunk_last_id
+        updates, late_orders = _take_through(late_orders, last_id)
+        if updates is not None and len(updates):
+            orders = pd.concat([orders, updates], ignore_index=True)
+        chunk_tables = {'orders': orders}
+        for stream in streams:
+            taken = stream.take_until(last_id)
+            if taken is not None:
+                chunk_tables[stream.name] = taken
+        yield merge_tables(chunk_tables)
+
+
+def _merge_sources(data_path):
+    tables = {name: read_table(name, data_path) for name in ['orders', 'inventory'] + ORDER_TABLES}
+    return merge_tables(tables)
+
+
+@timed('data_loader.load_and_merge_all_data')
+def load_and_merge_all_data(data_path='data/', use_cache=True):
+    start = time.perf_counter()
+    if not use_cache:
+        merged_data = _merge_sources(data_path)
+        cache_stats.record(False, time.perf_counter() - start)
+        return merged_data
+
+    cache_dir = os.path.join(data_path, CACHE_DIR)
+    cache_path = os.path.join(cache_dir, CACHE_FILE)
+    stats = _stat_sources(data_path)
+    manifest = _read_manifest(cache_dir)
+
+    valid, sources = _validate_manifest(data_path, manifest, stats)
+    if valid and os.path.exists(cache_path):
+        with stage('data_loader.read_cache') as timer:
+            merged_data = pd.read_parquet(cache_path)
+            timer.rows = len(merged_data)
+        if sources != manifest['sources']:
+            _write_manifest(cache_dir, dict(manifest, sources=sources))
+        cache_stats.record(True, time.perf_counter() - start)
+        return merged_data
+
+    merged_data = _merge_sources(data_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    merged_data.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    sources = {
+        name: dict(stat, hash=_file_hash(os.path.join(data_path, SOURCE_FILES[name])))
+        for name, stat in stats.items()
+    }
+    _write_manifest(cache_dir, {'version': CACHE_VERSION, 'sources': sources})
+    cache_stats.record(False, time.perf_counter() - start)
+    return merged_data
+
+
+def clear_cache(data_path='data/'):
+    cache_dir = os.path.join(data_path, CACHE_DIR)
+    for file_name in (CACHE_FILE, MANIFEST_FILE):
+        path = os.path.join(cache_dir, file_name)
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(os.path.join(cache_dir, PARTITION_DIR), ignore_errors=True)
+
+
+def _observed(values):
+    return sorted(str(v) for v in values.dropna().unique())
+
+
+@timed('data_loader.write_partitions')
+def write_partitions(merged_data, target, freq='month', sources=None):
+    # Writes merged_data to target as one file per order_date period and
+    # returns the manifest. The directory is built aside and moved into place
+    # once complete, so readers never open a half-written file.
+    period, name_format = PARTITION_FREQS[freq]
+    tmp_dir = target + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    periods = merged_data['order_date'].dt.to_period(period)
+    partitions = []
+    for key, rows in merged_data.groupby(periods, sort=True, dropna=False):
+        key = UNDATED_PARTITION if pd.isna(key) else key.strftime(name_format)
+        rows = rows.sort_values('order_date', kind='stable')
+        file_name = f'{key}.parquet'
+        rows.to_parquet(os.path.join(tmp_dir, file_name), index=False, row_group_size=PARTITION_ROW_GROUP_SIZE)
+        dated = rows['order_date'].dropna()
+        partitions.append({
+            'key': key,
+            'file': file_name,
+            'rows': len(rows),
+            'min_date': dated.min().isoformat() if len(dated) else None,
+            'max_date': dated.max().isoformat() if len(dated) else None,
+            'priorities': _observed(rows['priority']),
+            'origins': _observed(rows['origin_warehouse']),
+        })
+    manifest = {
+        'version': CACHE_VERSION,
+        'freq': freq,
+        'sources': sources,
+        'columns': list(merged_data.columns),
+        'partitions': partitions,
+    }
+    _write_manifest(tmp_dir, manifest)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+    return manifest
+
+
+def partition_manifest(data_path='data/', freq='month'):
+    # Manifest of the partitioned layout, rebuilt first when missing or out
+    # of date with the source files
+    cache_dir = os.path.join(data_path, CACHE_DIR)
+    target = os.path.join(cache_dir, PARTITION_DIR, freq)
+    manifest = _read_manifest(target)
+    valid, sources = _validate_manifest(data_path, manifest, _stat_sources(data_path))
+    if valid and manifest.get('freq') == freq:
+        if sources != manifest['sources']:
+            manifest = dict(manifest, sources=sources)
+            _write_manifest(target, manifest)
+        return manifest
+    merged_data = load_and_merge_all_data(data_path)
+    sources = _read_manifest(cache_dir)['sources']
+    return write_partitions(merged_data, target, freq, sources)
+
+
+def _date_window(date_range):
+    # (start, end) timestamps of an inclusive date range, either one None
+    # for an open end; None when the range does not filter
+    if date_range is None or len(date_range) != 2:
+        return None
+    return tuple(pd.Timestamp(bound) if bound is not None else None for bound in date_range)
+
+
+def select_partitions(manifest, date_range=None, priorities=None, warehouses=None):
+    # Partitions that can hold rows matching the filters, as the sidebar
+    # applies them: order_date within the inclusive date_range, and priority
+    # and origin in the selected values (an empty selection filters nothing)
+    selected = []
+    window = _date_window(date_range)
+    for partition in manifest['partitions']:
+        if window is not None:
+            start, end = window
+            if partition['min_date'] is None:
+                continue
+            if start is not None and pd.Timestamp(partition['max_date']) < start:
+                continue
+            if end is not None and pd.Timestamp(partition['min_date']) > end:
+                continue
+        if priorities and not set(priorities) & set(partition['priorities']):
+            continue
+        if warehouses and not set(warehouses) & set(partition['origins']):
+            continue
+        selected.append(partition)
+    return selected
+
+
+def _partition_filters(date_range, priorities, warehouses):
+    filters = []
+    window = _date_window(date_range)
+    if window is not None:
+        # Undated orders sit in their own partition, which a window never
+        # selects, so an open end needs no filter
+        start, end = window
+        if start is not None:
+            filters.append(('order_date', '>=', start))
+        if end is not None:
+            filters.append(('order_date', '<=', end))
+    if priorities:
+        filters.append(('priority', 'in', list(priorities)))
+    if warehouses:
+        filters.append(('origin_warehouse', 'in', list(warehouses)))
+    return filters or None
+
+
+def _read_partitions(data_path, manifest, date_range, priorities, warehouses, columns):
+    target = os.path.join(data_path, CACHE_DIR, PARTITION_DIR, manifest['freq'])
+    filters = _partition_filters(date_range, priorities, warehouses)
+    for partition in select_partitions(manifest, date_range, priorities, warehouses):
+        with stage('data_loader.read_partition') as timer:
+            frame = pq.read_table(
+                os.path.join(target, partition['file']), columns=columns, filters=filters
+            ).to_pandas()
+            timer.rows = len(frame)
+        if len(frame):
+            yield frame
+
+
+def iter_partitions(data_path='data/', date_range=None, priorities=None, warehouses=None, columns=None, freq='month'):
+    # Rows matching the filters, one frame per partition read, in order_date
+    # order; columns takes canonical column names (all when None)
+    manifest = partition_manifest(data_path, freq)
+    yield from _read_partitions(data_path, manifest, date_range, priorities, warehouses, columns)
+
+
+@timed('data_loader.load_date_range')
+def load_date_range(data_path='data/', date_range=None, priorities=None, warehouses=None, columns=None, freq='month'):
+    # The merged rows for one sidebar selection, read from the partitioned
+    # layout, so time and memory follow the size of the window rather than
+    # of the whole history
+    manifest = partition_manifest(data_path, freq)
+    frames = list(_read_partitions(data_path, manifest, date_range, priorities, warehouses, columns))
+    if len(frames) == 1:
+        return frames[0]
+    if frames:
+        return pd.concat(frames, ignore_index=True)
+    if not manifest['partitions']:
+        return pd.DataFrame(columns=columns if columns is not None else manifest['columns'])
+    # No matching rows: an empty frame with the stored schema
+    first = os.path.join(data_path, CACHE_DIR, PARTITION_DIR, freq, manifest['partitions'][0]['file'])
+    return pq.read_table(first, columns=columns).slice(0, 0).to_pandas()
@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# Per-order explanations of the rule-based risk score. The score is a capped
+# weighted sum of factor flags, so each factor's contribution to an order is
+# exactly its weight times its flag (scaled down with the rest where the cap
+# applies), computed for the whole batch as one (orders x factors) matrix.
+# Each order's top contributors name its risk factors and pick its
+# recommended action; global importances are the contributions averaged over
+# the batch. As the cap scales a row uniformly, an order's top factors depend
+# only on which factors flag it, so they are looked up from a table over the
+# 2 ** n_factors flag combinations, and the text for each is built once and
+# handed out as categorical codes.
+FACTOR_LABELS = {
+    'priority': 'Priority',
+    'traffic': 'Traffic',
+    'weather': 'Weather',
+    'distance': 'Distance',
+    'product': 'Product Type',
+    'carrier_history': 'Carrier History',
+    'time_of_day': 'Time of Day',
+}
+FACTOR_ACTIONS = {
+    'priority': 'Assign premium carrier',
+    'traffic': 'Reroute around traffic or dispatch off-peak',
+    'weather': 'Add weather buffer time',
+    'distance': 'Add buffer time for the long haul',
+    'product': 'Use specialized handling',
+    'carrier_history': 'Switch to a carrier with a better lane record',
+    'time_of_day': 'Dispatch outside peak hours',
+}
+NO_ACTION = 'Proceed as planned'
+NO_FACTORS = 'None'
+TOP_FACTORS = 2
+EXPLAIN_CACHE_SIZE = 4
+
+
+def _join_actions(actions):
+    if not actions:
+        return NO_ACTION
+    return ', '.join([actions[0]] + [action[0].lower() + action[1:] for action in actions[1:]])
+
+
+def _top_positions(contributions, top):
+    # (n_rows, top) factor positions by contribution, largest first; -1 past
+    # a row's last contributing factor
+    order = np.argsort(-contributions, axis=1, kind='stable')[:, :top]
+    present = np.take_along_axis(contributions, order, axis=1) > 0
+    return np.where(present, order, -1)
+
+
+def _combination_codes(positions, n_factors):
+    # One integer per row for its sequence of top positions (-1 padded)
+    codes = np.zeros(len(positions), dtype=np.int64)
+    for column in range(positions.shape[1]):
+        codes = codes * (n_factors + 1) + positions[:, column] + 1
+    return codes
+
+
+class RiskExplainer:
+    def __init__(self, engine, top=TOP_FACTORS):
+        self.engine = engine
+        self.top = top
+        self.factors = engine.factors
+        self.columns = [f'{factor}_contribution' for factor in self.factors]
+        # Text for every possible sequence of top factors
+        n = len(self.factors)
+        sequences = [[]]
+        for _ in range(top):
+            sequences = [seq + [position] for seq in sequences for position in range(-1, n)]
+        named = [[self.factors[p] for p in seq if p >= 0] for seq in sequences]
+        # Top factor sequence for every combination of flagged factors (bit i
+        # set: factor i flags the order)
+        masks = np.arange(2 ** n)
+        flagged = (masks[:, None] >> np.arange(n)[None, :]) & 1
+        weights = np.array([engine.weights[factor] for factor in self.factors], dtype=np.float64)
+        self._mask_codes = _combination_codes(_top_positions(flagged * weights, top), n)
+        self._factor_text = pd.factorize(np.array(
+            [', '.join(FACTOR_LABELS.get(f, f) for f in names) or NO_FACTORS for names in named], dtype=object
+        ))
+        self._action_text = pd.factorize(np.array(
+            [_join_actions([FACTOR_ACTIONS[f] for f in names if f in FACTOR_ACTIONS]) for names in named], dtype=object
+        ))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _text(self, table, codes):
+        positions, labels = table
+        return pd.Categorical.from_codes(positions[codes], categories=labels)
+
+    @timed('explanations.explain')
+    def explain(self, data, version=None, features=None):
+        # Per factor contribution columns plus top_factors and
+        # recommended_action for every row of data, indexed like data. With a
+        # version (e.g. the dataset version and filters) the result is reused.
+        if version is not None:
+            with self._lock:
+                cached = self._cache.get(version)
+                if cached is not None:
+                    self._cache.move_to_end(version)
+                    return cached
+        contributions = self.engine.contributions(data, features)
+        masks = np.zeros(len(contributions), dtype=np.uint8)
+        for i in range(len(self.factors)):
+            masks |= (contributions[:, i] > 0).view(np.uint8) << i
+        codes = self._mask_codes[masks]
+        index = data.index if isinstance(data, pd.DataFrame) else pd.RangeIndex(len(contributions))
+        result = pd.DataFrame(
+            {column: contributions[:, i].astype(np.float32) for i, column in enumerate(self.columns)},
+            index=index,
+        )
+        result['top_factors'] = self._text(self._factor_text, codes)
+        result['recommended_action'] = self._text(self._action_text, codes)
+        if version is not None:
+            with self._lock:
+                self._cache[version] = result
+                while len(self._cache) > EXPLAIN_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return result
+
+    def explain_order(self, order, features=None):
+        # Contributions by factor, top_factors and recommended_action for one
+        # order (a mapping holding the factor columns)
+        if features is not None and any(column not in order for column in self.engine.columns):
+            order = dict(features.lookup_one(order), **order)
+        data = {column: [order[column]] for column in self.engine.columns if column in order}
+        explained = self.explain(data)
+        return {
+            'contributions': dict(zip(self.factors, self.engine.contributions(data)[0].tolist())),
+            'top_factors': explained['top_factors'].iloc[0],
+            'recommended_action': explained['recommended_action'].iloc[0],
+        }
+
+    def importance(self, explained):
+        # Global importances from per-order contributions: each factor's share
+        # of the total risk, its mean contribution to an order's score and the
+        # share of orders it flags, largest share first
+        n_rows = max(len(explained), 1)
+        mean = np.array([explained[column].to_numpy().sum(dtype=np.float64) / n_rows for column in self.columns])
+        flagged = np.array([np.count_nonzero(explained[column].to_numpy()) / n_rows for column in self.columns])
+        total = mean.sum()
+        return pd.DataFrame({
+            'feature': [FACTOR_LABELS.get(factor, factor) for factor in self.factors],
+            'importance': mean / total if total > 0 else mean,
+            'mean_contribution': mean,
+            'orders_flagged': flagged,
+        }).sort_values('importance', ascending=False, kind='stable', ignore_index=True)
@@ -0,0 +1,140 @@
+import gzip
+import hashlib
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Chunked export of the filtered orders for the Settings & Export page. Files
+# are written to disk a chunk at a time, so memory is bounded by the chunk size
+# rather than by the export, and kept in a small on-disk cache keyed by the
+# filter signature so downloading the same selection again is free.
+EXPORT_FORMATS = {
+    # name: (extension, mime type, can be gzipped)
+    'CSV': ('csv', 'text/csv', True),
+    'JSON': ('json', 'application/json', True),
+    'JSON Lines': ('jsonl', 'application/x-ndjson', True),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', False),
+    'Excel (.xlsx)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', False),
+}
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_DIR = os.path.join('data', '.cache', 'exports')
+MAX_EXPORT_FILES = 16
+# Rows per worksheet, leaving room for the header row
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def _chunks(data, chunksize):
+    for start in range(0, len(data), chunksize):
+        yield data.iloc[start:start + chunksize]
+
+
+def iter_text_chunks(data, fmt, chunksize=EXPORT_CHUNK_ROWS):
+    # Pieces of a CSV, JSON array or JSON Lines document, one per chunk
+    if fmt == 'CSV':
+        header = True
+        for chunk in _chunks(data, chunksize):
+            yield chunk.to_csv(index=False, header=header)
+            header = False
+        if header:
+            yield data.iloc[:0].to_csv(index=False)
+    elif fmt == 'JSON':
+        yield '['
+        first = True
+        for chunk in _chunks(data, chunksize):
+            # Each chunk is its own array; keep the records between the brackets
+            records = chunk.to_json(orient='records', indent=2).strip()[1:-1].strip('\n')
+            if records:
+                yield records if first else ',\n' + records
+                first = False
+        yield '\n]'
+    elif fmt == 'JSON Lines':
+        for chunk in _chunks(data, chunksize):
+            yield chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+    else:
+        raise ValueError(f'{fmt} is not a text export format')
+
+
+def _write_parquet(data, path, chunksize):
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(data, chunksize):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_excel(data, path, chunksize):
+    # Write-only workbook streams rows to disk; rows past a sheet's limit
+    # continue on a new sheet
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    header = [str(column) for column in data.columns]
+    sheet, sheet_rows = None, EXCEL_MAX_ROWS
+    for chunk in _chunks(data, chunksize):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            if sheet_rows >= EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet('Master_Data' if sheet is None else f'Master_Data_{len(workbook.worksheets) + 1}')
+                sheet.append(header)
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet('Master_Data').append(header)
+    workbook.save(path)
+
+
+def write_export(data, fmt, path, compress=False, chunksize=EXPORT_CHUNK_ROWS):
+    if fmt == 'Parquet':
+        _write_parquet(data, path, chunksize)
+    elif fmt == 'Excel (.xlsx)':
+        _write_excel(data, path, chunksize)
+    else:
+        opener = gzip.open if compress else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as f:
+            for piece in iter_text_chunks(data, fmt, chunksize):
+                f.write(piece)
+    return path
+
+
+def export_signature(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def export_file_name(fmt, compress=False, stem='logistics_data'):
+    extension, _, gzippable = EXPORT_FORMATS[fmt]
+    return f'{stem}.{extension}' + ('.gz' if compress and gzippable else '')
+
+
+class ExportCache:
+    def __init__(self, directory=EXPORT_DIR, max_files=MAX_EXPORT_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def get(self, signature, data, fmt, compress=False):
+        # Path of the export for `signature`, writing it from `data` on a miss
+        compress = compress and EXPORT_FORMATS[fmt][2]
+        path = os.path.join(self.directory, export_file_name(fmt, compress, stem=signature))
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            os.makedirs(self.directory, exist_ok=True)
+            partial = f'{path}.partial'
+            try:
+                write_export(data, fmt, partial, compress)
+                os.replace(partial, path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Oldest files beyond max_files, by last use
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        paths = sorted((p for p in paths if not p.endswith('.partial')), key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_files:]:
+            os.remove(path)
@@ -0,0 +1,63 @@
+# Local stand-in for the traffic and weather feeds, for exercising
+# live_feeds.HttpProvider without the real services. It also accepts alert
+# webhooks (alerts.WebhookSink) on POST /alerts and counts them.
+#
+#   python feeds_stub_server.py [--port 8081] [--latency-ms 50] [--error-rate 0.0]
+#   FEEDS_URL=http://127.0.0.1:8081 streamlit run app.py
+#
+# Answers are stable per city or route, so repeated runs are comparable.
+import argparse
+import asyncio
+import random
+import zlib
+
+from aiohttp import web
+
+from live_feeds import WEATHER_CONDITIONS
+
+
+def _seeded(*parts):
+    return random.Random(zlib.crc32('|'.join(parts).encode()))
+
+
+def make_app(latency_ms=50.0, error_rate=0.0):
+    async def respond(body):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+        if random.random() < error_rate:
+            raise web.HTTPServiceUnavailable()
+        return web.json_response(body)
+
+    async def traffic(request):
+        origin = request.query.get('origin', '')
+        destination = request.query.get('destination', '')
+        return await respond({'delay_hours': round(_seeded(origin, destination).uniform(0, 3), 2)})
+
+    async def weather(request):
+        city = request.query.get('city', '')
+        return await respond({'condition': _seeded(city).choice(WEATHER_CONDITIONS)})
+
+    async def alerts(request):
+        body = await request.json()
+        request.app['alerts_received'] += len(body.get('alerts', []))
+        return web.json_response({'received': request.app['alerts_received']})
+
+    app = web.Application()
+    app['alerts_received'] = 0
+    app.router.add_get('/traffic', traffic)
+    app.router.add_get('/weather', weather)
+    app.router.add_post('/alerts', alerts)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency_ms, args.error_rate), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Sidebar filters answered from indexes built once per dataset load: a sorted
+# order_date index narrows to the date window with two binary searches, then
+# per-column category lookup tables test the remaining rows' integer codes.
+# Wide windows skip the sort and are answered as one fused mask over all rows.
+# The result is a sorted array of row positions, so the caller materializes
+# the filtered frame with a single take.
+FILTER_COLUMNS = ['priority', 'origin_warehouse']
+# Above this fraction of rows a date window is cheaper to test as a mask than
+# to gather and sort from the date index
+SORTED_PATH_MAX_FRACTION = 0.2
+
+
+class FilterIndex:
+    def __init__(self, data, cache_size=32):
+        self.n_rows = len(data)
+        dates = pd.to_datetime(data['order_date']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        # NaT sorts first as the minimum int64, so it never falls in a window
+        self._dates = dates
+        self._date_order = np.argsort(dates, kind='stable')
+        self._sorted_dates = dates[self._date_order]
+        self._codes = {}
+        self._categories = {}
+        self._has_missing = {}
+        for column in FILTER_COLUMNS:
+            values = data[column]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            categories = values.cat.categories
+            # Stored as code + 1 so missing (-1) becomes 0, in the smallest
+            # unsigned type that fits
+            shifted = values.cat.codes.to_numpy().astype(np.int64) + 1
+            self._codes[column] = shifted.astype(np.min_scalar_type(len(categories)))
+            self._categories[column] = categories
+            self._has_missing[column] = bool((shifted == 0).any())
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _date_window(self, date_range):
+        if date_range is None or len(date_range) != 2:
+            return None
+        start = pd.Timestamp(date_range[0]).value
+        end = pd.Timestamp(date_range[1]).value
+        lo = np.searchsorted(self._sorted_dates, start, side='left')
+        hi = np.searchsorted(self._sorted_dates, end, side='right')
+        return start, end, lo, hi
+
+    def _lookup(self, column, selected):
+        # Boolean table indexed by the shifted codes; slot 0 (missing) stays False
+        categories = self._categories[column]
+        table = np.zeros(len(categories) + 1, dtype=bool)
+        positions = categories.get_indexer(list(selected))
+        table[positions[positions >= 0] + 1] = True
+        return table
+
+    def select(self, date_range=None, priorities=None, warehouses=None):
+        key = (
+            tuple(pd.Timestamp(d).value for d in date_range) if date_range is not None and len(date_range) == 2 else None,
+            frozenset(priorities) if priorities else None,
+            frozenset(warehouses) if warehouses else None,
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        tables = []
+        for column, selected in (('priority', priorities), ('origin_warehouse', warehouses)):
+            if not selected:
+                continue
+            table = self._lookup(column, selected)
+            # Selecting every category of a column with no gaps filters nothing
+            if table[1:].all() and not self._has_missing[column]:
+                continue
+            tables.append((self._codes[column], table))
+        window = self._date_window(date_range)
+        if window is not None and window[3] - window[2] <= SORTED_PATH_MAX_FRACTION * self.n_rows:
+            # Narrow window: gather its rows from the date index, then test codes
+            positions = np.sort(self._date_order[window[2]:window[3]])
+            for codes, table in tables:
+                positions = positions[table[codes[positions]]]
+        elif window is None and not tables:
+            positions = np.arange(self.n_rows)
+        else:
+            mask = None
+            if window is not None and (window[2] > 0 or window[3] < self.n_rows):
+                mask = (self._dates >= window[0]) & (self._dates <= window[1])
+            for codes, table in tables:
+                mask = table[codes] if mask is None else mask & table[codes]
+            positions = np.arange(self.n_rows) if mask is None else np.flatnonzero(mask)
+        positions.setflags(write=False)
+
+        with self._lock:
+            self._cache[key] = positions
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return positions
+
+    def apply(self, data, date_range=None, priorities=None, warehouses=None):
+        return data.iloc[self.select(date_range, priorities, warehouses)]
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment, linprog
+
+from route_planner import FUEL_PRICE_INR_PER_L
+
+# Batch dispatch: assign the open orders to the Available vehicles so that the
+# total cost or CO2 is minimal and no vehicle is loaded past its capacity.
+# Every (order, vehicle) pair is costed at once as a trip from the vehicle's
+# current location to the order's warehouse and on to its destination.
+#
+# The capacity-constrained problem is solved as its LP relaxation over each
+# order's cheapest candidate vehicles (HiGHS). A basic LP solution leaves at
+# most one fractional order per vehicle whose capacity binds, so nearly every
+# order comes out integral; the few that do not are placed on the remaining
+# capacity with rounds of optimal one-order-per-vehicle assignments.
+DISPATCH_OBJECTIVES = {'Cost': 'cost_inr', 'CO2': 'co2_kg'}
+# Vehicles considered per order in the relaxation
+CANDIDATE_VEHICLES = 20
+
+# Orders carry a value but no weight; weight is estimated from typical value
+# density per product category (INR per kg)
+CATEGORY_VALUE_PER_KG = {
+    'Books': 400.0,
+    'Electronics': 2000.0,
+    'Fashion': 800.0,
+    'Food & Beverage': 150.0,
+    'Healthcare': 1000.0,
+    'Home Goods': 250.0,
+    'Industrial': 100.0,
+}
+DEFAULT_VALUE_PER_KG = 500.0
+
+# Special handling that only some vehicle types can take
+HANDLING_VEHICLE_TYPES = {
+    'Temperature_Controlled': ['Refrigerated'],
+    'Hazmat': ['Large_Truck', 'Small_Van', 'Refrigerated'],
+}
+
+
+def estimate_weight_kg(orders):
+    value_per_kg = orders['product_category'].astype(object).map(CATEGORY_VALUE_PER_KG)
+    value_per_kg = value_per_kg.fillna(DEFAULT_VALUE_PER_KG).to_numpy(dtype=np.float64)
+    return orders['order_value'].astype(np.float64).fillna(0).to_numpy() / value_per_kg
+
+
+def open_orders(merged_data, day=None):
+    # Orders without a delivery record yet, optionally only those placed on `day`
+    mask = merged_data['status'].isna()
+    if day is not None:
+        mask &= merged_data['order_date'].dt.normalize() == pd.Timestamp(day)
+    return merged_data[mask]
+
+
+def available_vehicles(fleet):
+    return fleet[fleet['status'] == 'Available']
+
+
+def trip_matrices(orders, vehicles, planner):
+    # (n_orders, n_vehicles) distance, cost and CO2 of every pairing, plus a
+    # feasibility mask for special handling and cities off the route graph
+    origin = planner.city_codes(orders['origin_warehouse'])
+    destination = planner.city_codes(orders['destination_city'])
+    location = planner.city_codes(vehicles['current_location'])
+    distances = planner.distance_km
+
+    loaded = np.where((origin >= 0) & (destination >= 0), distances[origin, destination], np.inf)
+    empty = np.where((location[None, :] >= 0) & (origin[:, None] >= 0), distances[location[None, :], origin[:, None]], np.inf)
+    distance = empty + loaded[:, None]
+
+    fuel_per_km = FUEL_PRICE_INR_PER_L / vehicles['fuel_efficiency_km_per_l'].astype(np.float64).to_numpy()
+    co2_per_km = vehicles['co2_kg_per_km'].astype(np.float64).to_numpy()
+
+    feasible = np.isfinite(distance)
+    handling = orders['special_handling'].astype(object).to_numpy()
+    vehicle_type = vehicles['vehicle_type'].astype(object).to_numpy()
+    for requirement, allowed in HANDLING_VEHICLE_TYPES.items():
+        feasible &= ~((handling == requirement)[:, None] & ~np.isin(vehicle_type, allowed)[None, :])
+    return {
+        'distance_km': distance,
+        'cost_inr': distance * fuel_per_km[None, :],
+        'co2_kg': distance * co2_per_km[None, :],
+    }, feasible
+
+
+def _candidate_pairs(costs, feasible, k=CANDIDATE_VEHICLES):
+    # (order, vehicle) positions of each order's k cheapest feasible vehicles
+    n_orders, n_vehicles = costs.shape
+    masked = np.where(feasible, costs, np.inf)
+    if k < n_vehicles:
+        candidates = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n_vehicles), (n_orders, n_vehicles))
+    rows = np.repeat(np.arange(n_orders), candidates.shape[1])
+    columns = candidates.ravel()
+    keep = np.isfinite(masked[rows, columns])
+    return rows[keep], columns[keep]
+
+
+def _relaxed_assignment(costs, feasible, weight, capacity):
+    # Orders the LP relaxation places wholly on one vehicle; -1 elsewhere
+    n_orders, n_vehicles = costs.shape
+    assigned = np.full(n_orders, -1)
+    rows, columns = _candidate_pairs(costs, feasible)
+    if not len(rows):
+        return assigned
+    pair_costs = costs[rows, columns]
+    # Leaving an order out costs more than any trip, so the LP places every
+    # order it can
+    unplaced_cost = np.full(n_orders, pair_costs.max() * 2 + 1)
+    n_pairs = len(rows)
+    one_vehicle = sparse.csr_matrix(
+        (np.ones(n_pairs + n_orders), (np.concatenate([rows, np.arange(n_orders)]), np.arange(n_pairs + n_orders))),
+        shape=(n_orders, n_pairs + n_orders),
+    )
+    load = sparse.csr_matrix((weight[rows], (columns, np.arange(n_pairs))), shape=(n_vehicles, n_pairs + n_orders))
+    result = linprog(
+        np.concatenate([pair_costs, unplaced_cost]),
+        A_ub=load, b_ub=capacity, A_eq=one_vehicle, b_eq=np.ones(n_orders),
+        bounds=(0, 1), method='highs',
+    )
+    if result.status != 0:
+        return assigned
+    whole = result.x[:n_pairs] > 1 - 1e-6
+    assigned[rows[whole]] = columns[whole]
+    return assigned
+
+
+def _assign_rounds(pending, assigned, costs, feasible, weight, capacity):
+    # Rounds of optimal one-order-per-vehicle assignments over the pairs that
+    # still fit, until the pending orders are placed or nothing fits
+    penalty = (costs[feasible].sum() if feasible.any() else 0.0) + 1.0
+    while pending.size:
+        fits = feasible[pending] & (weight[pending, None] <= capacity[None, :])
+        rows = fits.any(axis=1)
+        if not rows.any():
+            break
+        columns = np.flatnonzero(fits[rows].any(axis=0))
+        candidates = pending[rows]
+        fits = fits[rows][:, columns]
+        round_costs = np.where(fits, costs[np.ix_(candidates, columns)], penalty)
+        order_pos, vehicle_pos = linear_sum_assignment(round_costs)
+        placed = fits[order_pos, vehicle_pos]
+        order_pos, vehicle_pos = candidates[order_pos[placed]], columns[vehicle_pos[placed]]
+        assigned[order_pos] = vehicle_pos
+        capacity[vehicle_pos] -= weight[order_pos]
+        pending = pending[assigned[pending] < 0]
+
+
+def assign_vehicles(orders, vehicles, planner, objective='Cost'):
+    # One row per order: the assigned vehicle (missing when it could not be
+    # placed) with the trip's distance, cost and CO2
+    weight = estimate_weight_kg(orders)
+    matrices, feasible = trip_matrices(orders, vehicles, planner)
+    costs = matrices[DISPATCH_OBJECTIVES[objective]]
+    capacity = vehicles['capacity_kg'].astype(np.float64).to_numpy().copy()
+    feasible &= weight[:, None] <= capacity[None, :]
+
+    assigned = _relaxed_assignment(costs, feasible, weight, capacity)
+    placed = assigned >= 0
+    capacity -= np.bincount(assigned[placed], weights=weight[placed], minlength=len(capacity))
+    _assign_rounds(np.flatnonzero(~placed), assigned, costs, feasible, weight, capacity)
+
+    has_vehicle = assigned >= 0
+    pick = np.where(has_vehicle, assigned, 0)
+    rows = np.arange(len(orders))
+
+    def trip(metric):
+        return np.where(has_vehicle, matrices[metric][rows, pick], np.nan) if len(vehicles) else np.full(len(orders), np.nan)
+
+    vehicle_ids = vehicles['vehicle_id'].astype(object).to_numpy()
+    vehicle_types = vehicles['vehicle_type'].astype(object).to_numpy()
+    return pd.DataFrame({
+        'order_id': orders['order_id'].to_numpy(),
+        'origin_warehouse': orders['origin_warehouse'].astype(object).to_numpy(),
+        'destination_city': orders['destination_city'].astype(object).to_numpy(),
+        'weight_kg': weight,
+        'vehicle_id': np.where(has_vehicle, vehicle_ids[pick], None) if len(vehicles) else None,
+        'vehicle_type': np.where(has_vehicle, vehicle_types[pick], None) if len(vehicles) else None,
+        'distance_km': trip('distance_km'),
+        'cost_inr': trip('cost_inr'),
+        'co2_kg': trip('co2_kg'),
+    })
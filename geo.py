@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import read_table
+
+# Locations the app places on maps and measures between, in one array-backed
+# table: the cities first, then the warehouses (placed at their city), then
+# any further points a caller adds, such as pincode centroids. A column of
+# names is resolved to table rows once per distinct value (per category for
+# categorical columns), so coordinates, distances and nearest warehouses for
+# millions of orders are array lookups. Great-circle distances between every
+# pair of cities and warehouses are computed up front; pairs involving an
+# added point are computed on demand. The nearest warehouse to a point is the
+# one whose unit vector has the largest dot product with the point's: a
+# blocked matrix product while there are few warehouses, a k-d tree (built on
+# first use, when scipy is installed) beyond NEAREST_TREE_MIN_WAREHOUSES.
+EARTH_RADIUS_KM = 6371.0
+NEAREST_TREE_MIN_WAREHOUSES = 256
+# Cap on the (points x warehouses) dot products held at once
+NEAREST_BLOCK_VALUES = 1 << 22
+INDIA_CENTER = {'lat': 20.5937, 'lon': 78.9629}
+CITY_COORDS = {
+    'Mumbai': (19.0760, 72.8777),
+    'Delhi': (28.7041, 77.1025),
+    'Bangalore': (12.9716, 77.5946),
+    'Chennai': (13.0827, 80.2707),
+    'Kolkata': (22.5726, 88.3639),
+    'Hyderabad': (17.3850, 78.4867),
+    'Pune': (18.5204, 73.8567),
+    'Ahmedabad': (23.0225, 72.5714),
+    'Jaipur': (26.9124, 75.7873),
+    'Bangkok': (13.7563, 100.5018),
+    'Singapore': (1.3521, 103.8198),
+    'Dubai': (25.2048, 55.2708),
+    'Hong Kong': (22.3193, 114.1694),
+}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    # Great-circle km between points in degrees; arguments broadcast
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _unit_vectors(lat, lon):
+    # Points on the unit sphere; straight-line distance between them grows
+    # with great-circle distance, so a k-d tree over them finds the nearest
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class GeoIndex:
+    def __init__(self, names, lat, lon, kinds):
+        self.names = pd.Index(np.asarray(names, dtype=object))
+        if not self.names.is_unique:
+            raise ValueError("Location names must be unique")
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.kinds = np.asarray(kinds, dtype=object)
+        # Cities and warehouses come before any added points
+        self.n_hubs = int(np.count_nonzero(self.kinds != 'point'))
+        if (self.kinds[self.n_hubs:] != 'point').any():
+            raise ValueError("Added points must come after the cities and warehouses")
+        hub_lat, hub_lon = self.lat[:self.n_hubs], self.lon[:self.n_hubs]
+        self.distance_km = haversine_km(hub_lat[:, None], hub_lon[:, None], hub_lat[None, :], hub_lon[None, :])
+        self.warehouses = np.flatnonzero(self.kinds == 'warehouse')
+        self._tree = None
+        self._nearest = None
+
+    @classmethod
+    def build(cls, cities=CITY_COORDS, warehouses=None, points=None):
+        # cities: name -> (lat, lon); warehouses: warehouse id -> city;
+        # points: frame of name, lat, lon (e.g. pincode centroids)
+        names, lat, lon, kinds = [], [], [], []
+        for name, (city_lat, city_lon) in cities.items():
+            names.append(name)
+            lat.append(city_lat)
+            lon.append(city_lon)
+            kinds.append('city')
+        for warehouse, city in (warehouses or {}).items():
+            if city not in cities:
+                continue
+            names.append(warehouse)
+            lat.append(cities[city][0])
+            lon.append(cities[city][1])
+            kinds.append('warehouse')
+        if points is not None:
+            names += list(points['name'])
+            lat += list(points['lat'])
+            lon += list(points['lon'])
+            kinds += ['point'] * len(points)
+        return cls(names, lat, lon, kinds)
+
+    @classmethod
+    def from_data(cls, data_path='data/', points=None):
+        # CITY_COORDS plus the warehouses listed in warehouse_inventory.csv
+        inventory = read_table('inventory', data_path).drop_duplicates('warehouse_id')
+        warehouses = dict(zip(inventory['warehouse_id'].astype(str), inventory['origin_warehouse'].astype(str)))
+        return cls.build(CITY_COORDS, warehouses, points)
+
+    def codes(self, values):
+        # Table row of every value, -1 for names the table does not know
+        if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            labels = values.cat.categories
+        else:
+            codes, labels = pd.factorize(np.asarray(values, dtype=object))
+        rows = self.names.get_indexer(pd.Index(np.asarray(labels, dtype=object)))
+        return np.append(rows, -1)[codes]
+
+    def coordinates(self, values):
+        # (lat, lon) arrays for a column of names; NaN where unknown
+        rows = self.codes(values)
+        return np.append(self.lat, np.nan)[rows], np.append(self.lon, np.nan)[rows]
+
+    def distance(self, origins, destinations):
+        # Great-circle km between paired columns of names; NaN where either is
+        # unknown. Pairs of cities and warehouses come from the matrix.
+        i, j = self.codes(origins), self.codes(destinations)
+        known = (i >= 0) & (j >= 0)
+        if (i < self.n_hubs).all() and (j < self.n_hubs).all():
+            return np.where(known, self.distance_km[i, j], np.nan)
+        km = haversine_km(self.lat[i], self.lon[i], self.lat[j], self.lon[j])
+        return np.where(known, km, np.nan)
+
+    def _nearest_rows(self, lat, lon):
+        # Row of the warehouse closest to each point; -1 for missing
+        # coordinates or when there are no warehouses
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        nearest = np.full(len(lat), -1, dtype=np.int64)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        if not len(self.warehouses) or not valid.any():
+            return nearest
+        points = _unit_vectors(lat[valid], lon[valid])
+        hubs = _unit_vectors(self.lat[self.warehouses], self.lon[self.warehouses])
+        if len(hubs) >= NEAREST_TREE_MIN_WAREHOUSES and self._tree is None:
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                # Without scipy every size goes through the matrix product
+                self._tree = False
+            else:
+                self._tree = cKDTree(hubs)
+        if self._tree:
+            best = self._tree.query(points)[1]
+        else:
+            best = np.empty(len(points), dtype=np.int64)
+            block = max(1, NEAREST_BLOCK_VALUES // len(hubs))
+            for start in range(0, len(points), block):
+                best[start:start + block] = np.argmax(points[start:start + block] @ hubs.T, axis=1)
+        nearest[valid] = self.warehouses[best]
+        return nearest
+
+    def nearest_warehouse_at(self, lat, lon):
+        # Warehouse id closest to each coordinate pair, None where missing
+        return np.append(self.names.to_numpy(), None)[self._nearest_rows(lat, lon)]
+
+    def nearest_warehouse(self, values):
+        # Warehouse id closest to each named location, None where unknown;
+        # every location's nearest warehouse is worked out once
+        if self._nearest is None:
+            self._nearest = np.append(self._nearest_rows(self.lat, self.lon), -1)
+        return np.append(self.names.to_numpy(), None)[self._nearest[self.codes(values)]]
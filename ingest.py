@@ -0,0 +1,331 @@
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from carrier_features import CarrierFeatureStore
+from data_loader import (
+    DERIVED_COLUMNS, ORDER_TABLES, SOURCE_FILES, add_derived_columns, dataset_version,
+    load_and_merge_all_data, merge_tables, parse_table, read_table,
+)
+from instrumentation import timed
+from kpi_cube import KpiCube
+
+# Append-aware refresh of the merged store. The order feeds only ever append
+# to their CSVs, so each refresh reads the bytes past the last offset seen per
+# file, parses just those rows and upserts them by order_id: new orders are
+# merged and appended, rows for known orders (e.g. a delivery status change)
+# overwrite that order's columns. Derived columns, risk scores, the KPI cube
+# and the carrier history features are recomputed for the affected orders
+# only; risk scores for every order when the engine uses carrier features,
+# since those move with each delivery. The carrier history store is only kept
+# when the engine scores with it. Once a page has asked for a delay model's
+# probabilities they are kept with the store too, predicted for the affected
+# orders only.
+#
+# A source that shrank or whose beginning changed was rewritten rather than
+# appended to, and triggers a full reload, as does any change to inventory.
+APPEND_TABLES = ['orders'] + ORDER_TABLES
+STATIC_TABLES = ['inventory']
+# Bytes at the start of each file compared between refreshes to detect rewrites
+PREFIX_CHECK_BYTES = 64 * 1024
+REFRESH_INTERVALS = {
+    'Real-time': 0,
+    '15 minutes': 15 * 60,
+    '1 hour': 60 * 60,
+    '4 hours': 4 * 60 * 60,
+    'Daily': 24 * 60 * 60,
+}
+
+
+class SourceRewritten(Exception):
+    pass
+
+
+class SourceCursor:
+    # Read position in one append-only CSV: the offset just past the last
+    # complete line consumed, plus the header to parse new rows with
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header = f.readline()
+            data = f.read()
+        # A trailing partial line is left for the next read
+        self.offset = len(self.header) + data.rfind(b'\n') + 1 if data else len(self.header)
+        self.prefix = self._prefix(min(self.offset, PREFIX_CHECK_BYTES))
+
+    def _prefix(self, n_bytes):
+        with open(self.path, 'rb') as f:
+            return f.read(n_bytes)
+
+    def read_new(self):
+        # CSV bytes (header included) of the complete lines appended since the
+        # last read, or None when there are none
+        size = os.path.getsize(self.path)
+        if size < self.offset or self._prefix(len(self.prefix)) != self.prefix:
+            raise SourceRewritten(self.path)
+        if size == self.offset:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b'\n') + 1
+        if not end:
+            return None
+        self.offset += end
+        if len(self.prefix) < PREFIX_CHECK_BYTES:
+            self.prefix = self._prefix(min(self.offset, PREFIX_CHECK_BYTES))
+        return self.header + data[:end]
+
+
+def _static_stats(data_path):
+    stats = {}
+    for name in STATIC_TABLES:
+        st = os.stat(os.path.join(data_path, SOURCE_FILES[name]))
+        stats[name] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+def _conform_dtypes(base, new):
+    # Give new rows the dtypes of the store, widening categorical columns of
+    # both to the union of their categories, so a concat or positional write
+    # keeps every dtype
+    for column in base.columns.intersection(new.columns):
+        current = base[column]
+        values = new[column]
+        if isinstance(current.dtype, pd.CategoricalDtype):
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                incoming = values.cat.categories
+            else:
+                incoming = pd.Index(values.dropna().unique())
+            missing = incoming.difference(current.cat.categories)
+            if len(missing):
+                base[column] = current.cat.add_categories(missing)
+        if values.dtype != base[column].dtype:
+            new[column] = values.astype(base[column].dtype)
+
+
+def _upsert_rows(frame, positions, rows):
+    # Overwrite the columns of `rows` at `positions` in place
+    rows = rows.copy()
+    _conform_dtypes(frame, rows)
+    for column in rows.columns:
+        if column != 'order_id' and column in frame:
+            frame.iloc[positions, frame.columns.get_loc(column)] = rows[column].array
+
+
+def _latest(frames):
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return None
+    rows = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return rows.drop_duplicates('order_id', keep='last').reset_index(drop=True)
+
+
+class IncrementalLoader:
+    def __init__(self, data_path='data/', engine=None):
+        self.data_path = data_path
+        self.engine = engine
+        self.model = None
+        self.probability = None
+        self.last_refresh = None
+        self.refreshes = 0
+        self.full_reloads = 0
+        self._checked_at = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._full_load()
+
+    def _full_load(self):
+        # Cursors are placed before reading so rows appended during the load
+        # are read again on the next refresh; the upsert makes that harmless
+        cursors = {name: SourceCursor(os.path.join(self.data_path, SOURCE_FILES[name])) for name in APPEND_TABLES}
+        static = _static_stats(self.data_path)
+        merged = load_and_merge_all_data(self.data_path)
+        self._cursors = cursors
+        self._static = static
+        self._inventory = read_table('inventory', self.data_path)
+        self._pending = {name: None for name in ORDER_TABLES}
+        self._base_version = dataset_version(self.data_path)
+        self._generation = 0
+        self.merged = merged
+        self._ids = pd.Index(merged['order_id'])
+        self.features = CarrierFeatureStore.from_frame(merged) if self._uses_features() else None
+        self.risk = self.engine.score_frame(merged, features=self.features) if self.engine is not None else None
+        self.cube = KpiCube.from_frame(merged)
+        self.probability = self._predict(merged) if self.model is not None else None
+        self.full_reloads += 1
+
+    def _predict(self, rows):
+        return pd.Series(self.model.predict_proba(rows), index=rows.index, name='delay_probability')
+
+    def delay_probability(self, model, version):
+        # The model's delay probability for every stored order, kept current
+        # by each refresh from the first call on; None when the store has
+        # moved past the caller's snapshot `version`
+        with self._lock:
+            if self.model is not model:
+                self.model = model
+                self.probability = self._predict(self.merged)
+            return self.probability if self.version == version else None
+
+    def _uses_features(self):
+        return self.engine is not None and bool(self.engine.feature_columns)
+
+    @property
+    def version(self):
+        return f'{self._base_version}-{self._generation}'
+
+    def snapshot(self):
+        # Consistent (version, merged, risk, cube, features); published frames
+        # and stores are never modified afterwards
+        with self._lock:
+            return self.version, self.merged, self.risk, self.cube, self.features
+
+    def add_listener(self, listener):
+        # listener(changed, risk) is called after every refresh that changed
+        # the store, with the merged rows of the added and updated orders and
+        # their risk scores (None without an engine). It runs under the
+        # refresh lock, so it should only hand the rows off.
+        self._listeners.append(listener)
+
+    def refresh_if_due(self, interval_seconds):
+        if time.monotonic() - self._checked_at >= interval_seconds:
+            return self.refresh()
+        return None
+
+    @timed('ingest.refresh')
+    def refresh(self):
+        with self._lock:
+            start = time.perf_counter()
+            self._checked_at = time.monotonic()
+            try:
+                if _static_stats(self.data_path) != self._static:
+                    raise SourceRewritten('inventory')
+                new = {}
+                for name, cursor in self._cursors.items():
+                    raw = cursor.read_new()
+                    if raw is not None:
+                        new[name] = parse_table(name, io.BytesIO(raw))
+            except SourceRewritten:
+                self._full_load()
+                result = {'full_reload': True, 'added': len(self.merged), 'updated': 0}
+                changed = slice(None)
+            else:
+                if not new:
+                    return None
+                summary, changed = self._apply(new)
+                result = dict(summary, full_reload=False)
+            self._generation += 1
+            self.refreshes += 1
+            result['pending'] = sum(len(rows) for rows in self._pending.values() if rows is not None)
+            result['seconds'] = time.perf_counter() - start
+            result['at'] = time.time()
+            self.last_refresh = result
+            if self._listeners:
+                rows = self.merged.iloc[changed]
+                risk = self.risk.iloc[changed] if self.risk is not None else None
+                for listener in self._listeners:
+                    listener(rows, risk)
+            return result
+
+    def _apply(self, new):
+        ids = self._ids
+        orders = _latest([new.get('orders')])
+        per_order = {name: _latest([self._pending[name], new.get(name)]) for name in ORDER_TABLES}
+
+        added_ids = pd.Index([])
+        if orders is not None:
+            added_ids = pd.Index(orders['order_id'][~orders['order_id'].isin(ids)])
+
+        # Split every table's rows into known orders, new orders and rows
+        # still waiting for their order
+        updates, additions = {}, {}
+        for name, rows in [('orders', orders)] + list(per_order.items()):
+            if rows is None:
+                continue
+            known = rows['order_id'].isin(ids).to_numpy()
+            if known.any():
+                updates[name] = rows[known]
+            fresh = rows['order_id'].isin(added_ids).to_numpy()
+            if fresh.any():
+                additions[name] = rows[fresh]
+            if name != 'orders':
+                waiting = rows[~known & ~fresh]
+                self._pending[name] = waiting.reset_index(drop=True) if len(waiting) else None
+
+        merged = self.merged
+        added = None
+        if 'orders' in additions:
+            additions['inventory'] = self._inventory
+            added = merge_tables(additions).reindex(columns=merged.columns)
+            base = merged.copy(deep=False)
+            _conform_dtypes(base, added)
+            merged = pd.concat([base, added], ignore_index=True)
+        elif updates:
+            merged = merged.copy()
+
+        before = after = None
+        if updates:
+            index = pd.Index(merged['order_id'])
+            positions = index.get_indexer(pd.concat([rows['order_id'] for rows in updates.values()]).unique())
+            before = self.merged.iloc[positions].copy()
+            for rows in updates.values():
+                _upsert_rows(merged, index.get_indexer(rows['order_id']), rows)
+            after = add_derived_columns(merged.iloc[positions].copy())
+            for column in DERIVED_COLUMNS:
+                if column in merged and column in after:
+                    merged.iloc[positions, merged.columns.get_loc(column)] = after[column].array
+
+        self.merged = merged
+        self._ids = pd.Index(merged['order_id'])
+
+        if self.features is not None:
+            features = CarrierFeatureStore(self.features.lanes, self.features.latest_day)
+            if added is not None:
+                features.update(added=added)
+            if before is not None:
+                features.update(added=after, removed=before)
+            self.features = features
+            self.risk = self.engine.score_frame(merged, features=features)
+        elif self.engine is not None:
+            risk = self.risk
+            if added is not None:
+                risk = pd.concat([risk, self.engine.score_frame(added)], ignore_index=True)
+            elif before is not None:
+                risk = risk.copy()
+            if before is not None:
+                rescored = self.engine.score_frame(after)
+                for column in rescored.columns:
+                    risk.iloc[positions, risk.columns.get_loc(column)] = rescored[column].array
+            self.risk = risk
+
+        if self.model is not None:
+            probability = self.probability
+            if added is not None:
+                probability = pd.concat([probability, self._predict(added)], ignore_index=True)
+            elif before is not None:
+                probability = probability.copy()
+            if before is not None:
+                probability.iloc[positions] = self.model.predict_proba(after)
+            self.probability = probability
+
+        cube = KpiCube(self.cube.cells)
+        if added is not None:
+            cube.update(added=added)
+        if before is not None:
+            cube.update(added=after, removed=before)
+        self.cube = cube
+
+        summary = {
+            'added': 0 if added is None else len(added),
+            'updated': 0 if before is None else len(before),
+        }
+        # Positions of every added or updated order in the new store
+        changed = np.arange(len(merged) - summary['added'], len(merged))
+        if before is not None:
+            changed = np.union1d(positions, changed)
+        return summary, changed
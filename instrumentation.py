@@ -0,0 +1,262 @@
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Stage timing for the hot paths: data load and merge, filtering, scoring,
+# KPI rollups and figure building. Code marks a stage with
+#
+#   with stage('app.filter') as s:
+#       ...
+#       s.rows = len(result)
+#
+# or decorates a function with @timed('data_loader.merge_tables'). Each
+# finished stage records its wall time, row count, change in resident memory
+# and nesting depth. Records are kept process-wide for the summaries and
+# exports, and per thread for the current Streamlit run. Whether a thread
+# traces is set per run by begin_run (the app passes the session's checkbox),
+# falling back to the process-wide `enabled` on threads that never began a
+# run, such as the alert worker. When tracing is off, stage() hands back a
+# shared no-op and @timed adds one flag check.
+TRACE_ENV = 'PERF_TRACE'
+# Paths the app appends JSON lines to / rewrites Prometheus text at after
+# every run, when set
+TRACE_LOG_ENV = 'PERF_TRACE_LOG'
+TRACE_PROM_ENV = 'PERF_TRACE_PROM'
+MAX_RECORDS = 10_000
+METRIC_PREFIX = 'nexgen'
+QUANTILES = [0.5, 0.95]
+
+
+def process_rss_bytes():
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _rows_of(result):
+    shape = getattr(result, 'shape', None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+class _NullStage:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('tracer', 'name', 'rows', '_started_at', '_start', '_rss', '_depth')
+
+    def __init__(self, tracer, name, rows=None):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+
+    def start(self):
+        local = self.tracer._local
+        self._depth = getattr(local, 'depth', 0)
+        local.depth = self._depth + 1
+        self._rss = process_rss_bytes() if self.tracer.track_memory else 0
+        self._started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        seconds = time.perf_counter() - self._start
+        memory = process_rss_bytes() - self._rss if self.tracer.track_memory else 0
+        self.tracer._local.depth = self._depth
+        self.tracer._record(self.name, self._started_at, seconds, self.rows, memory, self._depth)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def _dump_jsonl(records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+class Tracer:
+    def __init__(self, enabled=False, track_memory=True, max_records=MAX_RECORDS):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.records = deque(maxlen=max_records)
+        self._totals = {}
+        self._sequence = 0
+        self._exported = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        # Whether this thread records stages
+        return getattr(self._local, 'enabled', self.enabled)
+
+    def stage(self, name, rows=None):
+        if not self.active:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def timed(self, name):
+        # Decorator; the row count is taken from the result's shape
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.active:
+                    return func(*args, **kwargs)
+                with self.stage(name) as timer:
+                    result = func(*args, **kwargs)
+                    timer.rows = _rows_of(result)
+                return result
+            return wrapper
+        return decorate
+
+    def begin_run(self, enabled=None):
+        # Starts collecting this thread's records afresh, e.g. per rerun;
+        # `enabled` turns tracing on or off for this thread's run only
+        self._local.enabled = self.enabled if enabled is None else bool(enabled)
+        self._local.run = []
+        self._local.depth = 0
+        self._local.run_start = time.perf_counter()
+
+    def current_run(self):
+        # (records of this thread since begin_run, seconds since begin_run)
+        run = getattr(self._local, 'run', None)
+        if run is None:
+            return [], 0.0
+        return list(run), time.perf_counter() - self._local.run_start
+
+    def _record(self, name, started_at, seconds, rows, memory, depth):
+        record = {
+            'stage': name,
+            'started_at': started_at,
+            'seconds': seconds,
+            'rows': rows,
+            'memory_delta_bytes': memory,
+            'depth': depth,
+            'thread': threading.current_thread().name,
+        }
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run.append(record)
+        with self._lock:
+            self._sequence += 1
+            record['sequence'] = self._sequence
+            self.records.append(record)
+            totals = self._totals.setdefault(name, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += rows or 0
+
+    def summary(self):
+        # Per stage: call count, total seconds and rows since start, and
+        # latency quantiles over the records still kept
+        with self._lock:
+            totals = {name: list(values) for name, values in self._totals.items()}
+            recent = list(self.records)
+        latencies = {}
+        for record in recent:
+            latencies.setdefault(record['stage'], []).append(record['seconds'])
+        result = []
+        for name, (count, seconds, rows) in sorted(totals.items()):
+            values = np.array(latencies.get(name, [np.nan]))
+            entry = {'stage': name, 'count': count, 'seconds_total': seconds, 'rows_total': rows}
+            for q in QUANTILES:
+                entry[f'p{int(q * 100)}_seconds'] = float(np.quantile(values, q))
+            result.append(entry)
+        return result
+
+    def prometheus_text(self, prefix=METRIC_PREFIX):
+        lines = [
+            f'# HELP {prefix}_stage_seconds Wall time of instrumented stages.',
+            f'# TYPE {prefix}_stage_seconds summary',
+        ]
+        summary = self.summary()
+        for entry in summary:
+            label = f'stage="{entry["stage"]}"'
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{{label},quantile="{q}"}} {entry[f"p{int(q * 100)}_seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{label}}} {entry["seconds_total"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{{label}}} {entry["count"]}')
+        lines += [
+            f'# HELP {prefix}_stage_rows_total Rows processed by instrumented stages.',
+            f'# TYPE {prefix}_stage_rows_total counter',
+        ]
+        for entry in summary:
+            lines.append(f'{prefix}_stage_rows_total{{stage="{entry["stage"]}"}} {entry["rows_total"]}')
+        lines += [
+            f'# HELP {prefix}_process_resident_bytes Resident set size of the app process.',
+            f'# TYPE {prefix}_process_resident_bytes gauge',
+            f'{prefix}_process_resident_bytes {process_rss_bytes()}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def jsonl(self, since_sequence=0):
+        with self._lock:
+            records = [r for r in self.records if r['sequence'] > since_sequence]
+        return _dump_jsonl(records)
+
+    def write_jsonl(self, path):
+        # Appends the records not yet written by an earlier call. Taking them
+        # and marking them exported happen under one lock, so a record added
+        # meanwhile is neither skipped nor written twice.
+        with self._lock:
+            records = [r for r in self.records if r['sequence'] > self._exported]
+            if records:
+                self._exported = records[-1]['sequence']
+        text = _dump_jsonl(records)
+        if text:
+            with open(path, 'a') as f:
+                f.write(text)
+
+    def write_prometheus(self, path):
+        # Atomic rewrite, for a textfile collector to pick up
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self._totals.clear()
+
+
+tracer = Tracer(enabled=os.environ.get(TRACE_ENV, '').lower() not in ('', '0', 'false', 'no'))
+
+
+def stage(name, rows=None):
+    return tracer.stage(name, rows)
+
+
+def timed(name):
+    return tracer.timed(name)
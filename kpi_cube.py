@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# Pre-aggregated store behind the Executive Dashboard and Performance Analytics
+# pages. One cell per (day, priority, origin, destination, carrier) holds the
+# order count and, per measure, the non-null count, sum and sum of squares, so
+# counts, means, totals and standard deviations for any roll-up come from the
+# cells instead of the raw orders.
+CUBE_DIMENSIONS = ['order_date', 'priority', 'origin_warehouse', 'destination_city', 'carrier']
+CUBE_MEASURES = ['delayed', 'customer_rating', 'delivery_cost']
+# Customer ratings are also counted per star so the rating distribution can be
+# charted from the cells
+RATING_VALUES = [1, 2, 3, 4, 5]
+RATING_COLUMNS = [f'rating_{value}' for value in RATING_VALUES]
+
+# Roll-up keys that are derived from a dimension rather than stored. Weeks
+# are keyed on their Monday so the same week number in different years stays
+# apart.
+DERIVED_KEYS = {
+    'order_week': lambda cells: cells['order_date'].dt.to_period('W').dt.start_time,
+}
+
+
+def _measure_columns(measure):
+    return [f'{measure}_n', f'{measure}_sum', f'{measure}_sumsq']
+
+
+def aggregate_orders(orders):
+    # Collapse raw order rows into cube cells
+    n_rows = len(orders)
+    data = {}
+    for dim in CUBE_DIMENSIONS:
+        if dim not in orders:
+            dtype = 'datetime64[ns]' if dim == 'order_date' else object
+            data[dim] = pd.Series(None, index=orders.index, dtype=dtype)
+        elif dim == 'order_date':
+            data[dim] = pd.to_datetime(orders[dim]).dt.normalize()
+        else:
+            data[dim] = orders[dim]
+    data['orders'] = np.ones(n_rows, dtype=np.int64)
+    for measure in CUBE_MEASURES:
+        if measure in orders:
+            values = orders[measure].astype('Float64').to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = np.full(n_rows, np.nan)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        n_col, sum_col, sumsq_col = _measure_columns(measure)
+        data[n_col] = present.astype(np.int64)
+        data[sum_col] = filled
+        data[sumsq_col] = filled * filled
+        if measure == 'customer_rating':
+            for value, column in zip(RATING_VALUES, RATING_COLUMNS):
+                data[column] = (values == value).astype(np.int64)
+    rows = pd.DataFrame(data, index=orders.index)
+    return rows.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False).sum().reset_index()
+
+
+class KpiCube:
+    def __init__(self, cells=None):
+        self.cells = cells if cells is not None else aggregate_orders(pd.DataFrame())
+
+    @classmethod
+    @timed('kpi_cube.from_frame')
+    def from_frame(cls, orders):
+        return cls(aggregate_orders(orders))
+
+    @timed('kpi_cube.update')
+    def update(self, added=None, removed=None):
+        # Incremental maintenance: fold in new orders and back out the old
+        # version of changed ones (e.g. a delivery status update) without
+        # touching the rest of the history
+        changes = []
+        if added is not None and len(added):
+            changes.append(aggregate_orders(added))
+        if removed is not None and len(removed):
+            negated = aggregate_orders(removed)
+            value_columns = [c for c in negated.columns if c not in CUBE_DIMENSIONS]
+            negated[value_columns] = -negated[value_columns]
+            changes.append(negated)
+        if not changes:
+            return self
+        parts = ([self.cells] if len(self.cells) else []) + changes
+        cells = pd.concat(parts, ignore_index=True)
+        cells = cells.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False).sum().reset_index()
+        self.cells = cells[cells['orders'] != 0].reset_index(drop=True)
+        return self
+
+    @timed('kpi_cube.select')
+    def select(self, date_range=None, priorities=None, warehouses=None):
+        # Same semantics as the sidebar filters, applied to cells
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        if date_range is not None and len(date_range) == 2:
+            dates = cells['order_date']
+            mask &= ((dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))).to_numpy()
+        if priorities:
+            mask &= cells['priority'].isin(priorities).to_numpy()
+        if warehouses:
+            mask &= cells['origin_warehouse'].isin(warehouses).to_numpy()
+        return KpiCube(cells[mask])
+
+    def totals(self):
+        cells = self.cells
+        result = {'orders': int(cells['orders'].sum())}
+        for measure in CUBE_MEASURES:
+            n_col, sum_col, sumsq_col = _measure_columns(measure)
+            n, total, sumsq = cells[n_col].sum(), cells[sum_col].sum(), cells[sumsq_col].sum()
+            result[measure] = total / n if n else np.nan
+            result[f'{measure}_sum'] = total
+            result[f'{measure}_std'] = np.sqrt(max(sumsq - total * total / n, 0) / (n - 1)) if n > 1 else np.nan
+        return result
+
+    def rating_distribution(self):
+        counts = self.cells[RATING_COLUMNS].sum().to_numpy()
+        return pd.DataFrame({'customer_rating': RATING_VALUES, 'count': counts})
+
+    @timed('kpi_cube.rollup')
+    def rollup(self, by):
+        # Per-group order count plus mean, sum and sample std of every measure.
+        # Groups with a missing key are dropped, like a pandas groupby.
+        by = [by] if isinstance(by, str) else list(by)
+        cells = self.cells
+        keys = [DERIVED_KEYS[key](cells).rename(key) if key in DERIVED_KEYS else cells[key] for key in by]
+        value_columns = ['orders'] + [c for m in CUBE_MEASURES for c in _measure_columns(m)]
+        grouped = cells[value_columns].groupby(keys, observed=True).sum()
+        result = pd.DataFrame({'orders': grouped['orders']}, index=grouped.index)
+        for measure in CUBE_MEASURES:
+            n_col, sum_col, sumsq_col = _measure_columns(measure)
+            n = grouped[n_col].to_numpy(dtype=np.float64)
+            total = grouped[sum_col].to_numpy()
+            sumsq = grouped[sumsq_col].to_numpy()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[measure] = np.where(n > 0, total / n, np.nan)
+                variance = np.maximum(sumsq - total * total / n, 0) / (n - 1)
+                result[f'{measure}_std'] = np.where(n > 1, np.sqrt(variance), np.nan)
+            result[f'{measure}_sum'] = total
+        return result.reset_index()
@@ -0,0 +1,276 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Live traffic and weather lookups for scoring whole batches of orders.
+# Callers hand over every (origin, destination) pair or city they need; the
+# batch is deduplicated, answered from a TTL cache where possible, and the
+# rest is fetched concurrently from the provider. Fetches run on the feeds'
+# own event loop thread, so one session and connection pool serve every
+# batch whether the caller is blocking (Streamlit) or already running an
+# event loop (the scoring service). A failed lookup is cached only for
+# NEGATIVE_TTL_SECONDS so it is retried soon, and placeholder values are not
+# cached at all.
+#
+# The provider is chosen from FEEDS_URL: unset uses RandomProvider (the old
+# placeholder behaviour), otherwise HttpProvider against that base URL, e.g.
+# the local stub from feeds_stub_server.py.
+FEEDS_URL_ENV = 'FEEDS_URL'
+WEATHER_CONDITIONS = ['Clear', 'Rain', 'Storm']
+MAX_CONCURRENCY = 16
+CACHE_TTL_SECONDS = 300.0
+NEGATIVE_TTL_SECONDS = 10.0
+CACHE_SIZE = 10_000
+REQUEST_TIMEOUT_SECONDS = 5.0
+# Upstream latencies kept for the percentile metrics
+LATENCY_WINDOW = 1000
+# Single lookups answer with these when the feed has no value
+FALLBACK_TRAFFIC_HOURS = 0.0
+FALLBACK_WEATHER = 'Clear'
+
+
+class TtlLruCache:
+    # Entries expire `ttl` seconds after they were stored; beyond `maxsize`
+    # the least recently used entry is evicted
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # (found, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FeedStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self.errors = 0
+        self._latencies = []
+        self._lock = threading.Lock()
+
+    def record_lookups(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def record_request(self, seconds, ok):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self._latencies.append(seconds)
+            del self._latencies[:-LATENCY_WINDOW]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'upstream_requests': self.requests,
+            'upstream_errors': self.errors,
+            'upstream_p50_ms': float(np.percentile(latencies, 50) * 1000) if len(latencies) else 0.0,
+            'upstream_p95_ms': float(np.percentile(latencies, 95) * 1000) if len(latencies) else 0.0,
+        }
+
+
+class RandomProvider:
+    # Offline stand-in with the same value ranges as the real feeds; its
+    # values are placeholders and never cached
+    needs_session = False
+    cacheable = False
+
+    async def traffic(self, session, origin, destination):
+        return float(np.random.uniform(0, 3))
+
+    async def weather(self, session, city):
+        return str(np.random.choice(WEATHER_CONDITIONS))
+
+
+class HttpProvider:
+    # GET {base_url}/traffic?origin=..&destination=.. -> {"delay_hours": float}
+    # GET {base_url}/weather?city=..                  -> {"condition": str}
+    needs_session = True
+    cacheable = True
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    async def _get(self, session, path, params):
+        async with session.get(f'{self.base_url}{path}', params=params) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def traffic(self, session, origin, destination):
+        body = await self._get(session, '/traffic', {'origin': origin, 'destination': destination})
+        return float(body['delay_hours'])
+
+    async def weather(self, session, city):
+        body = await self._get(session, '/weather', {'city': city})
+        return str(body['condition'])
+
+
+class LiveFeeds:
+    def __init__(self, provider, max_concurrency=MAX_CONCURRENCY, cache_size=CACHE_SIZE, ttl=CACHE_TTL_SECONDS):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.cache = TtlLruCache(cache_size, ttl)
+        self.stats = FeedStats()
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _run(self, coro):
+        # concurrent.futures.Future for coro on the feeds' event loop, started
+        # on first use
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='live-feeds', daemon=True)
+                self._thread.start()
+            return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _get_session(self):
+        # Only called on the feeds' loop. Imported on the first lookup that
+        # misses the cache rather than with the module, which the app loads at
+        # startup for the risk engine
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+            )
+        return self._session
+
+    async def _fetch_all(self, keys, fetch):
+        # Cached values for `keys` plus fresh ones for the misses; a failed
+        # lookup comes back as None
+        results, missing = {}, []
+        for key in dict.fromkeys(keys):
+            found, value = self.cache.get(key)
+            if found:
+                results[key] = value
+            else:
+                missing.append(key)
+        self.stats.record_lookups(len(results), len(missing))
+        if not missing:
+            return results
+        import aiohttp
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        session = self._get_session() if self.provider.needs_session else None
+
+        async def fetch_one(key):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    value = await fetch(session, *key)
+                except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError):
+                    self.stats.record_request(time.perf_counter() - start, ok=False)
+                    self.cache.put(key, None, ttl=NEGATIVE_TTL_SECONDS)
+                    return key, None
+                self.stats.record_request(time.perf_counter() - start, ok=True)
+                if self.provider.cacheable:
+                    self.cache.put(key, value)
+                return key, value
+
+        results.update(await asyncio.gather(*(fetch_one(key) for key in missing)))
+        return results
+
+    async def _traffic(self, pairs):
+        keys = [('traffic', str(origin), str(destination)) for origin, destination in pairs]
+        results = await self._fetch_all(keys, lambda session, _, o, d: self.provider.traffic(session, o, d))
+        return {(o, d): value for (_, o, d), value in results.items()}
+
+    async def _weather(self, cities):
+        keys = [('weather', str(city)) for city in cities]
+        results = await self._fetch_all(keys, lambda session, _, c: self.provider.weather(session, c))
+        return {c: value for (_, c), value in results.items()}
+
+    async def traffic_many(self, pairs):
+        # {(origin, destination): delay hours or None}; safe to await from
+        # any event loop
+        return await asyncio.wrap_future(self._run(self._traffic(pairs)))
+
+    async def weather_many(self, cities):
+        # {city: condition or None}
+        return await asyncio.wrap_future(self._run(self._weather(cities)))
+
+    # Blocking wrappers for Streamlit and other code without an event loop
+    def traffic_batch(self, pairs):
+        return self._run(self._traffic(pairs)).result()
+
+    def weather_batch(self, cities):
+        return self._run(self._weather(cities)).result()
+
+    def close(self):
+        # Close the pooled session and stop the feeds' loop
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_default_feeds = None
+_default_feeds_lock = threading.Lock()
+
+
+def default_feeds():
+    global _default_feeds
+    with _default_feeds_lock:
+        if _default_feeds is None:
+            url = os.environ.get(FEEDS_URL_ENV)
+            _default_feeds = LiveFeeds(HttpProvider(url) if url else RandomProvider())
+            atexit.register(_default_feeds.close)
+        return _default_feeds
+
+
+def get_feed_stats():
+    return default_feeds().stats.as_dict()
@@ -1,16 +1,377 @@
-def calculate_risk_score(row, weights):
-    score = 0
-    score += weights['priority'] * (row['priority'] == 'Express')
-    score += weights['traffic'] * (row['traffic_delay_hours'] > 2)
-    score += weights['weather'] * (row['weather_impact'] != 'None')
-    score += weights['distance'] * (row['distance_km'] > 500)
-    score += weights['carrier_history'] * (row['carrier_avg_delay'] > 0.5) # New factor
-    score += weights['time_of_day'] * (row['hour_of_day'] in [8, 9, 10, 17, 18]) # New factor
-    return min(score, 1.0) # Cap at 1.0
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from carrier_features import FEATURE_COLUMNS
+from instrumentation import timed
+from live_feeds import FALLBACK_TRAFFIC_HOURS, FALLBACK_WEATHER, default_feeds
+
+PEAK_HOURS = [8, 9, 10, 17, 18]
+
+
+# Vectorized batch scoring. Categorical columns are compared on their integer
+# codes so a 10M-row frame never materializes per-row strings.
+def _categorical(values):
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat
+    if isinstance(values, pd.Categorical):
+        return values
+    return None
+
+
+def _labels(values):
+    # Plain label arrays; an all-missing column arrives as float NaN and would
+    # not compare elementwise against strings
+    labels = np.asarray(values)
+    if labels.dtype.kind not in 'OUS':
+        labels = labels.astype(object)
+    return labels
+
+
+def _equals(values, target):
+    cat = _categorical(values)
+    if cat is None:
+        return _labels(values) == target
+    if target not in cat.categories:
+        return np.zeros(len(cat.codes), dtype=bool)
+    return np.asarray(cat.codes) == cat.categories.get_loc(target)
+
+
+def _isin(values, targets):
+    cat = _categorical(values)
+    if cat is None:
+        return np.isin(_labels(values), targets)
+    codes = [cat.categories.get_loc(t) for t in targets if t in cat.categories]
+    return np.isin(np.asarray(cat.codes), codes)
+
+
+def _numeric(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+HIGH_RISK_CATEGORIES = ['Electronics', 'Healthcare']
+
+# Every risk factor the engine knows: weight key -> (input column, vectorized
+# flag). A weights dict picks which of them contribute and how much.
+RISK_FACTORS = {
+    'priority': ('priority', lambda v: _equals(v, 'Express')),
+    'traffic': ('traffic_delay_hours', lambda v: _numeric(v) > 2),
+    'weather': ('weather_impact', lambda v: ~_equals(v, 'None')),
+    'distance': ('distance_km', lambda v: _numeric(v) > 500),
+    'product': ('product_category', lambda v: _isin(v, HIGH_RISK_CATEGORIES)),
+    'carrier_history': ('carrier_avg_delay', lambda v: _numeric(v) > 0.5),
+    'time_of_day': ('hour_of_day', lambda v: np.isin(_numeric(v), PEAK_HOURS)),
+}
+
+# Weights used by the dashboard and the prediction form. carrier_history is
+# served by the carrier history store; time_of_day stays opt-in, since the
+# feeds carry order dates without a time.
+DEFAULT_WEIGHTS = {
+    'priority': 0.3,
+    'traffic': 0.2,
+    'weather': 0.2,
+    'distance': 0.15,
+    'product': 0.15,
+    'carrier_history': 0.15,
+}
+RISK_BINS = [0, 0.3, 0.6, 1.0]
+RISK_LABELS = ['Low', 'Medium', 'High']
+
+
+def _n_rows(data):
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    return len(next(iter(data.values())))
+
+
+class RiskEngine:
+    def __init__(self, weights=None, bins=None, labels=None):
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown = set(weights) - set(RISK_FACTORS)
+        if unknown:
+            raise ValueError(f"Unknown risk factors: {sorted(unknown)}")
+        self.bins = list(RISK_BINS if bins is None else bins)
+        self.labels = list(RISK_LABELS if labels is None else labels)
+        if len(self.labels) != len(self.bins) - 1:
+            raise ValueError("Risk labels must have one entry fewer than bins")
+        self.weights = dict(weights)
+        # Factors are applied in RISK_FACTORS order; zero weights are dropped
+        # so their input columns need not exist
+        self._active = [
+            (name, RISK_FACTORS[name][0], RISK_FACTORS[name][1], weights[name])
+            for name in RISK_FACTORS if weights.get(name, 0)
+        ]
+        self._inner_edges = np.asarray(self.bins[1:-1], dtype=np.float64)
+        self.key = (tuple(sorted(self.weights.items())), tuple(self.bins), tuple(self.labels))
+
+    @property
+    def columns(self):
+        return [column for _, column, _, _ in self._active]
+
+    @property
+    def factors(self):
+        return [name for name, _, _, _ in self._active]
+
+    @property
+    def feature_columns(self):
+        # Active factor columns served by a carrier_features.CarrierFeatureStore
+        return [column for column in self.columns if column in FEATURE_COLUMNS]
+
+    def _flags(self, data, features=None):
+        # (weight, flag array) per active factor. Factor columns that data
+        # lacks, e.g. carrier_avg_delay, are looked up from `features` (a
+        # carrier_features.CarrierFeatureStore) by each row's carrier and
+        # lane; without a store they are unknown and do not flag.
+        served = None
+        for _, column, flag, weight in self._active:
+            if column in FEATURE_COLUMNS and column not in data:
+                if features is None:
+                    values = np.full(_n_rows(data), np.nan)
+                else:
+                    if served is None:
+                        served = features.lookup(data)
+                    values = served[column]
+            else:
+                values = data[column]
+            yield weight, flag(values)
+
+    def score(self, data, features=None):
+        score = np.zeros(_n_rows(data), dtype=np.float64)
+        for weight, flags in self._flags(data, features):
+            score += weight * flags
+        return np.minimum(score, 1.0)
+
+    def contributions(self, data, features=None):
+        # (n_rows, n_factors) share of each row's score from each factor, in
+        # self.factors order. Rows sum to the score; where the sum of weights
+        # is capped at 1.0 every factor of the row is scaled alike.
+        matrix = np.zeros((_n_rows(data), len(self._active)), dtype=np.float64, order='F')
+        for i, (weight, flags) in enumerate(self._flags(data, features)):
+            matrix[:, i] = weight * flags
+        total = matrix.sum(axis=1)
+        capped = total > 1.0
+        if capped.any():
+            matrix[capped] /= total[capped, None]
+        return matrix
+
+    def classify(self, scores):
+        # Same intervals as pd.cut(scores, bins, include_lowest=True): right-closed
+        codes = np.searchsorted(self._inner_edges, scores, side='left')
+        return pd.Categorical.from_codes(codes, categories=self.labels, ordered=True)
+
+    def score_order(self, order, features=None):
+        if features is not None and any(column not in order for column in self.columns):
+            order = dict(features.lookup_one(order), **order)
+        data = {column: [order[column]] for column in self.columns if column in order}
+        return float(self.score(data)[0])
+
+    def classify_one(self, score):
+        return self.labels[int(np.searchsorted(self._inner_edges, score, side='left'))]
+
+    @timed('prediction_model.score_frame')
+    def score_frame(self, data, version=None, features=None):
+        # risk_score / risk_level for every row of data, indexed like data.
+        # With a version the result is memoized per (version, weights, bins).
+        if version is None:
+            return self._score_frame(data, features)
+        return _memoize(('risk', version, self.key), lambda: self._score_frame(data, features))
+
+    def _score_frame(self, data, features=None):
+        scores = self.score(data, features)
+        return pd.DataFrame(
+            {'risk_score': scores, 'risk_level': self.classify(scores)},
+            index=data.index
+        )
+
+
+SCORE_CACHE_SIZE = 8
+_score_cache = OrderedDict()
+_score_cache_lock = threading.Lock()
+
+
+def _memoize(cache_key, compute):
+    with _score_cache_lock:
+        cached = _score_cache.get(cache_key)
+        if cached is not None:
+            _score_cache.move_to_end(cache_key)
+            return cached
+    result = compute()
+    with _score_cache_lock:
+        _score_cache[cache_key] = result
+        while len(_score_cache) > SCORE_CACHE_SIZE:
+            _score_cache.popitem(last=False)
+    return result
+
+
+def calculate_risk_scores(data, weights, features=None):
+    # Batch scoring over a DataFrame or a dict of arrays
+    return RiskEngine(weights).score(data, features)
+
+
+def calculate_risk_score(row, weights, features=None):
+    return RiskEngine(weights).score_order(row, features)
+
+
+# Trained delay model (see train_model.py). Artifacts are joblib files named
+# delay_model_<version>.joblib in MODEL_DIR; the newest one is loaded once per
+# process, memory-mapped so its arrays are shared between processes.
+MODEL_DIR = 'models'
+MODEL_PREFIX = 'delay_model_'
+MODEL_CATEGORICAL_FEATURES = [
+    'priority', 'product_category', 'origin_warehouse', 'destination_city',
+    'customer_segment', 'weather_impact', 'special_handling',
+]
+MODEL_NUMERIC_FEATURES = ['distance_km', 'traffic_delay_hours', 'order_value']
+MODEL_FEATURES = MODEL_CATEGORICAL_FEATURES + MODEL_NUMERIC_FEATURES
+
+
+def model_features(data):
+    # Feature frame in MODEL_FEATURES order from a merged frame, a dict of
+    # arrays or a single order dict. Features that are not supplied (e.g. the
+    # prediction form has no destination) are passed to the model as missing.
+    if not isinstance(data, pd.DataFrame):
+        if not isinstance(next(iter(data.values())), (list, tuple, np.ndarray, pd.Series)):
+            data = {name: [value] for name, value in data.items()}
+        data = pd.DataFrame(data)
+    n_rows = len(data)
+    features = {}
+    for name in MODEL_CATEGORICAL_FEATURES:
+        values = data[name] if name in data else pd.Series([None] * n_rows, index=data.index)
+        features[name] = values.astype(object).where(values.notna(), None)
+    for name in MODEL_NUMERIC_FEATURES:
+        features[name] = (
+            data[name].astype(np.float64) if name in data
+            else pd.Series(np.nan, index=data.index)
+        )
+    return pd.DataFrame(features, index=data.index)
+
+
+class DelayModel:
+    def __init__(self, artifact, path=None):
+        self.pipeline = artifact['pipeline']
+        self.version = artifact['version']
+        self.metrics = artifact.get('metrics', {})
+        self.trained_at = artifact.get('trained_at')
+        self.path = path
+        # Inference skips the sklearn ColumnTransformer: categoricals are
+        # mapped straight from their codes to the fitted ordinal encoding
+        encoder = self.pipeline.named_steps['encode'].named_transformers_['categorical']
+        self._classifier = self.pipeline.named_steps['classify']
+        self._category_index = {
+            name: pd.Index([c for c in categories if not pd.isna(c)])
+            for name, categories in zip(MODEL_CATEGORICAL_FEATURES, encoder.categories_)
+        }
+
+    def encode(self, data):
+        if not isinstance(data, pd.DataFrame):
+            if not isinstance(next(iter(data.values())), (list, tuple, np.ndarray, pd.Series)):
+                data = {name: [value] for name, value in data.items()}
+        n_rows = _n_rows(data)
+        matrix = np.full((n_rows, len(MODEL_FEATURES)), np.nan, dtype=np.float64)
+        for i, name in enumerate(MODEL_CATEGORICAL_FEATURES):
+            if name not in data:
+                continue
+            index = self._category_index[name]
+            cat = _categorical(data[name])
+            if cat is not None:
+                lookup = index.get_indexer(cat.categories).astype(np.float64)
+                lookup[lookup < 0] = np.nan
+                codes = np.asarray(cat.codes)
+                matrix[:, i] = np.where(codes >= 0, lookup[codes], np.nan)
+            else:
+                values = np.asarray(data[name], dtype=object)
+                encoded = index.get_indexer(values).astype(np.float64)
+                encoded[(encoded < 0) | pd.isna(values)] = np.nan
+                matrix[:, i] = encoded
+        offset = len(MODEL_CATEGORICAL_FEATURES)
+        for i, name in enumerate(MODEL_NUMERIC_FEATURES):
+            if name in data:
+                matrix[:, offset + i] = _numeric(data[name])
+        return matrix
+
+    def predict_proba(self, data, batch_size=100_000):
+        matrix = self.encode(data)
+        if len(matrix) <= batch_size:
+            return self._classifier.predict_proba(matrix)[:, 1]
+        return np.concatenate([
+            self._classifier.predict_proba(matrix[start:start + batch_size])[:, 1]
+            for start in range(0, len(matrix), batch_size)
+        ])
+
+    def predict_order(self, order):
+        return float(self.predict_proba(order)[0])
+
+    @timed('prediction_model.predict_frame')
+    def predict_frame(self, data, version=None):
+        # delay_probability for every row of data, indexed like data; memoized
+        # per (dataset version, model version) when a version is given
+        def compute():
+            return pd.Series(self.predict_proba(data), index=data.index, name='delay_probability')
+        if version is None:
+            return compute()
+        return _memoize(('model', version, self.version), compute)
+
+
+def latest_model_path(model_dir=MODEL_DIR):
+    if not os.path.isdir(model_dir):
+        return None
+    artifacts = sorted(
+        f for f in os.listdir(model_dir)
+        if f.startswith(MODEL_PREFIX) and f.endswith('.joblib')
+    )
+    return os.path.join(model_dir, artifacts[-1]) if artifacts else None
+
+
+_loaded_models = {}
+_model_lock = threading.Lock()
+
+
+def load_delay_model(path=None, model_dir=MODEL_DIR):
+    # Returns None when no model has been trained yet
+    path = path or latest_model_path(model_dir)
+    if path is None:
+        return None
+    with _model_lock:
+        model = _loaded_models.get(path)
+        if model is None:
+            model = DelayModel(joblib.load(path, mmap_mode='r'), path)
+            _loaded_models[path] = model
+    return model
+
+
+def assess_orders(data, engine, model=None, features=None):
+    # The prediction form's answer for a batch of new orders: the model's
+    # delay probability and its risk level when a model is loaded, otherwise
+    # the rule-based score (shown capped at 95%) and its level. Carrier
+    # history comes from `features` when the orders do not carry it.
+    scores = engine.score(data, features)
+    if model is not None:
+        probability = model.predict_proba(data)
+        levels = engine.classify(probability)
+    else:
+        probability = np.minimum(scores, 0.95)
+        levels = engine.classify(scores)
+    return pd.DataFrame({'risk_score': scores, 'delay_probability': probability, 'risk_level': levels})
+
 
 # Placeholder structure for external data
+# Single lookups go through the shared batch layer in live_feeds so they share
+# its cache and always answer, with a fallback when the feed fails; score
+# batches with the *_batch variants, which give None for failed lookups
 def get_live_traffic(origin, destination):
-    return np.random.uniform(0, 3)
+    hours = default_feeds().traffic_batch([(origin, destination)])[(str(origin), str(destination))]
+    return FALLBACK_TRAFFIC_HOURS if hours is None else hours
 
 def get_weather_forecast(location):
-    return np.random.choice(['Clear', 'Rain', 'Storm'])
\ No newline at end of file
+    condition = default_feeds().weather_batch([location])[str(location)]
+    return FALLBACK_WEATHER if condition is None else condition
+
+def get_live_traffic_batch(pairs):
+    return default_feeds().traffic_batch(pairs)
+
+def get_weather_forecast_batch(locations):
+    return default_feeds().weather_batch(locations)
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import read_table
+
+# City graph for the "Plan Optimal Route" form. Edges come from the observed
+# lanes in routes_distance.csv, vehicle fuel efficiency and emissions from
+# vehicle_fleet.csv. All-pairs shortest paths are precomputed per (vehicle
+# type, objective) with a vectorized Floyd-Warshall, together with the best
+# via-city alternatives, so a query is a table lookup plus path walk.
+OBJECTIVES = ['Cost', 'Time', 'Sustainability', 'Balanced']
+EDGE_METRICS = ['distance_km', 'time_hours', 'cost_inr', 'co2_kg']
+OBJECTIVE_METRIC = {'Cost': 'cost_inr', 'Time': 'time_hours', 'Sustainability': 'co2_kg'}
+
+AVERAGE_SPEED_KMPH = 50.0
+FUEL_PRICE_INR_PER_L = 100.0
+MAX_ALTERNATIVES = 3
+
+
+def build_lanes(routes):
+    # One directed edge per observed origin-destination lane, using the median
+    # of its deliveries; lanes only seen in one direction are mirrored
+    ends = routes['route'].astype(str).str.split('-', n=1, expand=True)
+    lanes = pd.DataFrame({
+        'origin': ends[0],
+        'destination': ends[1],
+        'distance_km': routes['distance_km'].astype(np.float64),
+        'traffic_delay_hours': routes['traffic_delay_minutes'].astype(np.float64) / 60,
+        'toll_inr': routes['toll_charges'].astype(np.float64),
+        'fuel_l': routes['fuel_consumption'].astype(np.float64),
+    }).dropna(subset=['origin', 'destination', 'distance_km'])
+    lanes = lanes.groupby(['origin', 'destination'], as_index=False).median()
+    mirrored = lanes.rename(columns={'origin': 'destination', 'destination': 'origin'})
+    lanes = pd.concat([lanes, mirrored], ignore_index=True)
+    return lanes.drop_duplicates(['origin', 'destination'], keep='first').reset_index(drop=True)
+
+
+def build_vehicle_profiles(fleet):
+    return fleet.groupby('vehicle_type', observed=True).agg(
+        fuel_efficiency_km_per_l=('fuel_efficiency_km_per_l', 'mean'),
+        co2_kg_per_km=('co2_kg_per_km', 'mean'),
+    ).astype(np.float64)
+
+
+def _floyd_warshall(weight):
+    # weight: (n, n) objective matrix with inf for missing edges. Returns the
+    # shortest-path matrix and the next-hop matrix (-1 when unreachable).
+    n = len(weight)
+    dist = weight.copy()
+    np.fill_diagonal(dist, 0.0)
+    next_hop = np.where(np.isfinite(dist), np.arange(n)[None, :], -1)
+    for k in range(n):
+        candidate = dist[:, k, None] + dist[None, k, :]
+        better = candidate < dist
+        if not better.any():
+            continue
+        dist = np.where(better, candidate, dist)
+        next_hop = np.where(better, next_hop[:, k, None], next_hop)
+    return dist, next_hop
+
+
+def build_carrier_table(merged_data):
+    # Carrier with the lowest observed delay rate per (origin, destination)
+    # lane, plus the best carrier overall as a fallback for unseen lanes
+    delivered = merged_data.dropna(subset=['carrier', 'delayed'])
+    if delivered.empty:
+        return {}, None
+    delivered = delivered.assign(delayed=delivered['delayed'].astype(np.float64))
+    overall = delivered.groupby('carrier', observed=True)['delayed'].mean()
+    lanes = (
+        delivered.groupby(['origin_warehouse', 'destination_city', 'carrier'], observed=True)['delayed']
+        .mean().reset_index()
+        .sort_values(['delayed', 'carrier'])
+        .drop_duplicates(['origin_warehouse', 'destination_city'])
+    )
+    table = {
+        (str(o), str(d)): str(c)
+        for o, d, c in zip(lanes['origin_warehouse'], lanes['destination_city'], lanes['carrier'])
+    }
+    return table, str(overall.idxmin())
+
+
+class RoutePlanner:
+    def __init__(self, lanes, vehicle_profiles, carrier_table=None, default_carrier=None):
+        self.carrier_table = carrier_table or {}
+        self.default_carrier = default_carrier
+        self.cities = sorted(set(lanes['origin']) | set(lanes['destination']))
+        self.vehicle_types = list(vehicle_profiles.index.astype(str))
+        self._city_index = {city: i for i, city in enumerate(self.cities)}
+        n = len(self.cities)
+        src = lanes['origin'].map(self._city_index).to_numpy()
+        dst = lanes['destination'].map(self._city_index).to_numpy()
+
+        def edge_matrix(values):
+            matrix = np.full((n, n), np.inf)
+            matrix[src, dst] = values
+            return matrix
+
+        distance = lanes['distance_km'].to_numpy()
+        # Shortest road distance between every pair of cities, vehicle independent
+        self.distance_km = _floyd_warshall(edge_matrix(distance))[0]
+        time_hours = distance / AVERAGE_SPEED_KMPH + lanes['traffic_delay_hours'].fillna(0).to_numpy()
+        tolls = lanes['toll_inr'].fillna(0).to_numpy()
+
+        self._tables = {}
+        for vehicle_type, profile in vehicle_profiles.iterrows():
+            fuel_l = distance / profile['fuel_efficiency_km_per_l']
+            metrics = {
+                'distance_km': edge_matrix(distance),
+                'time_hours': edge_matrix(time_hours),
+                'cost_inr': edge_matrix(fuel_l * FUEL_PRICE_INR_PER_L + tolls),
+                'co2_kg': edge_matrix(distance * profile['co2_kg_per_km']),
+            }
+            # Balanced: every metric scaled by its mean edge value, equal weights
+            balanced = sum(
+                matrix / np.nanmean(np.where(np.isfinite(matrix), matrix, np.nan))
+                for name, matrix in metrics.items() if name != 'distance_km'
+            )
+            for objective in OBJECTIVES:
+                weight = balanced if objective == 'Balanced' else metrics[OBJECTIVE_METRIC[objective]]
+                dist, next_hop = _floyd_warshall(weight)
+                self._tables[(str(vehicle_type), objective)] = {
+                    'dist': dist,
+                    'next': next_hop,
+                    'edges': metrics,
+                    'alternatives': self._via_alternatives(dist),
+                }
+
+    @classmethod
+    def from_data(cls, data_path='data/', merged_data=None):
+        carrier_table, default_carrier = build_carrier_table(merged_data) if merged_data is not None else ({}, None)
+        return cls(
+            build_lanes(read_table('routes', data_path)),
+            build_vehicle_profiles(read_table('fleet', data_path)),
+            carrier_table,
+            default_carrier,
+        )
+
+    def city_codes(self, cities):
+        # Position of each city in self.cities, -1 when it is not on the graph
+        return pd.Index(self.cities).get_indexer(pd.Index(cities).astype(str))
+
+    def recommend_carrier(self, origin, destination):
+        return self.carrier_table.get((origin, destination), self.default_carrier)
+
+    @staticmethod
+    def _via_alternatives(dist):
+        # Cost of going i -> v -> j for every via city v, best first; direct
+        # (v == i or v == j) and unreachable vias are excluded
+        n = len(dist)
+        via = dist[:, :, None] + dist[None, :, :]          # via[i, v, j]
+        via = np.transpose(via, (0, 2, 1))                 # via[i, j, v]
+        idx = np.arange(n)
+        via[idx, :, idx] = np.inf
+        via[:, idx, idx] = np.inf
+        order = np.argsort(via, axis=2)[:, :, :MAX_ALTERNATIVES * 2]
+        return order, np.take_along_axis(via, order, axis=2)
+
+    def _path(self, table, i, j):
+        next_hop = table['next']
+        if next_hop[i, j] < 0:
+            return None
+        path = [i]
+        while i != j:
+            i = next_hop[i, j]
+            path.append(i)
+        return path
+
+    def _summary(self, table, path, objective_value):
+        totals = {name: 0.0 for name in EDGE_METRICS}
+        for a, b in zip(path, path[1:]):
+            for name in EDGE_METRICS:
+                totals[name] += table['edges'][name][a, b]
+        return dict(
+            totals,
+            path=[self.cities[i] for i in path],
+            objective=float(objective_value),
+        )
+
+    def plan(self, origin, destination, vehicle_type, objective='Balanced', alternatives=2):
+        # Best route plus up to `alternatives` distinct via-city routes, each a
+        # dict of path, distance_km, time_hours, cost_inr, co2_kg, objective.
+        # Returns None when either city is unknown or unreachable.
+        if origin not in self._city_index or destination not in self._city_index:
+            return None
+        table = self._tables[(vehicle_type, objective)]
+        i, j = self._city_index[origin], self._city_index[destination]
+        best_path = self._path(table, i, j)
+        if best_path is None:
+            return None
+        result = {'best': self._summary(table, best_path, table['dist'][i, j]), 'alternatives': []}
+
+        seen = {tuple(best_path)}
+        order, values = table['alternatives']
+        for v, value in zip(order[i, j], values[i, j]):
+            if len(result['alternatives']) >= min(alternatives, MAX_ALTERNATIVES) or not np.isfinite(value):
+                break
+            path = self._path(table, i, v) + self._path(table, v, j)[1:]
+            if len(set(path)) != len(path) or tuple(path) in seen:
+                continue
+            seen.add(tuple(path))
+            result['alternatives'].append(self._summary(table, path, value))
+        return result
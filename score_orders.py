@@ -0,0 +1,161 @@
+# Headless batch scoring: stream orders with their delivery and route data in
+# bounded chunks, score each chunk and write the results as they are ready.
+#
+#   python score_orders.py --output scores.parquet [--workers 4] [--chunksize 200000]
+#   python score_orders.py --output recent.parquet --start 2025-10-01 [--end 2025-10-20]
+#
+# Memory stays proportional to chunksize * workers, not to the size of the
+# extracts. With --start/--end only the orders placed in that window are
+# scored, read one partition at a time from the date-partitioned layout. When
+# the risk engine uses carrier history, a first streaming pass over the whole
+# history builds the carrier feature store the workers score with. Prints
+# rows/sec and peak RSS when done.
+import argparse
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from carrier_features import HISTORY_COLUMNS, LANE_KEY, CarrierFeatureStore
+from data_loader import DERIVED_COLUMNS, iter_merged_chunks, iter_partitions, partition_manifest
+from prediction_model import MODEL_FEATURES, RISK_FACTORS, RiskEngine, load_delay_model
+
+_engine = None
+_model = None
+_features = None
+
+
+def _init_worker(use_model, model_path, features=None):
+    global _engine, _model, _features
+    _engine = RiskEngine()
+    _model = load_delay_model(model_path) if use_model else None
+    _features = features
+
+
+def build_features(data_path, chunksize):
+    # Carrier history over every order, folded in one merged chunk at a time;
+    # the routes table holds none of its inputs
+    features = CarrierFeatureStore()
+    for chunk in iter_merged_chunks(data_path, chunksize, tables=('delivery',), usecols=HISTORY_COLUMNS):
+        features.update(added=chunk)
+    return features
+
+
+def score_chunk(chunk):
+    risk = _engine.score_frame(chunk, features=_features)
+    scored = pd.DataFrame({
+        'order_id': chunk['order_id'],
+        'risk_score': risk['risk_score'],
+        'risk_level': risk['risk_level'],
+    })
+    if _model is not None:
+        scored['delay_probability'] = _model.predict_proba(chunk)
+    return scored
+
+
+class ResultWriter:
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._parquet = None
+        self._header = True
+
+    def write(self, scored):
+        if self.fmt == 'parquet':
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            scored.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+        self.rows += len(scored)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux; children covers the worker processes
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 / 1024 / 1024 if sys.platform == 'darwin' else 1 / 1024
+    return own * scale, children * scale
+
+
+def run(data_path, output, fmt, chunksize, workers, use_model, model_path=None, date_range=None):
+    model_path = model_path if use_model else None
+    if use_model and model_path is None:
+        model = load_delay_model()
+        model_path = model.path if model is not None else None
+        use_model = model is not None
+    usecols = sorted({column for column, _ in RISK_FACTORS.values()} | set(MODEL_FEATURES) | set(LANE_KEY) | {
+        'traffic_delay_minutes'
+    })
+    if date_range is None:
+        chunks = iter_merged_chunks(data_path, chunksize, usecols=usecols)
+    else:
+        # The partitions hold the merged frame, derived columns included
+        stored = partition_manifest(data_path)['columns']
+        columns = [column for column in stored if column in usecols or column == 'order_id' or column in DERIVED_COLUMNS]
+        chunks = iter_partitions(data_path, date_range, columns=columns)
+    writer = ResultWriter(output, fmt)
+    start = time.perf_counter()
+    features = build_features(data_path, chunksize) if RiskEngine().feature_columns else None
+    try:
+        if workers <= 1:
+            _init_worker(use_model, model_path, features)
+            for chunk in chunks:
+                writer.write(score_chunk(chunk))
+        else:
+            # At most two chunks per worker in flight; results are written in
+            # input order as they complete
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(use_model, model_path, features)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    return writer.rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--output', required=True, help="Output file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument('--format', choices=['csv', 'parquet'])
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model', help="Delay model artifact; defaults to the newest in models/")
+    parser.add_argument('--no-model', action='store_true', help="Only compute rule-based risk scores")
+    parser.add_argument('--start', help="Only score orders placed on or after this date")
+    parser.add_argument('--end', help="Only score orders placed on or before this date (default: no limit)")
+    args = parser.parse_args()
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    date_range = None
+    if args.start or args.end:
+        date_range = (args.start, args.end)
+    rows, elapsed = run(
+        args.data_path, args.output, fmt, args.chunksize, args.workers,
+        use_model=not args.no_model, model_path=args.model, date_range=date_range,
+    )
+    own_mb, workers_mb = _peak_rss_mb()
+    print(f"Scored {rows:,} orders in {elapsed:.2f} s ({rows / elapsed if elapsed else 0:,.0f} rows/s) -> {args.output}")
+    print(f"Peak RSS: {own_mb:.0f} MB main, {workers_mb:.0f} MB largest worker")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+# Local HTTP scoring service for new orders: the "Predict Delay for New
+# Order" answer without a Streamlit rerun per request.
+#
+#   python scoring_service.py [--port 8090] [--workers 2] [--max-batch 256] [--max-wait-ms 2]
+#   curl -s localhost:8090/predict -d '{"priority": "Express", "origin_warehouse": "Mumbai",
+#       "product_category": "Electronics", "distance_km": 800, "weather_impact": "Rain",
+#       "traffic_delay_hours": 2.5, "carrier": "QuickShip"}'
+#   curl -s localhost:8090/metrics
+#
+# The risk engine, explainer, newest delay model and the carrier history
+# built from --data-path are loaded once and kept warm. Concurrent POST /predict requests are queued and coalesced into
+# micro-batches: a batch closes when it reaches --max-batch orders or
+# --max-wait-ms after its first order arrived, and is scored as one frame on
+# a pool of --workers threads. While every worker is busy the queue keeps
+# filling, so batches grow with load. GET /metrics reports request latency
+# p50/p99 and throughput over the last minute, and the batch sizes.
+import argparse
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from aiohttp import web
+
+from carrier_features import LANE_KEY, CarrierFeatureStore
+from data_loader import load_and_merge_all_data
+from explanations import RiskExplainer
+from instrumentation import timed
+from prediction_model import MODEL_FEATURES, MODEL_NUMERIC_FEATURES, RiskEngine, assess_orders, load_delay_model
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+METRICS_WINDOW_SECONDS = 60
+# Orders waiting for a worker before requests are turned away with 503
+MAX_QUEUED_ORDERS = 50_000
+NUMERIC_FIELDS = set(MODEL_NUMERIC_FEATURES) | {'carrier_avg_delay', 'hour_of_day'}
+# Scored once at startup to warm the model
+WARMUP_ORDER = {
+    'priority': 'Standard',
+    'origin_warehouse': 'Mumbai',
+    'product_category': 'Books',
+    'distance_km': 100,
+    'weather_impact': 'None',
+    'traffic_delay_hours': 0.0,
+    'carrier': 'QuickShip',
+    'hour_of_day': 12,
+}
+
+
+class ServiceStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.started = time.monotonic()
+        self._latencies = deque()
+        self._batch_sizes = deque()
+
+    def _trim(self, now):
+        for window in (self._latencies, self._batch_sizes):
+            while window and now - window[0][0] > METRICS_WINDOW_SECONDS:
+                window.popleft()
+
+    # Both are called from the event loop thread only
+    def record_request(self, seconds):
+        now = time.monotonic()
+        self.requests += 1
+        self._latencies.append((now, seconds))
+        self._trim(now)
+
+    def record_batch(self, size):
+        now = time.monotonic()
+        self.batches += 1
+        self._batch_sizes.append((now, size))
+        self._trim(now)
+
+    def as_dict(self):
+        now = time.monotonic()
+        self._trim(now)
+        latencies = np.array([seconds for _, seconds in self._latencies])
+        sizes = np.array([size for _, size in self._batch_sizes])
+        window = min(METRICS_WINDOW_SECONDS, now - self.started) or 1.0
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'requests_per_sec': len(latencies) / window,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) * 1000 if len(latencies) else 0.0,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) * 1000 if len(latencies) else 0.0,
+            'batch_size_mean': float(sizes.mean()) if len(sizes) else 0.0,
+            'batch_size_max': int(sizes.max()) if len(sizes) else 0,
+        }
+
+
+class OrderScorer:
+    def __init__(self, engine=None, model=None, explainer=None, features=None):
+        self.engine = engine or RiskEngine()
+        self.model = model
+        self.explainer = explainer or RiskExplainer(self.engine)
+        self.features = features
+        # Orders must carry the risk engine's inputs apart from carrier
+        # history, which is looked up by carrier and lane when an order does
+        # not give it; the model treats any of its own features that are
+        # missing as unknown
+        self.served = self.engine.feature_columns
+        self.required = [column for column in self.engine.columns if column not in self.served]
+        self.fields = list(dict.fromkeys(self.engine.columns + MODEL_FEATURES + (LANE_KEY if self.served else [])))
+
+    def validate(self, order):
+        # The order's fields with numbers as floats and labels as strings, so
+        # one malformed order cannot fail the batch it is scored in
+        if not isinstance(order, dict):
+            raise ValueError("Expected a JSON object describing one order")
+        missing = [field for field in self.required if order.get(field) is None]
+        if missing:
+            raise ValueError(f"Missing order fields: {missing}")
+        clean = {}
+        for field in self.fields:
+            value = order.get(field)
+            if value is not None and field in NUMERIC_FIELDS:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{field} must be a number, got {value!r}")
+            elif value is not None:
+                value = str(value)
+            clean[field] = value
+        if self.features is not None and any(clean[column] is None for column in self.served):
+            history = self.features.lookup_one(clean)
+            for column in self.served:
+                if clean[column] is None:
+                    clean[column] = history[column]
+        return clean
+
+    @timed('scoring_service.score_batch')
+    def score_batch(self, orders):
+        # One result dict per order, in order
+        data = {field: [order[field] for order in orders] for field in self.fields}
+        assessment = assess_orders(data, self.engine, self.model)
+        explained = self.explainer.explain(data)
+        return [
+            {
+                'risk_score': score,
+                'delay_probability': probability,
+                'risk_level': level,
+                'top_factors': factors,
+                'recommended_action': action,
+            }
+            for score, probability, level, factors, action in zip(
+                assessment['risk_score'].tolist(),
+                assessment['delay_probability'].tolist(),
+                assessment['risk_level'].astype(object).tolist(),
+                explained['top_factors'].astype(object).tolist(),
+                explained['recommended_action'].astype(object).tolist(),
+            )
+        ]
+
+
+class MicroBatcher:
+    def __init__(self, score_batch, stats, workers=DEFAULT_WORKERS, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.score_batch = score_batch
+        self.stats = stats
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._executor = None
+        self._slots = None
+        self._task = None
+
+    @property
+    def queued(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='scoring')
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def submit(self, order):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((order, future))
+        return await future
+
+    async def _collect(self):
+        # Wait for one order, then take more until the batch is full or its
+        # first order has waited max_wait
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            if self._queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            # Only collect once a worker is free, so the queue builds up into
+            # the next batch while all of them are busy
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            asyncio.create_task(self._score(batch))
+
+    async def _score(self, batch):
+        try:
+            orders = [order for order, _ in batch]
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_batch, orders)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            self.stats.record_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+
+def make_app(scorer, workers=DEFAULT_WORKERS, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    stats = ServiceStats()
+    batcher = MicroBatcher(scorer.score_batch, stats, workers, max_batch, max_wait_ms)
+
+    async def predict(request):
+        start = time.perf_counter()
+        try:
+            order = scorer.validate(await request.json())
+        except ValueError as exc:
+            stats.errors += 1
+            raise web.HTTPBadRequest(text=str(exc))
+        if batcher.queued >= MAX_QUEUED_ORDERS:
+            stats.errors += 1
+            raise web.HTTPServiceUnavailable(text="Scoring queue is full")
+        try:
+            result = await batcher.submit(order)
+        except Exception as exc:
+            stats.errors += 1
+            raise web.HTTPInternalServerError(text=f"Scoring failed: {exc}")
+        response = web.json_response(result)
+        stats.record_request(time.perf_counter() - start)
+        return response
+
+    async def metrics(request):
+        return web.json_response(dict(stats.as_dict(), queued=batcher.queued))
+
+    async def health(request):
+        return web.json_response({
+            'model_version': scorer.model.version if scorer.model is not None else None,
+            'weights': scorer.engine.weights,
+            'workers': batcher.workers,
+            'max_batch': batcher.max_batch,
+            'max_wait_ms': batcher.max_wait * 1000,
+        })
+
+    async def on_startup(app):
+        # Score a throwaway order so the first request does not pay for
+        # warming the model
+        scorer.score_batch([scorer.validate(WARMUP_ORDER)])
+        await batcher.start()
+
+    async def on_cleanup(app):
+        await batcher.stop()
+
+    app = web.Application()
+    app['stats'] = stats
+    app['batcher'] = batcher
+    app.router.add_post('/predict', predict)
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/health', health)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--model', help="Model artifact to serve (default: newest in models/)")
+    parser.add_argument('--no-model', action='store_true', help="Serve the rule-based risk score only")
+    parser.add_argument('--data-path', default='data/', help="Order feeds to build the carrier history from")
+    args = parser.parse_args()
+    model = None if args.no_model else load_delay_model(args.model)
+    engine = RiskEngine()
+    features = CarrierFeatureStore.from_frame(load_and_merge_all_data(args.data_path)) if engine.feature_columns else None
+    scorer = OrderScorer(engine, model=model, features=features)
+    print(f"Serving {'model ' + model.version if model is not None else 'rule-based scores'}"
+          f" with {args.workers} workers, batches of up to {args.max_batch} within {args.max_wait_ms:g} ms")
+    web.run_app(make_app(scorer, args.workers, args.max_batch, args.max_wait_ms), host=args.host, port=args.port,
+                print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pandas as pd
+
+from filter_engine import FilterIndex
+from instrumentation import process_rss_bytes  # noqa: F401 (re-exported)
+
+# One read-only copy of the merged dataset per process, shared by every
+# dashboard session. Column buffers are write-protected, so a session that
+# tries to modify the shared frame in place gets an error instead of changing
+# the data under everyone else. Sessions keep only the row positions of their
+# filter selection. A run that needs the rows themselves takes a copy of the
+# selected rows, which lives until the run ends; its string columns copy
+# pointers to the shared strings rather than the strings.
+SESSION_IDLE_SECONDS = 15 * 60
+
+
+def _read_only_array(values):
+    array = values.array
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy().copy()
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=values.dtype)
+    if isinstance(array, (pd.arrays.BooleanArray, pd.arrays.IntegerArray, pd.arrays.FloatingArray)):
+        numpy_dtype = values.dtype.numpy_dtype
+        data = array.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0))
+        mask = values.isna().to_numpy()
+        data.flags.writeable = False
+        mask.flags.writeable = False
+        return type(array)(data, mask)
+    if values.dtype.kind in 'biufcmMO':
+        data = values.to_numpy(copy=True)
+        data.flags.writeable = False
+        return data
+    # Other extension types are shared as they are
+    return array
+
+
+def read_only_frame(frame):
+    # Same columns and dtypes, one write-protected buffer per column
+    columns = {name: _read_only_array(frame[name]) for name in frame.columns}
+    return pd.DataFrame(columns, index=frame.index, copy=False)
+
+
+def frame_nbytes(frame):
+    # Shallow size: object columns taken from the shared frame point at the
+    # shared strings, so only the pointers count against the session
+    return int(frame.memory_usage(index=True, deep=False).sum())
+
+
+class SharedDataset:
+    def __init__(self, frame, version=None):
+        self.frame = read_only_frame(frame)
+        self.version = version
+        self.index = FilterIndex(self.frame)
+        self.nbytes = int(self.frame.memory_usage(index=True, deep=True).sum())
+
+    def select(self, date_range=None, priorities=None, warehouses=None):
+        # Sorted, read-only row positions of the filter selection
+        return self.index.select(date_range, priorities, warehouses)
+
+    def take(self, positions=None):
+        # The shared frame itself when every row is selected, otherwise a
+        # copy of the selected rows
+        if positions is None or len(positions) == len(self.frame):
+            return self.frame
+        return self.frame.iloc[positions]
+
+
+class SessionRegistry:
+    # Bytes each session holds on top of the shared dataset, as of its last run
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, session_key, nbytes):
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_key] = (nbytes, now)
+            for key, (_, seen) in list(self._sessions.items()):
+                if now - seen > self.idle_seconds:
+                    del self._sessions[key]
+
+    def sessions(self):
+        with self._lock:
+            return {key: nbytes for key, (nbytes, _) in self._sessions.items()}
+
+    def report(self, dataset=None):
+        sessions = self.sessions()
+        return {
+            'active_sessions': len(sessions),
+            'shared_dataset_bytes': dataset.nbytes if dataset is not None else 0,
+            'session_bytes_total': sum(sessions.values()),
+            'session_bytes_max': max(sessions.values(), default=0),
+            'process_rss_bytes': process_rss_bytes(),
+        }
@@ -0,0 +1,408 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import SOURCE_FILES, TABLE_SCHEMAS
+from geo import CITY_COORDS, GeoIndex
+
+# Synthetic source extracts at any scale, in the schema of the seven CSVs in
+# data/. Orders are generated in fixed-size chunks, each from its own random
+# stream derived from the seed and the chunk number, so the output depends
+# only on (seed, chunk_orders) and not on the number of workers. Chunks are
+# generated in worker processes and written in order by the parent as they
+# arrive; at most a few chunks are held in memory at a time.
+#
+# The columns are correlated the way the real feeds are: promised days follow
+# the priority, delay odds the carrier, weather and traffic, delivery status
+# the delay, ratings and feedback the status and quality issues, and costs the
+# lane distance. Orders still in transit at the end date have no delivery,
+# route or cost rows, as in the daily extracts.
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet'}
+CHUNK_ORDERS = 250_000
+DEFAULT_END_DATE = '2025-10-20'
+DEFAULT_DAYS = 365
+DEFAULT_VEHICLES = 50
+
+# Relative volumes, from the sample extracts
+WAREHOUSES = {
+    'Mumbai': 45, 'Delhi': 37, 'Bangalore': 33, 'Kolkata': 23,
+    'Chennai': 22, 'Hyderabad': 17, 'Pune': 14, 'Ahmedabad': 9,
+}
+DESTINATIONS = {
+    'Bangkok': 26, 'Singapore': 20, 'Mumbai': 18, 'Dubai': 18, 'Hyderabad': 17, 'Bangalore': 16,
+    'Hong Kong': 16, 'Delhi': 15, 'Chennai': 15, 'Kolkata': 14, 'Pune': 13, 'Ahmedabad': 12,
+}
+INTERNATIONAL = {'Bangkok', 'Singapore', 'Dubai', 'Hong Kong'}
+CUSTOMER_SEGMENTS = {'SMB': 81, 'Enterprise': 60, 'Individual': 59}
+# priority -> (weight, promised days low, high, delivery cost multiplier)
+PRIORITIES = {
+    'Express': (46, 1, 2, 1.4),
+    'Standard': (84, 3, 5, 1.0),
+    'Economy': (70, 6, 10, 0.8),
+}
+# category -> (weight, median order value in INR, share needing cold chain)
+PRODUCT_CATEGORIES = {
+    'Fashion': (34, 900, 0.05),
+    'Books': (31, 410, 0.0),
+    'Home Goods': (30, 340, 0.0),
+    'Food & Beverage': (29, 580, 0.3),
+    'Electronics': (29, 740, 0.0),
+    'Industrial': (27, 240, 0.0),
+    'Healthcare': (20, 290, 0.3),
+}
+# carrier -> (weight, probability a delivery runs late in fair conditions)
+CARRIERS = {
+    'SpeedyLogistics': (41, 0.40),
+    'ReliableExpress': (40, 0.35),
+    'QuickShip': (31, 0.20),
+    'GlobalTransit': (22, 0.50),
+    'EcoDeliver': (16, 0.30),
+}
+# weather -> (weight, multiplier on the odds of a delay)
+WEATHER = {'None': (106, 1.0), 'Light_Rain': (24, 1.2), 'Heavy_Rain': (14, 1.6), 'Fog': (6, 1.4)}
+QUALITY_ISSUES = {'Perfect': 133, 'Minor_Damage': 6, 'Wrong_Item': 6, 'Incomplete': 3, 'Major_Damage': 2}
+# Rating distribution per delivery status
+RATINGS = {
+    'On-Time': [0.0, 0.0, 0.05, 0.25, 0.70],
+    'Slightly-Delayed': [0.10, 0.05, 0.70, 0.15, 0.0],
+    'Severely-Delayed': [0.55, 0.15, 0.30, 0.0, 0.0],
+}
+FEEDBACK_TEXTS = {
+    'positive': [
+        'Great service, very fast delivery!', 'No complaints, smooth process', 'Perfect condition, thank you',
+        'Excellent packaging', 'Driver was very professional',
+    ],
+    'late': ['Late delivery but good quality', 'Delayed by 3 days, not acceptable'],
+    'quality': ['Wrong item delivered', 'Package arrived damaged'],
+    'service': ['Poor customer service response'],
+}
+FEEDBACK_RATE = 0.55
+RECOMMEND_RATE = [0.1, 0.2, 0.5, 0.8, 0.9]
+# Share of the delivery cost taken by each cost component
+COST_SHARES = {
+    'Fuel_Cost': 0.32, 'Labor_Cost': 0.27, 'Vehicle_Maintenance': 0.11, 'Insurance': 0.07,
+    'Packaging_Cost': 0.07, 'Technology_Platform_Fee': 0.09, 'Other_Overhead': 0.07,
+}
+# vehicle type -> (weight, capacity kg, km per litre, kg CO2 per km), as
+# (low, high) ranges
+VEHICLE_TYPES = {
+    'Express_Bike': (2, (23, 40), (25, 31), (0.09, 0.11)),
+    'Small_Van': (13, (546, 956), (8.1, 10.9), (0.25, 0.33)),
+    'Medium_Truck': (9, (2057, 3873), (6.2, 8.9), (0.30, 0.43)),
+    'Refrigerated': (12, (1531, 2859), (5.0, 7.9), (0.34, 0.54)),
+    'Large_Truck': (14, (5383, 9952), (4.2, 6.9), (0.39, 0.64)),
+}
+VEHICLE_STATUSES = {'Available': 28, 'In_Transit': 19, 'Maintenance': 3}
+# Road distance over great-circle distance, and km per litre of the average truck
+ROAD_FACTOR = 1.3
+FLEET_KM_PER_L = 8.3
+# Columns written as integers; every other numeric column is a float
+INTEGER_COLUMNS = {
+    'Promised_Delivery_Days', 'Actual_Delivery_Days', 'Customer_Rating', 'Traffic_Delay_Minutes',
+    'Rating', 'Current_Stock_Units', 'Reorder_Level',
+}
+
+
+def _choice(rng, table, size):
+    # Keys of `table` drawn by weight; the value is the weight or a tuple
+    # starting with it
+    keys = list(table)
+    weights = np.array([v[0] if isinstance(v, tuple) else v for v in table.values()], dtype=np.float64)
+    return np.array(keys, dtype=object)[rng.choice(len(keys), size, p=weights / weights.sum())]
+
+
+def _lookup(table, keys, position=None):
+    values = {k: (v[position] if position is not None else v) for k, v in table.items()}
+    return pd.Series(keys).map(values).to_numpy(dtype=np.float64)
+
+
+def lane_distances():
+    # Road km between every pair of cities from great-circle distance; short
+    # local hops for same-city orders
+    geo = GeoIndex.build(CITY_COORDS)
+    km = geo.distance_km * ROAD_FACTOR
+    np.fill_diagonal(km, 60.0)
+    return pd.DataFrame(km, index=geo.names, columns=geo.names)
+
+
+def arrow_schema(name):
+    fields = []
+    for column, (_, dtype) in TABLE_SCHEMAS[name]['columns'].items():
+        if dtype == 'datetime':
+            fields.append(pa.field(column, pa.timestamp('ns')))
+        elif dtype in ('str', 'category'):
+            fields.append(pa.field(column, pa.string()))
+        else:
+            fields.append(pa.field(column, pa.int64() if column in INTEGER_COLUMNS else pa.float64()))
+    return pa.schema(fields)
+
+
+def _frame(name, columns):
+    return pd.DataFrame(columns, columns=list(TABLE_SCHEMAS[name]['columns']))
+
+
+def generate_chunk(seed, chunk, chunk_orders, n_orders, end_date, days):
+    # All order tables for orders chunk*chunk_orders+1 .. up to n_orders
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk,)))
+    first = chunk * chunk_orders
+    size = min(chunk_orders, n_orders - first)
+    id_width = max(6, len(str(n_orders)))
+    order_ids = np.char.add('ORD', np.char.zfill(np.arange(first + 1, first + size + 1).astype(str), id_width))
+    end = pd.Timestamp(end_date)
+    order_date = end - pd.to_timedelta(rng.integers(0, days, size), unit='D')
+
+    priority = _choice(rng, PRIORITIES, size)
+    category = _choice(rng, PRODUCT_CATEGORIES, size)
+    origin = _choice(rng, WAREHOUSES, size)
+    destination = _choice(rng, DESTINATIONS, size)
+    median_value = _lookup(PRODUCT_CATEGORIES, category, 1)
+    cold_chain = rng.random(size) < _lookup(PRODUCT_CATEGORIES, category, 2)
+    handling = np.where(cold_chain, 'Temperature_Controlled', _choice(rng, {'None': 85, 'Fragile': 10, 'Hazmat': 5}, size))
+    orders = _frame('orders', {
+        'Order_ID': order_ids,
+        'Order_Date': order_date,
+        'Customer_Segment': _choice(rng, CUSTOMER_SEGMENTS, size),
+        'Priority': priority,
+        'Product_Category': category,
+        'Order_Value_INR': np.maximum(np.round(median_value * rng.lognormal(0, 1.0, size), 2), 1.0),
+        'Origin': origin,
+        'Destination': destination,
+        'Special_Handling': handling,
+    })
+
+    # Lane, traffic and weather drive the delay odds
+    lanes = lane_distances()
+    distance = lanes.to_numpy()[lanes.index.get_indexer(origin), lanes.columns.get_indexer(destination)]
+    distance = np.round(distance * rng.lognormal(0, 0.15, size), 2)
+    international = pd.Series(destination).isin(INTERNATIONAL).to_numpy()
+    traffic = np.minimum(rng.gamma(1.2, 28, size), 240).astype(np.int64)
+    weather = _choice(rng, WEATHER, size)
+    carrier = _choice(rng, CARRIERS, size)
+    delay_odds = _lookup(CARRIERS, carrier, 1) * _lookup(WEATHER, weather, 1) * (1 + traffic / 240)
+    delayed = rng.random(size) < np.minimum(delay_odds, 0.95)
+    low = _lookup(PRIORITIES, priority, 1)
+    high = _lookup(PRIORITIES, priority, 2)
+    promised = (low + np.floor(rng.random(size) * (high - low + 1)) + international).astype(np.int64)
+    actual = promised + np.where(delayed, rng.geometric(0.45, size), 0)
+    late_by = actual - promised
+    status = np.where(late_by == 0, 'On-Time', np.where(late_by <= 2, 'Slightly-Delayed', 'Severely-Delayed'))
+    quality = _choice(rng, QUALITY_ISSUES, size)
+    rating = np.empty(size, dtype=np.int64)
+    for name, probabilities in RATINGS.items():
+        rows = status == name
+        rating[rows] = rng.choice(5, rows.sum(), p=probabilities) + 1
+    rating = np.where(quality != 'Perfect', np.maximum(rating - 1, 1), rating)
+    cost = (150 + 0.15 * distance) * _lookup(PRIORITIES, priority, 3) * rng.lognormal(0, 0.15, size)
+
+    # Orders not yet delivered by the end date have no delivery rows yet
+    done = np.asarray(order_date + pd.to_timedelta(actual, unit='D') <= end)
+    delivery = _frame('delivery', {
+        'Order_ID': order_ids,
+        'Carrier': carrier,
+        'Promised_Delivery_Days': promised,
+        'Actual_Delivery_Days': actual,
+        'Delivery_Status': status,
+        'Quality_Issue': quality,
+        'Customer_Rating': rating,
+        'Delivery_Cost_INR': np.round(cost, 2),
+    })[done]
+    routes = _frame('routes', {
+        'Order_ID': order_ids,
+        'Route': np.char.add(np.char.add(origin.astype(str), '-'), destination.astype(str)),
+        'Distance_KM': distance,
+        'Fuel_Consumption_L': np.round(distance / rng.normal(FLEET_KM_PER_L, 0.3, size), 2),
+        'Toll_Charges_INR': np.where(international, 0.0, np.round(distance * rng.uniform(0.4, 0.8, size), 2)),
+        'Traffic_Delay_Minutes': traffic,
+        'Weather_Impact': weather,
+    })[done]
+    costs = _frame('costs', {'Order_ID': order_ids, **{
+        column: np.round(cost * share * rng.lognormal(0, 0.1, size), 2) for column, share in COST_SHARES.items()
+    }})[done]
+
+    # A share of delivered orders leave feedback, in line with the delivery
+    gave = done & (rng.random(size) < FEEDBACK_RATE)
+    text_kind = np.where(quality != 'Perfect', 'quality', np.where(
+        late_by > 0, 'late', np.where(rating <= 2, 'service', 'positive')
+    ))
+    texts = np.empty(size, dtype=object)
+    for kind, options in FEEDBACK_TEXTS.items():
+        rows = text_kind == kind
+        texts[rows] = np.array(options, dtype=object)[rng.integers(0, len(options), rows.sum())]
+    issue = np.select(
+        [quality != 'Perfect', late_by > 0, rating <= 2, rating >= 4],
+        ['Quality', 'Timing', 'Service', 'None'], default='Other'
+    )
+    feedback_date = order_date + pd.to_timedelta(actual + rng.integers(0, 4, size), unit='D')
+    feedback = _frame('feedback', {
+        'Order_ID': order_ids,
+        'Feedback_Date': np.minimum(feedback_date.values, end.to_datetime64()),
+        'Rating': rating,
+        'Feedback_Text': texts,
+        'Would_Recommend': np.where(rng.random(size) < np.array(RECOMMEND_RATE)[rating - 1], 'Yes', 'No'),
+        'Issue_Category': issue,
+    })[gave]
+    return {'orders': orders, 'delivery': delivery, 'routes': routes, 'feedback': feedback, 'costs': costs}
+
+
+def generate_inventory(rng, end_date):
+    rows = []
+    for number, city in enumerate(WAREHOUSES, start=1):
+        for category in PRODUCT_CATEGORIES:
+            rows.append((f'WH{number:03d}_{city}', city, category))
+    size = len(rows)
+    warehouse_ids, cities, categories = zip(*rows)
+    return _frame('inventory', {
+        'Warehouse_ID': warehouse_ids,
+        'Location': cities,
+        'Product_Category': categories,
+        'Current_Stock_Units': rng.integers(100, 5000, size),
+        'Reorder_Level': rng.integers(290, 1000, size),
+        'Storage_Cost_per_Unit': np.round(rng.uniform(7.5, 44, size), 2),
+        'Last_Restocked_Date': pd.Timestamp(end_date) - pd.to_timedelta(rng.integers(0, 30, size), unit='D'),
+    })
+
+
+def generate_fleet(rng, n_vehicles):
+    vehicle_type = _choice(rng, VEHICLE_TYPES, n_vehicles)
+
+    def spec(position):
+        ranges = np.array([VEHICLE_TYPES[t][position] for t in vehicle_type], dtype=np.float64).reshape(-1, 2)
+        return ranges[:, 0] + rng.random(n_vehicles) * (ranges[:, 1] - ranges[:, 0])
+
+    id_width = max(4, len(str(n_vehicles)))
+    return _frame('fleet', {
+        'Vehicle_ID': [f'VEH{i:0{id_width}d}' for i in range(1, n_vehicles + 1)],
+        'Vehicle_Type': vehicle_type,
+        'Capacity_KG': np.round(spec(1), 2),
+        'Fuel_Efficiency_KM_per_L': np.round(spec(2), 2),
+        'Current_Location': _choice(rng, WAREHOUSES, n_vehicles),
+        'Status': _choice(rng, VEHICLE_STATUSES, n_vehicles),
+        'Age_Years': rng.uniform(0.5, 8, n_vehicles),
+        'CO2_Emissions_Kg_per_KM': np.round(spec(3), 3),
+    })
+
+
+def encode(name, frame, fmt):
+    # One chunk of a table as its serialized form: CSV bytes without header,
+    # or an Arrow table in the table's fixed schema. Done in the workers, as
+    # rendering costs more than generating.
+    if fmt == 'parquet':
+        return pa.Table.from_pandas(frame, schema=arrow_schema(name), preserve_index=False)
+    return frame.to_csv(header=False, index=False, date_format='%Y-%m-%d').encode()
+
+
+def encoded_chunk(fmt, *chunk_args):
+    return {
+        name: (len(frame), encode(name, frame, fmt))
+        for name, frame in generate_chunk(*chunk_args).items()
+    }
+
+
+class TableWriter:
+    # Appends encoded chunks to one output file per table
+    def __init__(self, name, path, fmt):
+        self.rows = 0
+        self._writer = None
+        self._file = None
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, arrow_schema(name))
+        else:
+            self._file = open(path, 'wb')
+            self._file.write((','.join(TABLE_SCHEMAS[name]['columns']) + '\n').encode())
+
+    def write(self, rows, payload):
+        if self._writer is not None:
+            self._writer.write_table(payload)
+        else:
+            self._file.write(payload)
+        self.rows += rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def generate(output, n_orders, seed=42, fmt='csv', workers=None, chunk_orders=CHUNK_ORDERS,
+             end_date=DEFAULT_END_DATE, days=DEFAULT_DAYS, n_vehicles=DEFAULT_VEHICLES):
+    # Writes all seven tables to `output` and returns the row count per table
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    os.makedirs(output, exist_ok=True)
+    extension = OUTPUT_FORMATS[fmt]
+
+    def table_path(name):
+        return os.path.join(output, os.path.splitext(SOURCE_FILES[name])[0] + extension)
+
+    # Static tables come from a stream of their own, after the last chunk's
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(2 ** 31,)))
+    counts = {}
+    for name, frame in [('inventory', generate_inventory(rng, end_date)), ('fleet', generate_fleet(rng, n_vehicles))]:
+        writer = TableWriter(name, table_path(name), fmt)
+        writer.write(len(frame), encode(name, frame, fmt))
+        writer.close()
+        counts[name] = writer.rows
+
+    writers = {
+        name: TableWriter(name, table_path(name), fmt)
+        for name in ['orders', 'delivery', 'routes', 'feedback', 'costs']
+    }
+    n_chunks = -(-n_orders // chunk_orders)
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers == 1 or n_chunks == 1:
+            for chunk in range(n_chunks):
+                for name, (rows, payload) in encoded_chunk(fmt, seed, chunk, chunk_orders, n_orders, end_date, days).items():
+                    writers[name].write(rows, payload)
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                # A bounded window of chunks in flight, written in chunk order
+                pending = []
+                next_chunk = 0
+                while next_chunk < n_chunks or pending:
+                    while next_chunk < n_chunks and len(pending) < 2 * workers:
+                        pending.append(pool.submit(
+                            encoded_chunk, fmt, seed, next_chunk, chunk_orders, n_orders, end_date, days
+                        ))
+                        next_chunk += 1
+                    for name, (rows, payload) in pending.pop(0).result().items():
+                        writers[name].write(rows, payload)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    counts.update({name: writer.rows for name, writer in writers.items()})
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic source extracts")
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--output', required=True, help="Directory to write the seven tables to")
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--chunk-orders', type=int, default=CHUNK_ORDERS)
+    parser.add_argument('--end-date', default=DEFAULT_END_DATE, help="Date of the newest orders")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="Days of order history")
+    parser.add_argument('--vehicles', type=int, default=DEFAULT_VEHICLES)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(
+        args.output, args.orders, seed=args.seed, fmt=args.format, workers=args.workers,
+        chunk_orders=args.chunk_orders, end_date=args.end_date, days=args.days, n_vehicles=args.vehicles,
+    )
+    for name, rows in counts.items():
+        print(f"{name:<10} {rows:>14,} rows")
+    print(f"written to {args.output} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
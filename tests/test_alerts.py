@@ -0,0 +1,72 @@
+import pandas as pd
+
+from alerts import ALERT_COOLDOWN_SECONDS, RESCORE_MARGIN, AlertEngine, QueueSink
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_orders(order_ids, status=None):
+    return pd.DataFrame({
+        'order_id': order_ids,
+        'priority': ['Express'] * len(order_ids),
+        'status': status if status is not None else [None] * len(order_ids),
+    })
+
+
+def alerted(alerts):
+    return [alert['order_id'] for alert in alerts]
+
+
+def test_threshold_and_delivered_orders():
+    engine = AlertEngine(0.6, clock=FakeClock())
+    orders = make_orders(['A', 'B', 'C'], status=[None, None, 'Delivered'])
+    assert alerted(engine.evaluate(orders, [0.6, 0.59, 0.9])) == ['A']
+
+
+def test_cooldown_suppresses_repeat_alerts():
+    clock = FakeClock()
+    sink = QueueSink()
+    engine = AlertEngine(0.6, sinks=[sink], clock=clock)
+    orders = make_orders(['A', 'B'])
+    assert alerted(engine.evaluate(orders, [0.7, 0.8])) == ['A', 'B']
+
+    # Same scores within the cooldown: nothing new
+    clock.now += ALERT_COOLDOWN_SECONDS - 1
+    assert engine.evaluate(orders, [0.7, 0.8]) == []
+    assert engine.stats.as_dict()['suppressed'] == 2
+
+    # After the cooldown both alert again
+    clock.now += 1
+    assert alerted(engine.evaluate(orders, [0.7, 0.8])) == ['A', 'B']
+    assert len(sink.recent(10)) == 4
+
+
+def test_rescore_margin_breaks_through_the_cooldown():
+    clock = FakeClock()
+    engine = AlertEngine(0.6, clock=clock)
+    orders = make_orders(['A'])
+    engine.evaluate(orders, [0.7])
+
+    clock.now += 60
+    # A rise smaller than the margin stays suppressed
+    assert engine.evaluate(orders, [0.7 + RESCORE_MARGIN / 2]) == []
+    # A rise of the full margin over the last alerted score alerts again
+    assert alerted(engine.evaluate(orders, [0.7 + RESCORE_MARGIN])) == ['A']
+    # and becomes the score later rises are measured from
+    assert engine.evaluate(orders, [0.7 + RESCORE_MARGIN * 1.5]) == []
+
+
+def test_delivered_order_is_forgotten():
+    clock = FakeClock()
+    engine = AlertEngine(0.6, clock=clock)
+    engine.evaluate(make_orders(['A']), [0.7])
+    engine.evaluate(make_orders(['A'], status=['Delivered']), [0.7])
+    # Reopened (e.g. a corrected record): alerts again without waiting
+    clock.now += 1
+    assert alerted(engine.evaluate(make_orders(['A']), [0.7])) == ['A']
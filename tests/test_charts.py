@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from charts import MAX_SERIES_POINTS, downsample_series
+from kpi_cube import KpiCube
+
+
+def test_weekly_trend_is_downsampled():
+    # Daily orders over more weeks than a chart series keeps
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2000-01-03', periods=7 * (MAX_SERIES_POINTS + 500), freq='D')
+    delayed = rng.random(len(dates)) < 0.3
+    # One week where every order is late
+    spike = len(dates) // 2 - (len(dates) // 2) % 7
+    delayed[spike:spike + 7] = True
+    orders = pd.DataFrame({
+        'order_date': dates,
+        'priority': 'Express',
+        'origin_warehouse': 'Mumbai',
+        'destination_city': 'Delhi',
+        'carrier': 'QuickShip',
+        'delayed': delayed.astype(float),
+        'customer_rating': 4,
+        'delivery_cost': 100.0,
+    })
+    weekly = KpiCube.from_frame(orders).rollup('order_week')
+    assert len(weekly) == MAX_SERIES_POINTS + 500
+
+    trend = downsample_series(weekly, 'order_week', 'delayed')
+    assert len(trend) == MAX_SERIES_POINTS
+    assert trend['order_week'].is_monotonic_increasing
+    # The ends and the extremes survive the thinning
+    assert trend['order_week'].iloc[0] == weekly['order_week'].iloc[0]
+    assert trend['order_week'].iloc[-1] == weekly['order_week'].iloc[-1]
+    assert trend['delayed'].max() == 1.0
@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from carrier_features import CarrierFeatureStore
+from data_loader import iter_merged_chunks, load_and_merge_all_data
+from prediction_model import RiskEngine
+from score_orders import run
+from synthetic_data import generate
+
+
+def append_update(data_path, file_name, order_id, **changes):
+    # Appends a changed copy of an order's row, as the feeds do on an update
+    path = os.path.join(data_path, file_name)
+    table = pd.read_csv(path, dtype=str, keep_default_na=False)
+    row = table[table['Order_ID'] == order_id].iloc[[-1]].assign(**changes)
+    row.to_csv(path, mode='a', header=False, index=False)
+
+
+@pytest.fixture
+def updated_data(tmp_path):
+    data_path = str(tmp_path)
+    generate(data_path, 500, days=60)
+    append_update(data_path, 'orders.csv', 'ORD000003', Priority='Express', Product_Category='Electronics')
+    append_update(data_path, 'delivery_performance.csv', 'ORD000001', Actual_Delivery_Days='9')
+    append_update(data_path, 'routes_distance.csv', 'ORD000002', Traffic_Delay_Minutes='300', Distance_KM='900')
+    append_update(data_path, 'routes_distance.csv', 'ORD000002', Traffic_Delay_Minutes='240')
+    return data_path
+
+
+def by_order(frame):
+    return frame.sort_values('order_id').reset_index(drop=True)
+
+
+def test_streaming_merge_keeps_appended_updates(updated_data):
+    streamed = by_order(pd.concat(iter_merged_chunks(updated_data, chunksize=64), ignore_index=True))
+    merged = by_order(load_and_merge_all_data(updated_data, use_cache=False))
+    assert len(streamed) == len(merged) == 500
+    for column in streamed.columns:
+        pd.testing.assert_series_equal(
+            streamed[column].astype(object), merged[column].astype(object), check_names=False, obj=column
+        )
+    updated = merged.set_index('order_id')
+    assert updated.loc['ORD000003', 'priority'] == 'Express'
+    assert updated.loc['ORD000001', 'actual_delivery_days'] == 9
+    assert updated.loc['ORD000002', 'traffic_delay_hours'] == 4
+
+
+def test_score_orders_matches_full_load(updated_data, tmp_path):
+    output = str(tmp_path / 'scores.csv')
+    rows, _ = run(updated_data, output, 'csv', chunksize=64, workers=1, use_model=False)
+    scored = by_order(pd.read_csv(output))
+    merged = load_and_merge_all_data(updated_data, use_cache=False)
+    features = CarrierFeatureStore.from_frame(merged)
+    expected = by_order(RiskEngine().score_frame(merged, features=features).assign(order_id=merged['order_id']))
+    assert rows == 500
+    assert (scored['order_id'] == expected['order_id']).all()
+    pd.testing.assert_series_equal(scored['risk_score'], expected['risk_score'])
+    assert (scored['risk_level'] == expected['risk_level'].astype(str)).all()
@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+from carrier_features import CarrierFeatureStore
+from data_loader import load_and_merge_all_data
+from ingest import IncrementalLoader
+from kpi_cube import KpiCube
+from prediction_model import RiskEngine
+from synthetic_data import generate
+
+FEEDS = ['orders.csv', 'delivery_performance.csv', 'routes_distance.csv']
+
+
+def append_rows(data_path, file_name, rows):
+    rows.to_csv(os.path.join(data_path, file_name), mode='a', header=False, index=False)
+
+
+def read_feed(data_path, file_name):
+    return pd.read_csv(os.path.join(data_path, file_name), dtype=str, keep_default_na=False)
+
+
+def by_order(frame):
+    return frame.sort_values('order_id').reset_index(drop=True)
+
+
+@pytest.fixture
+def loader_and_path(tmp_path):
+    data_path = str(tmp_path / 'feeds')
+    generate(data_path, 500, days=60)
+    loader = IncrementalLoader(data_path, engine=RiskEngine())
+
+    # 100 new orders, then updates to orders the loader already holds
+    more = str(tmp_path / 'more')
+    generate(more, 600, days=60)
+    for file_name in FEEDS:
+        new = read_feed(more, file_name)
+        append_rows(data_path, file_name, new[new['Order_ID'] > 'ORD000500'])
+    delivery = read_feed(data_path, 'delivery_performance.csv')
+    append_rows(data_path, 'delivery_performance.csv',
+                delivery[delivery['Order_ID'] == 'ORD000001'].assign(Actual_Delivery_Days='12'))
+    routes = read_feed(data_path, 'routes_distance.csv')
+    append_rows(data_path, 'routes_distance.csv',
+                routes[routes['Order_ID'] == 'ORD000002'].assign(Traffic_Delay_Minutes='300'))
+    return loader, data_path
+
+
+def test_refresh_matches_full_reload(loader_and_path):
+    loader, data_path = loader_and_path
+    result = loader.refresh()
+    assert not result['full_reload']
+    assert result['added'] == 100
+    assert result['updated'] == 2
+
+    full = load_and_merge_all_data(data_path, use_cache=False)
+    merged = by_order(loader.merged)
+    expected = by_order(full)
+    assert list(merged.columns) == list(expected.columns)
+    for column in expected.columns:
+        pd.testing.assert_series_equal(
+            merged[column].astype(object), expected[column].astype(object), check_names=False, obj=column
+        )
+
+    # Carrier history folded in incrementally equals one built from scratch
+    features = CarrierFeatureStore.from_frame(full)
+    pd.testing.assert_frame_equal(
+        loader.features.carrier_table.sort_index(), features.carrier_table.sort_index(), check_like=True
+    )
+
+    risk = by_order(loader.risk.assign(order_id=loader.merged['order_id']))
+    expected_risk = by_order(RiskEngine().score_frame(full, features=features).assign(order_id=full['order_id']))
+    pd.testing.assert_series_equal(risk['risk_score'], expected_risk['risk_score'])
+    assert (risk['risk_level'] == expected_risk['risk_level']).all()
+
+    rollup = loader.cube.rollup('priority').sort_values('priority').reset_index(drop=True)
+    expected_rollup = KpiCube.from_frame(full).rollup('priority').sort_values('priority').reset_index(drop=True)
+    pd.testing.assert_frame_equal(rollup, expected_rollup, check_dtype=False)
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from kpi_cube import KpiCube
+
+
+def make_orders(dates, delayed):
+    n = len(dates)
+    return pd.DataFrame({
+        'order_date': pd.to_datetime(dates),
+        'priority': ['Express'] * n,
+        'origin_warehouse': ['Mumbai'] * n,
+        'destination_city': ['Delhi'] * n,
+        'carrier': ['QuickShip'] * n,
+        'delayed': delayed,
+        'customer_rating': [4] * n,
+        'delivery_cost': [100.0] * n,
+    })
+
+
+def test_weekly_rollup_keeps_years_apart():
+    # Week 5 of 2023 and week 5 of 2024
+    orders = make_orders(['2023-01-30', '2023-02-01', '2024-01-29'], [1, 1, 0])
+    weekly = KpiCube.from_frame(orders).rollup('order_week')
+    assert list(weekly['order_week']) == [pd.Timestamp('2023-01-30'), pd.Timestamp('2024-01-29')]
+    assert list(weekly['orders']) == [2, 1]
+    assert list(weekly['delayed']) == [1.0, 0.0]
+
+
+def test_weekly_rollup_spans_new_year():
+    # Monday 2024-12-30 to Sunday 2025-01-05 is one week
+    orders = make_orders(['2024-12-30', '2025-01-01', '2025-01-05', '2025-01-06'], [1, 0, 0, 1])
+    weekly = KpiCube.from_frame(orders).rollup('order_week')
+    assert list(weekly['order_week']) == [pd.Timestamp('2024-12-30'), pd.Timestamp('2025-01-06')]
+    assert list(weekly['orders']) == [3, 1]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from prediction_model import (
+    HIGH_RISK_CATEGORIES, PEAK_HOURS, RISK_FACTORS, RiskEngine, calculate_risk_score, calculate_risk_scores,
+)
+
+WEIGHTS = {
+    'priority': 0.25,
+    'traffic': 0.2,
+    'weather': 0.15,
+    'distance': 0.15,
+    'product': 0.1,
+    'carrier_history': 0.15,
+    'time_of_day': 0.1,
+}
+
+
+def reference_risk_score(row, weights):
+    # The original per-row formula
+    score = 0
+    score += weights['priority'] * (row['priority'] == 'Express')
+    score += weights['traffic'] * (row['traffic_delay_hours'] > 2)
+    score += weights['weather'] * (row['weather_impact'] != 'None')
+    score += weights['distance'] * (row['distance_km'] > 500)
+    score += weights['product'] * (row['product_category'] in HIGH_RISK_CATEGORIES)
+    score += weights['carrier_history'] * (row['carrier_avg_delay'] > 0.5)
+    score += weights['time_of_day'] * (row['hour_of_day'] in PEAK_HOURS)
+    return min(score, 1.0)
+
+
+def make_orders(n_rows, seed=0):
+    # Random orders with a missing value in every column now and then
+    rng = np.random.default_rng(seed)
+    orders = pd.DataFrame({
+        'priority': rng.choice(['Express', 'Standard', 'Economy'], n_rows).astype(object),
+        'traffic_delay_hours': rng.uniform(0, 5, n_rows),
+        'weather_impact': rng.choice(['None', 'Rain', 'Fog', 'Storm'], n_rows).astype(object),
+        'distance_km': rng.uniform(10, 1500, n_rows),
+        'product_category': rng.choice(['Electronics', 'Healthcare', 'Books', 'Fashion'], n_rows).astype(object),
+        'carrier_avg_delay': rng.uniform(0, 1, n_rows),
+        'hour_of_day': rng.integers(0, 24, n_rows).astype(np.float64),
+    })
+    for column in orders.columns:
+        missing = rng.random(n_rows) < 0.1
+        orders.loc[missing, column] = None if orders[column].dtype == object else np.nan
+    return orders
+
+
+def test_batch_and_single_scores_match_the_row_formula():
+    orders = make_orders(2000)
+    rows = orders.to_dict('records')
+    expected = np.array([reference_risk_score(row, WEIGHTS) for row in rows])
+    np.testing.assert_allclose(calculate_risk_scores(orders, WEIGHTS), expected)
+    np.testing.assert_allclose(calculate_risk_scores({c: orders[c].to_numpy() for c in orders}, WEIGHTS), expected)
+    np.testing.assert_allclose([calculate_risk_score(row, WEIGHTS) for row in rows], expected)
+
+
+def test_categorical_columns_score_like_plain_ones():
+    orders = make_orders(500, seed=1)
+    categorical = orders.astype({c: 'category' for c in ['priority', 'weather_impact', 'product_category']})
+    np.testing.assert_allclose(calculate_risk_scores(categorical, WEIGHTS), calculate_risk_scores(orders, WEIGHTS))
+
+
+def test_missing_carrier_history_does_not_flag():
+    # Without a carrier feature store the carrier_history factor is unknown
+    order = {'priority': 'Standard', 'traffic_delay_hours': 0.0, 'weather_impact': 'None', 'distance_km': 100.0,
+             'product_category': 'Books'}
+    engine = RiskEngine({'priority': 0.5, 'carrier_history': 0.5})
+    assert engine.score_order(order) == 0.0
+    assert engine.score_order(dict(order, carrier_avg_delay=0.9)) == 0.5
+    assert set(engine.feature_columns) == {RISK_FACTORS['carrier_history'][0]}
@@ -0,0 +1,115 @@
+# Train the delay classifier on the merged delivery data and save a versioned
+# artifact for prediction_model.load_delay_model.
+#
+#   python train_model.py [--data-path data/] [--model-dir models/]
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
+
+from data_loader import load_and_merge_all_data
+from prediction_model import (
+    MODEL_CATEGORICAL_FEATURES, MODEL_DIR, MODEL_NUMERIC_FEATURES, MODEL_PREFIX,
+    model_features,
+)
+
+
+def delay_labels(merged_data):
+    # Label: delivered later than promised. Orders without delivery data yet
+    # are left out of training.
+    known = merged_data['actual_delivery_days'].notna() & merged_data['promised_delivery_days'].notna()
+    labelled = merged_data[known]
+    labels = (labelled['actual_delivery_days'] > labelled['promised_delivery_days']).to_numpy(dtype=np.int8)
+    return labelled, labels
+
+
+def build_pipeline(random_state=42):
+    n_categorical = len(MODEL_CATEGORICAL_FEATURES)
+    encoder = ColumnTransformer(
+        [
+            ('categorical', OrdinalEncoder(
+                handle_unknown='use_encoded_value', unknown_value=np.nan, encoded_missing_value=np.nan
+            ), MODEL_CATEGORICAL_FEATURES),
+            ('numeric', 'passthrough', MODEL_NUMERIC_FEATURES),
+        ]
+    )
+    classifier = HistGradientBoostingClassifier(
+        categorical_features=[i < n_categorical for i in range(n_categorical + len(MODEL_NUMERIC_FEATURES))],
+        max_iter=100,
+        early_stopping=True,
+        learning_rate=0.05,
+        max_leaf_nodes=15,
+        l2_regularization=1.0,
+        random_state=random_state,
+    )
+    return Pipeline([('encode', encoder), ('classify', classifier)])
+
+
+def train_delay_model(merged_data, test_size=0.2, random_state=42):
+    labelled, labels = delay_labels(merged_data)
+    features = model_features(labelled)
+    stratify = labels if len(np.unique(labels)) > 1 else None
+    X_train, X_test, y_train, y_test = train_test_split(
+        features, labels, test_size=test_size, random_state=random_state, stratify=stratify
+    )
+
+    start = time.perf_counter()
+    pipeline = build_pipeline(random_state).fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+
+    metrics = {'train_rows': len(X_train), 'test_rows': len(X_test), 'train_seconds': train_seconds}
+    if len(X_test):
+        probabilities = pipeline.predict_proba(X_test)[:, 1]
+        metrics['accuracy'] = float(accuracy_score(y_test, probabilities > 0.5))
+        if len(np.unique(y_test)) > 1:
+            metrics['roc_auc'] = float(roc_auc_score(y_test, probabilities))
+
+    # Refit on everything once the holdout numbers are recorded
+    pipeline = build_pipeline(random_state).fit(features, labels)
+    return pipeline, metrics
+
+
+def save_delay_model(pipeline, metrics, model_dir=MODEL_DIR):
+    trained_at = datetime.now(timezone.utc)
+    version = trained_at.strftime('%Y%m%dT%H%M%S')
+    artifact = {
+        'pipeline': pipeline,
+        'version': version,
+        'trained_at': trained_at.isoformat(),
+        'metrics': metrics,
+        'features': MODEL_CATEGORICAL_FEATURES + MODEL_NUMERIC_FEATURES,
+        'sklearn_version': sklearn.__version__,
+    }
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, f'{MODEL_PREFIX}{version}.joblib')
+    # Uncompressed so the arrays can be memory-mapped on load
+    joblib.dump(artifact, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    args = parser.parse_args()
+
+    merged_data = load_and_merge_all_data(args.data_path)
+    pipeline, metrics = train_delay_model(merged_data)
+    path = save_delay_model(pipeline, metrics, args.model_dir)
+    print(f"Saved {path}")
+    for name, value in metrics.items():
+        print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+
+
+if __name__ == '__main__':
+    main()
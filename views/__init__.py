@@ -0,0 +1,17 @@
+import importlib
+
+# Dashboard pages, one module each with a render(ctx) function taking a
+# views.common.PageContext. Only the selected page's module is imported, and
+# with it the libraries only that page uses (Plotly, SciPy, PyArrow), so a
+# run pays for the page on screen rather than for all of them.
+PAGES = {
+    "📊 Executive Dashboard": 'views.executive',
+    "🔮 Delay Predictions": 'views.predictions',
+    "📈 Performance Analytics": 'views.performance',
+    "🗺️ Route Optimization": 'views.routes',
+    "⚙️ Settings & Export": 'views.settings',
+}
+
+
+def render(page, ctx):
+    importlib.import_module(PAGES[page]).render(ctx)
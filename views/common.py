@@ -0,0 +1,194 @@
+import os
+import threading
+from functools import cached_property
+
+import streamlit as st
+
+from alerts import AlertEngine, AlertWorker, LogFileSink, QueueSink, WebhookSink, load_settings
+from charts import FigureCache
+from explanations import RiskExplainer
+from geo import GeoIndex
+from ingest import REFRESH_INTERVALS, IncrementalLoader
+from instrumentation import stage
+from kpi_cube import KpiCube
+from prediction_model import RiskEngine, load_delay_model
+from shared_data import SessionRegistry, SharedDataset, frame_nbytes
+
+# Resources and helpers shared by app.py and the page modules
+
+
+class LazyResource:
+    # Built by the first get(), from whichever thread asks first
+    def __init__(self, build):
+        self._build = build
+        self._built = False
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if not self._built:
+                self._value = self._build()
+                self._built = True
+        return self._value
+
+
+@st.cache_resource
+def get_risk_engine():
+    return RiskEngine()
+
+@st.cache_resource
+def get_risk_explainer():
+    return RiskExplainer(get_risk_engine())
+
+@st.cache_resource
+def get_delay_model():
+    # Loading the model pulls in scikit-learn, so it waits for the first page
+    # or alert batch that scores with it; get() is None until train_model.py
+    # has produced an artifact
+    return LazyResource(load_delay_model)
+
+@st.cache_resource
+def get_ingestor():
+    # Process-wide merged store, kept current by incremental refreshes of the
+    # appended order feeds
+    return IncrementalLoader('data/', engine=get_risk_engine())
+
+@st.cache_resource
+def get_geo_index():
+    # Cities and the warehouses of warehouse_inventory.csv
+    return GeoIndex.from_data('data/')
+
+@st.cache_resource(max_entries=2)
+def get_shared_dataset(version, _merged):
+    # One read-only copy per store version for every session in the process
+    merged = _merged.copy(deep=False)
+
+    # Add coordinates; NaN for cities the geo index does not know
+    geo = get_geo_index()
+    merged['dest_lat'], merged['dest_lon'] = geo.coordinates(merged['destination_city'])
+    merged['origin_lat'], merged['origin_lon'] = geo.coordinates(merged['origin_warehouse'])
+    return SharedDataset(merged, version)
+
+@st.cache_resource
+def get_alert_queue():
+    # Recent alerts for the Settings page
+    return QueueSink()
+
+@st.cache_resource
+def get_alert_worker():
+    # Background thread scoring every added or updated order against the saved
+    # threshold; alerts go to logs/alerts.jsonl, the in-app queue and, when
+    # ALERT_WEBHOOK_URL is set, a webhook
+    settings = load_settings()
+    sinks = [LogFileSink(os.path.join('logs', 'alerts.jsonl')), get_alert_queue()]
+    if os.environ.get('ALERT_WEBHOOK_URL'):
+        sinks.append(WebhookSink(os.environ['ALERT_WEBHOOK_URL']))
+    delay_model, risk_engine, ingestor = get_delay_model(), get_risk_engine(), get_ingestor()
+
+    def scorer(orders, risk):
+        model = delay_model.get()
+        if model is not None:
+            return model.predict_proba(orders)
+        return risk['risk_score'].to_numpy() if risk is not None else risk_engine.score(orders, ingestor.features)
+
+    return AlertWorker(
+        AlertEngine(settings['alert_threshold'], sinks), scorer, loader=ingestor,
+        refresh_interval=REFRESH_INTERVALS[settings['refresh_frequency']]
+    ).start()
+
+@st.cache_resource
+def get_session_registry():
+    return SessionRegistry()
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+def for_chart(df):
+    # Plotly groups categorical columns over every declared category, including
+    # ones the current filter left empty, so hand it plain strings instead
+    cat_cols = df.select_dtypes('category').columns
+    return df.astype({col: str for col in cat_cols}) if len(cat_cols) else df
+
+def render_chart(name, build, signature=None):
+    # Building the figure and serializing it to the browser are timed as
+    # separate stages; build may return None for nothing to show. With a
+    # signature (data version and filters, plus anything else the figure
+    # depends on) the built figure is reused by later runs and sessions.
+    with stage(f'app.figure:{name}'):
+        fig = build() if signature is None else get_figure_cache().get(name, signature, build)
+    if fig is None:
+        return
+    with stage(f'app.plotly_chart:{name}'):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+class PageContext:
+    # One run's sidebar selection and access to the shared store, handed to the
+    # selected page. The filtered rows and KPI aggregates are worked out on
+    # first use, so pages that never touch them skip the cost.
+    def __init__(self, date_range, priorities, warehouses, saved_settings, load_error=None,
+                 ingestor=None, data_version=None, dataset=None, store_risk=None, store_cube=None,
+                 store_features=None, selected_rows=None):
+        self.date_range = date_range
+        self.priorities = priorities
+        self.warehouses = warehouses
+        self.saved_settings = saved_settings
+        self.load_error = load_error
+        self.ingestor = ingestor
+        self.data_version = data_version
+        self.dataset = dataset
+        self.all_data = dataset.frame if dataset is not None else None
+        self.store_risk = store_risk
+        self.store_cube = store_cube
+        # Carrier history for scoring new orders; None when the engine does
+        # not use it
+        self.store_features = store_features
+        self.selected_rows = selected_rows
+        self.chart_signature = None
+        if selected_rows is not None:
+            self.chart_signature = (data_version, tuple(date_range), tuple(priorities), tuple(warehouses))
+
+    @cached_property
+    def merged_data(self):
+        # Rows of the shared frame at the selected positions: a per-run copy,
+        # counted by session_bytes(), unless every row is selected
+        with stage('app.filter_take') as timer:
+            data = self.dataset.take(self.selected_rows)
+            timer.rows = len(data)
+        return data
+
+    @cached_property
+    def kpis(self):
+        # Pre-aggregated KPIs for the current filters
+        with stage('app.kpis'):
+            if self.selected_rows is not None:
+                return self.store_cube.select(self.date_range, self.priorities, self.warehouses)
+            return KpiCube.from_frame(self.merged_data)
+
+    @property
+    def risk_engine(self):
+        return get_risk_engine()
+
+    @property
+    def risk_explainer(self):
+        return get_risk_explainer()
+
+    @property
+    def delay_model(self):
+        return get_delay_model().get()
+
+    @property
+    def alert_worker(self):
+        return get_alert_worker()
+
+    def session_bytes(self):
+        # What this session holds beyond the shared dataset, for the memory
+        # report: its row positions plus the copy of the filtered rows when
+        # this run took one
+        held = self.selected_rows.nbytes if self.selected_rows is not None else 0
+        data = self.__dict__.get('merged_data')
+        if data is not None and data is not self.all_data:
+            held += frame_nbytes(data)
+        return held
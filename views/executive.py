@@ -0,0 +1,129 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from geo import INDIA_CENTER
+from views.common import for_chart, get_geo_index, render_chart
+
+
+def render(ctx):
+    kpis = ctx.kpis
+    kpi_totals = kpis.totals()
+    chart_signature = ctx.chart_signature
+    
+    st.markdown('<h2 class="sub-header">Executive Dashboard</h2>', unsafe_allow_html=True)
+    
+    # KPI Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            label="Total Orders",
+            value=kpi_totals['orders'],
+            delta=f"{kpi_totals['orders'] - 150}" if kpi_totals['orders'] > 150 else "0"
+        )
+    
+    with col2:
+        if not np.isnan(kpi_totals['delayed']):
+            delay_rate = kpi_totals['delayed'] * 100
+            st.metric(
+                label="Delay Rate",
+                value=f"{delay_rate:.1f}%",
+                delta=f"-{max(0, delay_rate - 15):.1f}%" if delay_rate > 15 else f"+{max(0, 15 - delay_rate):.1f}%"
+            )
+        else:
+            st.metric(label="Delay Rate", value="N/A")
+    
+    with col3:
+        if not np.isnan(kpi_totals['customer_rating']):
+            avg_rating = kpi_totals['customer_rating']
+            st.metric(
+                label="Avg Customer Rating",
+                value=f"{avg_rating:.1f}/5",
+                delta=f"{avg_rating - 3.5:.1f}" if avg_rating > 3.5 else f"{3.5 - avg_rating:.1f}"
+            )
+        else:
+            st.metric(label="Avg Customer Rating", value="N/A")
+    
+    with col4:
+        if not np.isnan(kpi_totals['delivery_cost']):
+            total_cost = kpi_totals['delivery_cost_sum']
+            st.metric(
+                label="Total Delivery Cost",
+                value=f"₹{total_cost:,.0f}",
+                delta=f"-₹{total_cost * 0.05:,.0f}"
+            )
+        else:
+            st.metric(label="Total Delivery Cost", value="N/A")
+    
+    # Charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        delay_by_priority = kpis.rollup('priority')[['priority', 'delayed']]
+        if not delay_by_priority.empty:
+            render_chart('delay_by_priority', lambda: px.bar(
+                for_chart(delay_by_priority),
+                x='priority',
+                y='delayed',
+                title='Delay Rate by Priority',
+                color='priority',
+                labels={'delayed': 'Delay Rate', 'priority': 'Delivery Priority'}
+            ), chart_signature)
+        else:
+            st.info("No priority data available")
+    
+    with col2:
+        rating_distribution = kpis.rating_distribution()
+        if rating_distribution['count'].sum() > 0:
+            render_chart('rating_distribution', lambda: px.bar(
+                rating_distribution,
+                x='customer_rating',
+                y='count',
+                title='Customer Rating Distribution',
+                color_discrete_sequence=['#3B82F6']
+            ), chart_signature)
+        else:
+            st.info("No rating data available")
+    
+    # Map visualization (FIXED)
+    st.markdown('<h3 class="sub-header">Delivery Performance Map</h3>', unsafe_allow_html=True)
+    
+    map_data = kpis.rollup('destination_city')[['destination_city', 'orders', 'delayed', 'customer_rating']]
+    if not map_data.empty:
+        try:
+            # Add coordinates
+            map_data['lat'], map_data['lon'] = get_geo_index().coordinates(map_data['destination_city'])
+            
+            # Create the map
+            def delivery_map():
+                fig3 = px.scatter_mapbox(
+                    for_chart(map_data),
+                    lat='lat',
+                    lon='lon',
+                    size='orders',
+                    color='delayed',
+                    hover_name='destination_city',
+                    hover_data=['orders', 'customer_rating'],
+                    title='Delivery Performance by Destination City',
+                    color_continuous_scale='RdYlGn_r',
+                    size_max=30,
+                    zoom=4
+                )
+                fig3.update_layout(
+                    mapbox_style="carto-positron",
+                    mapbox_center=INDIA_CENTER,
+                    height=500,
+                    margin={"r":0,"t":30,"l":0,"b":0}
+                )
+                return fig3
+            
+            render_chart('delivery_map', delivery_map, chart_signature)
+            
+        except Exception as e:
+            st.warning(f"Could not display map: {str(e)}")
+            st.info("Showing data table instead")
+            st.dataframe(ctx.merged_data.head(10))
+    else:
+        st.info("Map data not available. Showing data table:")
+        st.dataframe(ctx.merged_data.head(10))
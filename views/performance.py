@@ -0,0 +1,87 @@
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from charts import downsample_series
+from views.common import for_chart, render_chart
+
+
+def render(ctx):
+    kpis = ctx.kpis
+    chart_signature = ctx.chart_signature
+    
+    st.markdown('<h2 class="sub-header">Performance Analytics</h2>', unsafe_allow_html=True)
+    
+    carrier_performance = kpis.rollup('carrier')
+    if not carrier_performance.empty:
+        render_chart('carrier_performance', lambda: px.scatter(
+            for_chart(carrier_performance),
+            x='delayed',
+            y='customer_rating',
+            size='orders',
+            color='delivery_cost',
+            hover_name='carrier',
+            title='Carrier Performance Matrix',
+            labels={'delayed': 'Delay Rate', 'customer_rating': 'Avg Rating', 'delivery_cost': 'Avg Cost'}
+        ), chart_signature)
+    
+    # Time series
+    weekly_data = kpis.rollup('order_week')
+    if not weekly_data.empty:
+        def weekly_trends():
+            fig2 = go.Figure()
+            
+            # Each line is thinned on its own, keeping its peaks and dips
+            delay_trend = downsample_series(weekly_data, 'order_week', 'delayed')
+            if not delay_trend.empty:
+                fig2.add_trace(go.Scatter(
+                    x=delay_trend['order_week'],
+                    y=delay_trend['delayed'],
+                    name='Delay Rate',
+                    line=dict(color='#EF4444')
+                ))
+            
+            rating_trend = downsample_series(weekly_data, 'order_week', 'customer_rating')
+            if not rating_trend.empty:
+                fig2.add_trace(go.Scatter(
+                    x=rating_trend['order_week'],
+                    y=rating_trend['customer_rating'],
+                    name='Customer Rating',
+                    line=dict(color='#10B981')
+                ))
+            
+            if not fig2.data:
+                return None
+            fig2.update_layout(
+                title='Weekly Performance Trends',
+                xaxis_title='Week',
+                height=400
+            )
+            return fig2
+        
+        render_chart('weekly_trends', weekly_trends, chart_signature)
+    
+    # Cost analysis
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        cost_data = kpis.rollup('priority')[['priority', 'delivery_cost']].dropna()
+        if not cost_data.empty:
+            render_chart('cost_by_priority', lambda: px.bar(
+                for_chart(cost_data),
+                x='priority',
+                y='delivery_cost',
+                title='Average Cost by Priority',
+                color='priority'
+            ), chart_signature)
+    
+    with col2:
+        carrier_cost = carrier_performance[['carrier', 'delivery_cost']].dropna()
+        if not carrier_cost.empty:
+            render_chart('cost_by_carrier', lambda: px.bar(
+                for_chart(carrier_cost),
+                x='carrier',
+                y='delivery_cost',
+                title='Average Cost by Carrier',
+                color='carrier'
+            ), chart_signature)
@@ -0,0 +1,164 @@
+import plotly.express as px
+import streamlit as st
+
+from explanations import NO_FACTORS
+from prediction_model import assess_orders
+from views.common import for_chart, render_chart
+
+
+def render(ctx):
+    merged_data = ctx.merged_data
+    risk_engine = ctx.risk_engine
+    risk_explainer = ctx.risk_explainer
+    delay_model = ctx.delay_model
+    features = ctx.store_features
+    chart_signature = ctx.chart_signature
+    
+    st.markdown('<h2 class="sub-header">Predictive Delay Analysis</h2>', unsafe_allow_html=True)
+    
+    required_cols = ['priority', 'traffic_delay_hours', 'weather_impact', 'distance_km', 'product_category']
+    
+    if all(col in merged_data.columns for col in required_cols):
+        # Risk scores are kept with the merged store, rescored only for orders
+        # a refresh touched, and picked out for the filtered rows
+        if ctx.load_error is None:
+            risk = ctx.store_risk.loc[merged_data.index]
+        else:
+            risk = risk_engine.score_frame(merged_data, features=features)
+        merged_data = merged_data.assign(risk_score=risk['risk_score'], risk_level=risk['risk_level'])
+        if delay_model is not None and ctx.load_error is None:
+            # Kept with the store like the risk scores; predicted for the
+            # filtered rows alone if a refresh landed since this run's snapshot
+            probability = ctx.ingestor.delay_probability(delay_model, ctx.data_version)
+            if probability is None:
+                probability = delay_model.predict_frame(merged_data)
+            merged_data['delay_probability'] = probability.loc[merged_data.index]
+        
+        # Factor contributions, top factors and recommended action for every
+        # filtered order, reused while the data and filters stay the same
+        explained = risk_explainer.explain(
+            merged_data, chart_signature and (chart_signature, risk_engine.key), features=features
+        )
+        high_risk = (merged_data['risk_level'] == 'High').to_numpy()
+        
+        # Display high-risk orders
+        high_risk_orders = merged_data[high_risk].head(5)
+        
+        if not high_risk_orders.empty:
+            st.markdown("### ⚠️ High-Risk Orders (Predicted Delays)")
+            
+            cards = high_risk_orders.join(explained[['top_factors', 'recommended_action']])
+            for row in cards.to_dict('records'):
+                st.markdown(f"""
+                <div class="warning-card">
+                    <strong>Order ID: {row['order_id']}</strong><br>
+                    From: {row.get('origin_warehouse', 'Unknown')} → 
+                    To: {row.get('destination_city', 'Unknown')}<br>
+                    Priority: {row['priority']} | Product: {row['product_category']}<br>
+                    Risk Factors: {row['top_factors']} (Weather: {row['weather_impact']}, Traffic: {row['traffic_delay_hours']:.1f} hrs)<br>
+                    {f"Model Delay Probability: {row['delay_probability']:.0%}<br>" if 'delay_probability' in row else ''}
+                    <em>Recommended Action: {row['recommended_action']}</em>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            # What the recommendations add up to over every high-risk order
+            # in the selection, not just the cards above
+            actions = explained.loc[high_risk, 'recommended_action'].value_counts()
+            actions = actions[actions > 0].rename_axis('Recommended Action').reset_index(name='High-Risk Orders')
+            st.markdown(f"**Recommended actions for all {int(high_risk.sum()):,} high-risk orders**")
+            st.dataframe(actions, hide_index=True, use_container_width=True)
+        
+        # Visualizations
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            def risk_distribution():
+                counts = merged_data['risk_level'].value_counts().reset_index()
+                counts.columns = ['risk_level', 'count']
+                return px.pie(
+                    for_chart(counts),
+                    names='risk_level',
+                    values='count',
+                    title='Order Risk Level Distribution',
+                    color='risk_level',
+                    color_discrete_map={'High': '#EF4444', 'Medium': '#F59E0B', 'Low': '#10B981'}
+                )
+            
+            render_chart('risk_distribution', risk_distribution,
+                         chart_signature and (chart_signature, risk_engine.key))
+        
+        with col2:
+            # Share of the total risk score each factor accounts for over the
+            # filtered orders
+            def risk_factors():
+                importance = risk_explainer.importance(explained)
+                return px.bar(
+                    importance,
+                    x='importance',
+                    y='feature',
+                    orientation='h',
+                    title='Delay Risk Factors Importance',
+                    color='importance',
+                    color_continuous_scale='RdYlGn_r',
+                    hover_data={'mean_contribution': ':.3f', 'orders_flagged': ':.0%'},
+                    labels={'importance': 'share of risk score'}
+                ).update_yaxes(autorange='reversed')
+            
+            render_chart('risk_factors', risk_factors, chart_signature and (chart_signature, risk_engine.key))
+    
+    else:
+        st.warning("Some required data columns are missing for delay prediction")
+        missing = [col for col in required_cols if col not in merged_data.columns]
+        st.info(f"Missing columns: {missing}")
+    
+    # Real-time prediction
+    st.markdown("### 🔍 Predict Delay for New Order")
+    
+    with st.form("prediction_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            priority = st.selectbox("Priority", ["Express", "Standard", "Economy"])
+            origin = st.selectbox("Origin", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"])
+            product = st.selectbox("Product Category", ["Electronics", "Fashion", "Food & Beverage", 
+                                                       "Healthcare", "Industrial", "Books", "Home Goods"])
+            carrier = st.selectbox("Carrier", ["SpeedyLogistics", "ReliableExpress", "QuickShip",
+                                               "GlobalTransit", "EcoDeliver"])
+        
+        with col2:
+            distance = st.slider("Distance (km)", 10, 1500, 500)
+            weather = st.selectbox("Weather Forecast", ["None", "Rain", "Heat", "Fog", "Storm"])
+            traffic = st.slider("Expected Traffic Delay (hours)", 0.0, 5.0, 1.0)
+        
+        submitted = st.form_submit_button("Predict Delay Probability")
+        
+        if submitted:
+            order = {
+                'priority': priority,
+                'origin_warehouse': origin,
+                'product_category': product,
+                'distance_km': distance,
+                'weather_impact': weather,
+                'traffic_delay_hours': traffic,
+                'carrier': carrier,
+            }
+            assessment = assess_orders(
+                {name: [value] for name, value in order.items()}, risk_engine, delay_model, features
+            )
+            explanation = risk_explainer.explain_order(order, features)
+            # Actions for the factors that flag this order, when any do
+            action = explanation['recommended_action'] if explanation['top_factors'] != NO_FACTORS else None
+            risk_level = assessment['risk_level'].iloc[0]
+            delay_prob = assessment['delay_probability'].iloc[0] * 100
+            
+            if risk_level == 'High':
+                st.error(f"⚠️ High Delay Risk: {delay_prob:.1f}% probability")
+                st.info(f"**Recommendations:** {action or 'Assign to premium carrier, add 25% buffer time'}, use GPS tracking")
+            elif risk_level == 'Medium':
+                st.warning(f"⚠️ Moderate Delay Risk: {delay_prob:.1f}% probability")
+                st.info(f"**Recommendations:** Monitor closely, {action[0].lower() + action[1:] if action else 'consider alternative route'}")
+            else:
+                st.success(f"✅ Low Delay Risk: {delay_prob:.1f}% probability")
+                st.info("**Recommendations:** Proceed as planned")
+            if action:
+                st.caption(f"Main risk factors: {explanation['top_factors']}")
@@ -0,0 +1,189 @@
+import os
+
+import plotly.express as px
+import streamlit as st
+
+from data_loader import SOURCE_FILES, read_table
+from fleet_assignment import DISPATCH_OBJECTIVES, assign_vehicles, available_vehicles, open_orders
+from instrumentation import stage
+from route_planner import OBJECTIVES, RoutePlanner
+from views.common import for_chart, render_chart
+
+
+@st.cache_resource(max_entries=2)
+def get_route_planner(version, _merged):
+    # City graph with all-pairs routes precomputed per vehicle type and objective
+    return RoutePlanner.from_data(merged_data=_merged)
+
+@st.cache_data(max_entries=1)
+def get_fleet(size, mtime_ns):
+    # Keyed on the fleet file's size and mtime rather than the store version,
+    # which moves with every refresh of the order feeds
+    return read_table('fleet', 'data/')
+
+def fleet_stat():
+    stat = os.stat(os.path.join('data/', SOURCE_FILES['fleet']))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def render(ctx):
+    merged_data = ctx.merged_data
+    chart_signature = ctx.chart_signature
+    
+    st.markdown('<h2 class="sub-header">Route Optimization Dashboard</h2>', unsafe_allow_html=True)
+    
+    # Optimization recommendations
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="success-card">
+            <h4>🚀 Quick Wins</h4>
+            1. **Consolidate Mumbai-Bangalore shipments**<br>
+            - Save 15% on fuel costs<br>
+            - Reduce 20% transit time<br>
+            <br>
+            2. **Avoid Delhi peak hours (8-11 AM)**<br>
+            - Reduce traffic delays by 30%<br>
+            - Improve on-time delivery by 25%
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="success-card">
+            <h4>📈 Strategic Improvements</h4>
+            1. **Implement dynamic routing**<br>
+            - Real-time traffic updates<br>
+            - Weather-adjusted routes<br>
+            <br>
+            2. **Carrier optimization**<br>
+            - Match carriers to route characteristics<br>
+            - Leverage regional carrier strengths
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Interactive route planner
+    st.markdown("### 🗺️ Interactive Route Planner")
+    
+    planner = get_route_planner(ctx.data_version, ctx.all_data) if ctx.load_error is None else None
+    
+    with st.form("route_planner"):
+        col1, col2, col3 = st.columns(3)
+        
+        city_options = planner.cities if planner is not None else ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata"]
+        with col1:
+            from_city = st.selectbox("From City", city_options)
+            vehicle_type = st.selectbox(
+                "Vehicle Type",
+                planner.vehicle_types if planner is not None else ["Small_Van", "Large_Truck", "Refrigerated", "Express_Bike"]
+            )
+        
+        with col2:
+            to_city = st.selectbox("To City", city_options, index=min(1, len(city_options) - 1))
+            priority_level = st.selectbox("Priority Level", ["Express", "Standard", "Economy"])
+        
+        with col3:
+            cargo_value = st.number_input("Cargo Value (₹)", min_value=100, max_value=100000, value=5000)
+            weather_cond = st.selectbox("Weather Conditions", ["Clear", "Rain", "Heat", "Fog", "Storm"])
+        
+        optimize_for = st.radio("Optimize for:", OBJECTIVES)
+        
+        if st.form_submit_button("Plan Optimal Route"):
+            plan = planner.plan(from_city, to_city, vehicle_type, optimize_for) if planner is not None else None
+            if from_city == to_city:
+                st.warning("Source and destination cannot be the same")
+            elif plan is None:
+                st.warning(f"No known route from {from_city} to {to_city}")
+            else:
+                best = plan['best']
+                distance = best['distance_km']
+                carrier = planner.recommend_carrier(from_city, to_city) or "Any"
+                
+                st.success(f"✅ Optimal Route Planned: {' → '.join(best['path'])}")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    st.metric("Distance", f"{distance:,.0f} km")
+                with col2:
+                    st.metric("Estimated Time", f"{best['time_hours']:.1f} hours")
+                with col3:
+                    st.metric("Estimated Cost", f"₹{best['cost_inr']:,.0f}")
+                with col4:
+                    st.metric("CO2 Emissions", f"{best['co2_kg']:,.0f} kg")
+                
+                if plan['alternatives']:
+                    alt = plan['alternatives'][0]
+                    hours = alt['time_hours'] - best['time_hours']
+                    cost_change = (alt['cost_inr'] - best['cost_inr']) / best['cost_inr'] * 100 if best['cost_inr'] else 0
+                    alternative = (
+                        f"{' → '.join(alt['path'])} ({'adds' if hours >= 0 else 'saves'} {abs(hours):.1f} hours, "
+                        f"{'costs' if cost_change >= 0 else 'saves'} {abs(cost_change):.0f}% "
+                        f"{'more' if cost_change >= 0 else 'cost'})"
+                    )
+                else:
+                    alternative = "None"
+                
+                st.info(f"""
+                **Route Details:**
+                - Suggested Carrier: {carrier}
+                - Recommended Departure: Tomorrow 8:00 AM
+                - Alternative Route Available: {alternative}
+                - Risk Level: {'Low' if distance < 500 else 'Medium' if distance < 800 else 'High'}
+                """)
+    
+    # Route analysis chart
+    if 'origin_warehouse' in merged_data.columns and 'destination_city' in merged_data.columns:
+        def top_routes():
+            with stage('app.route_counts', rows=len(merged_data)):
+                route_counts = merged_data.groupby(['origin_warehouse', 'destination_city'], observed=True).size().reset_index(name='count')
+                route_counts = route_counts.sort_values('count', ascending=False).head(10)
+            return px.bar(
+                for_chart(route_counts),
+                x='count',
+                y='origin_warehouse',
+                color='destination_city',
+                title='Top 10 Busiest Routes',
+                orientation='h',
+                labels={'count': 'Number of Deliveries', 'origin_warehouse': 'Origin'}
+            )
+        
+        render_chart('top_routes', top_routes, chart_signature)
+    
+    # Batch dispatch of open orders to available vehicles
+    st.markdown("### 🚚 Fleet Dispatch")
+    
+    if planner is not None and 'status' in merged_data.columns:
+        fleet = get_fleet(*fleet_stat())
+        pending_orders = open_orders(merged_data)
+        dispatch_days = sorted(pending_orders['order_date'].dt.date.dropna().unique(), reverse=True)
+        
+        with st.form("fleet_dispatch"):
+            col1, col2 = st.columns(2)
+            with col1:
+                dispatch_day = st.selectbox("Open Orders", ["All open orders"] + dispatch_days)
+            with col2:
+                dispatch_objective = st.radio("Minimise", list(DISPATCH_OBJECTIVES), horizontal=True)
+            
+            if st.form_submit_button("Assign Vehicles"):
+                if dispatch_day != "All open orders":
+                    pending_orders = open_orders(merged_data, dispatch_day)
+                assignment = assign_vehicles(pending_orders, available_vehicles(fleet), planner, dispatch_objective)
+                placed = assignment['vehicle_id'].notna()
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Orders Assigned", f"{int(placed.sum())}/{len(assignment)}")
+                with col2:
+                    st.metric("Vehicles Used", assignment['vehicle_id'].nunique())
+                with col3:
+                    st.metric("Total Cost", f"₹{assignment['cost_inr'].sum():,.0f}")
+                with col4:
+                    st.metric("Total CO2", f"{assignment['co2_kg'].sum():,.0f} kg")
+                
+                if (~placed).any():
+                    st.warning(f"{int((~placed).sum())} orders could not be placed on an available vehicle")
+                st.dataframe(assignment.round(1), use_container_width=True, hide_index=True)
+    else:
+        st.info("Fleet dispatch needs order and delivery data")
@@ -0,0 +1,148 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from alerts import save_settings
+from exporter import EXPORT_FORMATS, ExportCache, export_file_name, export_signature
+from ingest import REFRESH_INTERVALS
+from views.common import get_alert_queue, get_session_registry
+
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+
+def render(ctx):
+    saved_settings = ctx.saved_settings
+    
+    st.markdown('<h2 class="sub-header">Settings & Data Export</h2>', unsafe_allow_html=True)
+    
+    # Data export
+    st.markdown("### 📥 Export Data")
+    
+    export_format = st.selectbox("Select Export Format", list(EXPORT_FORMATS))
+    gzippable = EXPORT_FORMATS[export_format][2]
+    compress_export = st.checkbox("Gzip compress", disabled=not gzippable) and gzippable
+    
+    # Exports are written in chunks only on request, and reused for the same
+    # data version, filters and format
+    if st.button("Generate Export File"):
+        signature = export_signature(ctx.data_version, ctx.date_range, ctx.priorities, ctx.warehouses, export_format, compress_export)
+        with st.spinner("Writing export..."):
+            path = get_export_cache().get(signature, ctx.merged_data, export_format, compress_export)
+        st.session_state['export'] = (path, export_format, compress_export, datetime.now().strftime('%Y%m%d_%H%M%S'))
+    
+    export = st.session_state.get('export')
+    if export is not None and os.path.exists(export[0]):
+        path, fmt, compressed, stamp = export
+        with open(path, 'rb') as export_file:
+            st.download_button(
+                label=f"Download {fmt}",
+                data=export_file,
+                file_name=export_file_name(fmt, compressed, stem=f"logistics_data_{stamp}"),
+                mime='application/gzip' if path.endswith('.gz') else EXPORT_FORMATS[fmt][1]
+            )
+    
+    # Settings
+    st.markdown("### ⚙️ Dashboard Settings")
+    
+    # Kept outside the widget's own state so it still applies on other pages
+    update_frequency = st.select_slider(
+        "Data Refresh Frequency",
+        options=list(REFRESH_INTERVALS),
+        value=st.session_state.get('refresh_setting', saved_settings['refresh_frequency']),
+        key='refresh_frequency',
+        on_change=lambda: st.session_state.update(refresh_setting=st.session_state['refresh_frequency'])
+    )
+    
+    if ctx.load_error is None:
+        last_refresh = ctx.ingestor.last_refresh
+        if last_refresh is not None:
+            st.caption(
+                f"Last refresh {datetime.fromtimestamp(last_refresh['at']).strftime('%H:%M:%S')}: "
+                + ("full reload" if last_refresh['full_reload'] else
+                   f"{last_refresh['added']} new, {last_refresh['updated']} updated orders")
+                + f" in {last_refresh['seconds'] * 1000:.0f} ms"
+                + (f", {last_refresh['pending']} rows waiting for their order" if last_refresh['pending'] else "")
+            )
+        if st.button("Refresh Now"):
+            ctx.ingestor.refresh()
+            st.rerun()
+    
+    notification_threshold = st.slider(
+        "Delay Alert Threshold",
+        min_value=0.0,
+        max_value=1.0,
+        value=float(saved_settings['alert_threshold']),
+        help="Get alerts when delay probability exceeds this threshold"
+    )
+    
+    if st.button("Save Settings"):
+        save_settings(dict(saved_settings, alert_threshold=notification_threshold, refresh_frequency=update_frequency))
+        if ctx.load_error is None:
+            ctx.alert_worker.engine.threshold = notification_threshold
+            ctx.alert_worker.refresh_interval = REFRESH_INTERVALS[update_frequency]
+        st.success("Settings saved successfully!")
+    
+    # Alerts
+    if ctx.load_error is None:
+        st.markdown("### 🚨 Delay Alerts")
+        alert_stats = ctx.alert_worker.engine.stats.as_dict()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Alerts Raised", f"{alert_stats['alerts']:,}", help=f"{alert_stats['suppressed']:,} repeats suppressed")
+        with col2:
+            st.metric("Alerts/sec (1 min)", f"{alert_stats['alerts_per_sec']:.2f}")
+        with col3:
+            st.metric("Evaluation Lag (p95)", f"{alert_stats['lag_p95_seconds'] * 1000:,.0f} ms")
+        with col4:
+            st.metric("Pending Batches", ctx.alert_worker.backlog)
+        recent_alerts = get_alert_queue().recent(10)
+        if recent_alerts:
+            st.dataframe(pd.DataFrame(recent_alerts), use_container_width=True, hide_index=True)
+    
+    # Memory
+    st.markdown("### 🧠 Memory")
+    memory = get_session_registry().report(ctx.dataset)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Shared Dataset", f"{memory['shared_dataset_bytes'] / 2**20:,.1f} MB")
+    with col2:
+        st.metric("Active Sessions", memory['active_sessions'])
+    with col3:
+        st.metric("Per Session (avg)", f"{memory['session_bytes_total'] / max(memory['active_sessions'], 1) / 2**20:,.2f} MB",
+                  help="Row positions of each session's filters, plus the filtered rows its last run copied out of the shared dataset")
+    with col4:
+        st.metric("Process RSS", f"{memory['process_rss_bytes'] / 2**20:,.0f} MB")
+    
+    # About section
+    st.markdown("---")
+    st.markdown("### ℹ️ About This Dashboard")
+    st.markdown("""
+    **Predictive Delivery Optimizer v1.0**
+    
+    This dashboard helps NexGen Logistics:
+    - Predict delivery delays before they occur
+    - Optimize routing and carrier assignments
+    - Improve customer satisfaction
+    - Reduce operational costs by 15-20%
+    
+    **Key Features:**
+    ✅ Real-time delay prediction
+    ✅ Route optimization suggestions
+    ✅ Carrier performance analytics
+    ✅ Executive KPI dashboard
+    ✅ Data export functionality
+    
+    **Technology Stack:**
+    - Python 3.8+
+    - Streamlit (Web Framework)
+    - Pandas (Data Processing)
+    - Plotly (Visualizations)
+    - Scikit-learn (Machine Learning)
+    
+    For support, contact: analytics@nexgenlogistics.com
+    """)